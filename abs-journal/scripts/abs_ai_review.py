@@ -24,8 +24,9 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from abs_pool_io import is_jsonl_pool, iter_pool, read_pool
 
 
 def load_json(path: str) -> Dict[str, Any]:
@@ -37,6 +38,23 @@ def load_json(path: str) -> Dict[str, Any]:
         return json.load(f)
 
 
+def normalize_journal_name(name: str) -> str:
+    """Trim and collapse internal whitespace runs to one space (cheap; no regex)."""
+    return " ".join((name or "").split())
+
+
+def journal_names(candidates: Iterable[Any]) -> Set[str]:
+    """Set of journal names over candidate dicts (any iterable, e.g. a streamed JSONL pool)."""
+    names = {c.get("journal") for c in candidates if isinstance(c, dict)}
+    names.discard(None)
+    return names
+
+
+def pool_journal_names(pool: Any) -> Set[str]:
+    """Set of candidate journal names in one pool (O(1) membership for validation)."""
+    return journal_names((pool.get("candidates") if isinstance(pool, dict) else []) or [])
+
+
 def validate_no_overlap(ai_output: Dict[str, Any]) -> List[str]:
     """Validate that easy/medium/hard selections do not overlap (same journal in multiple buckets)."""
     meta = ai_output.get("meta") if isinstance(ai_output, dict) else None
@@ -53,7 +71,7 @@ def validate_no_overlap(ai_output: Dict[str, Any]) -> List[str]:
         for idx, it in enumerate(items, 1):
             if not isinstance(it, dict):
                 continue
-            j = re.sub(r'\s+', ' ', (it.get("journal") or "").strip())
+            j = normalize_journal_name(it.get("journal"))
             if not j:
                 continue
             prev = seen.get(j)
@@ -64,8 +82,14 @@ def validate_no_overlap(ai_output: Dict[str, Any]) -> List[str]:
     return errors
 
 
-def validate_subset(candidate_pool: Dict[str, Any], ai_output: Dict[str, Any], topk: int) -> List[str]:
-    """Validate AI output against candidate pool with tri-mode requirements."""
+def validate_subset(
+    candidate_pool: Dict[str, Any], ai_output: Dict[str, Any], topk: int, *, pool_names: Optional[Set[str]] = None
+) -> List[str]:
+    """Validate AI output against candidate pool with tri-mode requirements.
+
+    `pool_names` is the journal-name set of a single pool collected by the caller (e.g.
+    streamed from a JSONL pool); `candidate_pool` is then not read.
+    """
     modes = ["easy", "medium", "hard"]
 
     # Allow passing ai_output.json directly as --candidate_pool_json when it embeds pools.
@@ -78,20 +102,22 @@ def validate_subset(candidate_pool: Dict[str, Any], ai_output: Dict[str, Any], t
             "medium": pools.get("medium") or {},
             "hard": pools.get("hard") or {},
         }
+        pool_names = None
 
     # Build allowed journals per mode (supports single-pool or per-mode pools)
-    if any(k in candidate_pool for k in modes):
-        allowed_by_bucket: Dict[str, set] = {}
+    if pool_names is not None:
+        allowed_by_bucket = {b: pool_names for b in modes}
+    elif any(k in candidate_pool for k in modes):
+        # A pool shared by several buckets is indexed once.
+        by_pool: Dict[int, Set[str]] = {}
+        allowed_by_bucket: Dict[str, Set[str]] = {}
         for bucket in modes:
-            pool = candidate_pool.get(bucket) or {}
-            cands = (pool.get("candidates") if isinstance(pool, dict) else []) or []
-            s = {c.get("journal") for c in cands if isinstance(c, dict)}
-            s.discard(None)
-            allowed_by_bucket[bucket] = s
+            pool = candidate_pool.get(bucket)
+            if id(pool) not in by_pool:
+                by_pool[id(pool)] = pool_journal_names(pool)
+            allowed_by_bucket[bucket] = by_pool[id(pool)]
     else:
-        cands = candidate_pool.get("candidates") or []
-        s = {c.get("journal") for c in cands if isinstance(c, dict)}
-        s.discard(None)
+        s = pool_journal_names(candidate_pool)
         allowed_by_bucket = {b: s for b in modes}
 
     errors: List[str] = []
@@ -128,14 +154,20 @@ def validate_subset(candidate_pool: Dict[str, Any], ai_output: Dict[str, Any], t
 
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--candidate_pool_json", required=True, help="候选池 JSON（绝对路径；可为单池或 easy/medium/hard 多池）")
+    ap.add_argument("--candidate_pool_json", required=True, help="候选池 JSON/JSONL（绝对路径；可为单池或 easy/medium/hard 多池）")
     ap.add_argument("--ai_output_json", required=True, help="AI 输出 JSON（绝对路径）")
     ap.add_argument("--topk", type=int, default=10, help="每个模式至少需要的条目数（默认 10）")
     args = ap.parse_args()
 
-    pool = load_json(os.path.abspath(args.candidate_pool_json))
+    pool_path = os.path.abspath(args.candidate_pool_json)
     out = load_json(os.path.abspath(args.ai_output_json))
-    errors = validate_subset(pool, out, topk=args.topk)
+    if is_jsonl_pool(pool_path):
+        # Only membership is needed: stream the names instead of loading the pool.
+        with iter_pool(pool_path) as (_meta, cands):
+            names = journal_names(cands)
+        errors = validate_subset({}, out, topk=args.topk, pool_names=names)
+    else:
+        errors = validate_subset(read_pool(pool_path), out, topk=args.topk)  # json / compact / multi-pool
     if errors:
         print("INVALID")
         for e in errors:
@@ -23,13 +23,25 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as _dt
+import hashlib
+import heapq
 import json
 import os
 import re
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+try:  # Optional: vectorized batch scoring (pure-Python fallback otherwise).
+    import numpy as _np
+except ImportError:  # pragma: no cover - depends on environment
+    _np = None
 
 from abs_paths import ajg_csv_default
+from abs_pool_io import POOL_FORMATS, write_pool
+from abs_report import ReportModel, TableSpec
+from abs_semantic import get_semantic_index
+from ajg_snapshot import open_fresh_snapshot, snapshot_path_for, write_snapshot
 
 DEFAULT_AJG_CSV = str(ajg_csv_default("2024"))
 
@@ -98,8 +110,43 @@ class PaperProfile:
     mode: str
 
 
+_JOURNAL_RAW_FIELDS = (
+    "field",
+    "title",
+    "ajg_2024",
+    "ajg_2021",
+    "citescore_rank",
+    "snip_rank",
+    "sjr_rank",
+    "jif_rank",
+    "sdg_pct",
+    "intl_pct",
+    "collab_pct",
+    "policy_value",
+)
+_JOURNAL_PARSED_FIELDS = (
+    "rating_level",
+    "rating_star",
+    "rank_ints",
+    "sdg_pct_value",
+    "intl_pct_value",
+    "collab_pct_value",
+    "policy_value_num",
+    "title_mask",
+    "md_cells",
+)
+
+
 @dataclass
 class JournalRow:
+    """One AJG core row.
+
+    The raw CSV strings are kept for display/export; numeric fields are parsed once at
+    load time (ranks, AJG 2024 rating level/star, percentages) so scoring never re-parses.
+    """
+
+    __slots__ = _JOURNAL_RAW_FIELDS + _JOURNAL_PARSED_FIELDS
+
     field: str
     title: str
     ajg_2024: str
@@ -113,6 +160,63 @@ class JournalRow:
     collab_pct: str
     policy_value: str
 
+    # Pre-parsed (derived) slots, filled by __post_init__/from_parsed; they are not
+    # dataclass fields, so init/eq/repr only cover the raw strings above:
+    # - rating_level: int, rating_star: bool (AJG 2024)
+    # - rank_ints: (citescore, snip, sjr, jif); missing ranks are 10**9 (see parse_rank_int)
+    # - sdg_pct_value / intl_pct_value / collab_pct_value / policy_value_num: float (NaN if missing)
+    # - title_mask: int, bit i set when the title matches TITLE_KEYWORD_GROUPS[i] (see title_rule_mask)
+    # - md_cells: Markdown-escaped raw strings, filled lazily by journal_md_cells (None until rendered)
+
+    def __post_init__(self) -> None:
+        self.rating_level, self.rating_star = parse_ajg_rating(self.ajg_2024)
+        self.rank_ints = (
+            parse_rank_int(self.citescore_rank),
+            parse_rank_int(self.snip_rank),
+            parse_rank_int(self.sjr_rank),
+            parse_rank_int(self.jif_rank),
+        )
+        self.sdg_pct_value = parse_pct_float(self.sdg_pct)
+        self.intl_pct_value = parse_pct_float(self.intl_pct)
+        self.collab_pct_value = parse_pct_float(self.collab_pct)
+        self.policy_value_num = parse_float(self.policy_value)
+        self.title_mask = title_rule_mask(self.title)
+        self.md_cells = None
+
+    @classmethod
+    def from_parsed(
+        cls,
+        raw: Tuple[str, ...],
+        *,
+        rating_code: int,
+        rank_ints: Tuple[int, int, int, int],
+        pct_values: Tuple[float, float, float, float],
+        title_mask: Optional[int] = None,
+    ) -> "JournalRow":
+        """Build a row from already-parsed values (snapshot loading) without re-parsing."""
+        row = cls.__new__(cls)
+        (
+            row.field,
+            row.title,
+            row.ajg_2024,
+            row.ajg_2021,
+            row.citescore_rank,
+            row.snip_rank,
+            row.sjr_rank,
+            row.jif_rank,
+            row.sdg_pct,
+            row.intl_pct,
+            row.collab_pct,
+            row.policy_value,
+        ) = raw
+        row.rating_level = 4 if rating_code == 5 else int(rating_code)
+        row.rating_star = rating_code == 5
+        row.rank_ints = rank_ints
+        row.sdg_pct_value, row.intl_pct_value, row.collab_pct_value, row.policy_value_num = pct_values
+        row.title_mask = title_rule_mask(row.title) if title_mask is None else title_mask
+        row.md_cells = None
+        return row
+
 
 def now_local_str() -> str:
     return _dt.datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -136,6 +240,10 @@ def parse_ajg_rating(r: str) -> Tuple[int, bool]:
 
 def easiness_score(ajg_2024: str) -> float:
     level, star = parse_ajg_rating(ajg_2024)
+    return easiness_from_rating(level, star)
+
+
+def easiness_from_rating(level: int, star: bool) -> float:
     base = {1: 4.0, 2: 3.0, 3: 2.0, 4: 1.0}.get(level, 1.0)
     if level == 4 and star:
         base -= 0.4
@@ -149,34 +257,185 @@ def domain_preference_bonus(paper: PaperProfile, journal: JournalRow) -> float:
     往前推一点，避免方法刊在高难度/中难度下过于靠前。
     """
     _ = paper
-    jt = normalize_text(journal.title)
-
-    # Define preference rules: (bonus, list of keywords)
-    rules = [
-        (0.4, ["trade", "tariff", "policy", "political economy", "public policy", "public"]),
-        (0.4, ["agric", "farm", "food"]),
-        (0.3, ["regional", "development", "urban", "spatial"]),
-        # Keep finance bonus small to avoid dominating non-finance papers
-        (0.2, ["finance", "bank", "credit", "microfinance", "money"]),
-    ]
+    return _domain_bonus_for_mask(journal.title_mask)
 
-    bonus = 0.0
-    for points, keywords in rules:
+
+# Preference rules for domain_preference_bonus: (bonus, title keywords)
+DOMAIN_PREFERENCE_RULES: List[Tuple[float, List[str]]] = [
+    (0.4, ["trade", "tariff", "policy", "political economy", "public policy", "public"]),
+    (0.4, ["agric", "farm", "food"]),
+    (0.3, ["regional", "development", "urban", "spatial"]),
+    # Keep finance bonus small to avoid dominating non-finance papers
+    (0.2, ["finance", "bank", "credit", "microfinance", "money"]),
+]
+
+
+class KeywordMatcher:
+    """Aho–Corasick 自动机：对一张关键词表只构建一次，单次扫描找出文本中出现的全部关键词。
+
+    语义与旧实现 ``k in text`` 逐词子串匹配完全一致（含重叠/包含关系的关键词），
+    但每篇论文只需扫描一遍文本，而不是对每本期刊重复 N 次子串查找。
+    """
+
+    def __init__(self, weights: Dict[str, float]) -> None:
+        self.weights: Dict[str, float] = dict(weights)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[str]] = [[]]
+        for kw in self.weights:
+            if not kw:
+                continue
+            node = 0
+            for ch in kw:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(kw)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if out[fail[nxt]]:
+                    out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        # "" in text is always True; keep that (odd but backward-compatible) behavior.
+        self._always = frozenset(k for k in self.weights if not k)
+
+    def find(self, text: str) -> FrozenSet[str]:
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set(self._always)
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.update(out[node])
+        return frozenset(hits)
+
+    def score(self, matched: FrozenSet[str]) -> float:
+        # Sum in keyword-table order so float totals are bit-identical to the old loop.
+        score = 0.0
+        for k, w in self.weights.items():
+            if k in matched:
+                score += w
+        return score
+
+
+# Journal-side fit rules: (paper_keywords, journal_title_keywords, bonus_score)
+FIT_TITLE_RULES: List[Tuple[List[str], List[str], float]] = [
+    (["agricultur", "agriculture", "food", "farm"], ["agric", "farm", "food"], 0.8),
+    (["trade", "tariff"], ["trade", "tariff"], 0.7),
+    (["policy", "public opinion", "attitudes", "beliefs"], ["policy", "public", "opinion"], 0.5),
+    (["development", "tfp", "productivity", "cluster", "spatial"], ["development"], 0.3),
+    (["wage", "minimum wage", "inequality", "gini", "labor", "employment"],
+     ["labor", "employment", "inequality", "wage"], 0.4),
+    (["microcredit", "credit", "loan", "bank", "interest rate", "apr"],
+     ["finance", "credit", "bank"], 0.4),
+]
+
+# Journal-title keyword groups, matched once per title when rows are loaded (or stored in
+# the snapshot) and kept as a bitmask on JournalRow.title_mask. Bit layout:
+#   [0, len(FIT_TITLE_RULES))            FIT_TITLE_RULES journal-side keywords (fit_score)
+#   next len(DOMAIN_PREFERENCE_RULES)    domain_preference_bonus rules
+#   then METHOD_HARD / METHOD_SOFT       method_heaviness_penalty
+METHOD_HARD_KEYWORDS = ["econometric", "econometrics", "statistic", "statistics", "method", "methods"]
+METHOD_SOFT_KEYWORDS = ["theory", "mathematical", "probability", "stochastic"]
+TITLE_KEYWORD_GROUPS: List[List[str]] = (
+    [j_keys for _p_keys, j_keys, _bonus in FIT_TITLE_RULES]
+    + [keywords for _points, keywords in DOMAIN_PREFERENCE_RULES]
+    + [METHOD_HARD_KEYWORDS, METHOD_SOFT_KEYWORDS]
+)
+_DOMAIN_BIT0 = len(FIT_TITLE_RULES)
+_METHOD_HARD_BIT = _DOMAIN_BIT0 + len(DOMAIN_PREFERENCE_RULES)
+_METHOD_SOFT_BIT = _METHOD_HARD_BIT + 1
+# Stored in the snapshot header; masks from a snapshot built with other groups are recomputed.
+TITLE_RULES_FINGERPRINT = hashlib.sha1(json.dumps(TITLE_KEYWORD_GROUPS).encode("utf-8")).hexdigest()[:16]
+
+
+def title_rule_mask(title: str) -> int:
+    jt = normalize_text(title)
+    mask = 0
+    for bit, keywords in enumerate(TITLE_KEYWORD_GROUPS):
         if any(k in jt for k in keywords):
-            bonus += points
+            mask |= 1 << bit
+    return mask
+
+
+_DOMAIN_BONUS_BY_MASK: Dict[int, float] = {}
 
+
+def _domain_bonus_for_mask(mask: int) -> float:
+    bonus = _DOMAIN_BONUS_BY_MASK.get(mask)
+    if bonus is None:
+        bonus = 0.0
+        for i, (points, _keywords) in enumerate(DOMAIN_PREFERENCE_RULES):
+            if mask >> (_DOMAIN_BIT0 + i) & 1:
+                bonus += points
+        _DOMAIN_BONUS_BY_MASK[mask] = bonus
     return bonus
 
 
-def keyword_score(paper: PaperProfile, journal: JournalRow) -> float:
+# profile -> (source keyword table, compiled matcher); rebuilt when get_keywords returns a new table.
+_KEYWORD_MATCHERS: Dict[str, Tuple[Dict[str, float], KeywordMatcher]] = {}
+
+
+def get_keyword_matcher(field: str, *, profile: str = "general") -> KeywordMatcher:
+    """Return the compiled matcher for a keyword profile (rebuilt only when the table changes)."""
+    keywords = get_keywords(field, profile=profile)
+    cached = _KEYWORD_MATCHERS.get(profile)
+    if cached is not None and cached[0] is keywords:
+        return cached[1]
+    matcher = KeywordMatcher(keywords)
+    _KEYWORD_MATCHERS[profile] = (keywords, matcher)
+    return matcher
+
+
+@dataclass(frozen=True)
+class PaperSignals:
+    """论文侧匹配结果：每次请求只计算一次，在所有期刊之间复用。"""
+
+    text: str
+    keyword_score: float
+    matched_keywords: FrozenSet[str]
+    # FIT_TITLE_RULES 中每条规则的论文侧条件是否命中（与规则顺序一一对应）。
+    fit_rule_hits: Tuple[bool, ...]
+    # 同上，按位编码（bit i <-> FIT_TITLE_RULES[i]），与 JournalRow.title_mask 按位与即得命中规则。
+    fit_rule_mask: int = 0
+
+
+def paper_signals(paper: PaperProfile, *, profile: Optional[str] = None) -> PaperSignals:
     text = normalize_text(paper.title + " " + paper.abstract)
+    matcher = get_keyword_matcher(paper.field, profile=profile or os.environ.get("ABS_PROFILE", "general"))
+    matched = matcher.find(text)
+    rule_hits = tuple(any(k in text for k in p_keys) for p_keys, _j, _b in FIT_TITLE_RULES)
+    return PaperSignals(
+        text=text,
+        keyword_score=matcher.score(matched),
+        matched_keywords=matched,
+        fit_rule_hits=rule_hits,
+        fit_rule_mask=sum(1 << i for i, hit in enumerate(rule_hits) if hit),
+    )
+
 
-    keywords = get_keywords(paper.field, profile=os.environ.get("ABS_PROFILE", "general"))
+def keyword_score(paper: PaperProfile, journal: JournalRow, signals: Optional[PaperSignals] = None) -> float:
+    if signals is None:
+        signals = paper_signals(paper)
 
-    score = 0.0
-    for k, w in keywords.items():
-        if k in text:
-            score += w
+    score = signals.keyword_score
 
     if journal.field in {"ECON", "IB&AREA", "PUB SEC"}:
         score += 0.5
@@ -184,15 +443,30 @@ def keyword_score(paper: PaperProfile, journal: JournalRow) -> float:
     return score
 
 
-def get_keywords(field: str, *, profile: str = "general") -> Dict[str, float]:
+def keyword_file_path(profile: str = "general") -> str:
     # Default local keyword file (offline).
     # - general: more generic econ keywords
     # - ling: personalized (trade/agri/RCT/etc.) tuned for the repo owner
     base = os.path.join(SKILL_ROOT, "assets", "keywords")
     if profile == "ling":
-        path = os.path.join(base, "econ_ling_trade_rct.json")
-    else:
-        path = os.path.join(base, "econ_general.json")
+        return os.path.join(base, "econ_ling_trade_rct.json")
+    return os.path.join(base, "econ_general.json")
+
+
+# Per-process keyword registry: profile -> ((path, mtime_ns, size), table).
+# A run reads each keyword file once; edits are picked up when the file stamp changes.
+_KEYWORD_CACHE: Dict[str, Tuple[Tuple[str, int, int], Dict[str, float]]] = {}
+
+
+def _file_stamp(path: str) -> Tuple[str, int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return path, -1, -1
+    return path, int(st.st_mtime_ns), int(st.st_size)
+
+
+def _read_keyword_file(path: str) -> Dict[str, float]:
     try:
         with open(path, "r", encoding="utf-8") as f:
             obj = json.load(f)
@@ -215,13 +489,42 @@ def get_keywords(field: str, *, profile: str = "general") -> Dict[str, float]:
     return {"trade": 1.0, "tariff": 1.5, "policy": 0.8, "survey": 0.8}
 
 
-def fit_score(paper: PaperProfile, journal: JournalRow) -> float:
+def get_keywords(field: str, *, profile: str = "general") -> Dict[str, float]:
+    """Return the keyword table for `profile` (memoized by file path + mtime).
+
+    The returned dict is shared across callers; treat it as read-only.
+    """
+    _ = field
+    stamp = _file_stamp(keyword_file_path(profile))
+    cached = _KEYWORD_CACHE.get(profile)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    table = _read_keyword_file(stamp[0])
+    _KEYWORD_CACHE[profile] = (stamp, table)
+    return table
+
+
+def invalidate_keyword_cache(profile: Optional[str] = None) -> None:
+    """Drop cached keyword tables/matchers (all profiles when `profile` is None)."""
+    if profile is None:
+        _KEYWORD_CACHE.clear()
+        _KEYWORD_MATCHERS.clear()
+        return
+    _KEYWORD_CACHE.pop(profile, None)
+    _KEYWORD_MATCHERS.pop(profile, None)
+
+
+def fit_score(paper: PaperProfile, journal: JournalRow, signals: Optional[PaperSignals] = None) -> float:
     """主题贴合分（离线、可解释）。
 
     当前版本直接复用 keyword_score 的逻辑作为 V1 实现，后续可在不破坏
     gating/排序框架的前提下迭代（例如外置词表、引入短语优先等）。
+
+    `signals` 为论文侧预计算结果（见 paper_signals）；批量打分时应在请求开始时计算一次并传入。
     """
-    base = keyword_score(paper, journal)
+    if signals is None:
+        signals = paper_signals(paper)
+    base = keyword_score(paper, journal, signals)
 
     # Align with prior behavior: ECON/IB&AREA/PUB SEC 等领域在 keyword_score 中会有 +0.5 先验。
     # topic-fit gating 的初版实现需要把这部分包含进 fit_score，否则会出现“表格 fit 分与 gating 打分不一致”的混乱。
@@ -229,26 +532,13 @@ def fit_score(paper: PaperProfile, journal: JournalRow) -> float:
 
     # Journal-side proxies SHOULD NOT dominate: only apply when the paper itself
     # clearly indicates a related topic (to avoid pushing agri/trade journals for microcredit/min-wage, etc.).
-    paper_text = normalize_text(paper.title + " " + paper.abstract)
-    jt = normalize_text(journal.title)
-
-    # Rules: (paper_keywords, journal_keywords, bonus_score)
-    rules = [
-        (["agricultur", "agriculture", "food", "farm"], ["agric", "farm", "food"], 0.8),
-        (["trade", "tariff"], ["trade", "tariff"], 0.7),
-        (["policy", "public opinion", "attitudes", "beliefs"], ["policy", "public", "opinion"], 0.5),
-        (["development", "tfp", "productivity", "cluster", "spatial"], ["development"], 0.3),
-        (["wage", "minimum wage", "inequality", "gini", "labor", "employment"],
-         ["labor", "employment", "inequality", "wage"], 0.4),
-        (["microcredit", "credit", "loan", "bank", "interest rate", "apr"],
-         ["finance", "credit", "bank"], 0.4),
-    ]
-
+    # Title-side matches are precomputed in journal.title_mask (bit i <-> FIT_TITLE_RULES[i]).
     journal_bonus = 0.0
-    for p_keys, j_keys, bonus in rules:
-        apply_rule = any(k in paper_text for k in p_keys)
-        if apply_rule and any(k in jt for k in j_keys):
-            journal_bonus += bonus
+    hits = journal.title_mask & signals.fit_rule_mask
+    if hits:
+        for bit, (_p_keys, _j_keys, bonus) in enumerate(FIT_TITLE_RULES):
+            if hits >> bit & 1:
+                journal_bonus += bonus
 
     return base + field_bonus + journal_bonus
 
@@ -261,12 +551,10 @@ def method_heaviness_penalty(paper: PaperProfile, journal: JournalRow) -> float:
     """
 
     _ = paper
-    jt = normalize_text(journal.title)
-    hard = ["econometric", "econometrics", "statistic", "statistics", "method", "methods"]
-    soft = ["theory", "mathematical", "probability", "stochastic"]
-    if any(k in jt for k in hard):
+    mask = journal.title_mask
+    if mask >> _METHOD_HARD_BIT & 1:
         return 0.8
-    if any(k in jt for k in soft):
+    if mask >> _METHOD_SOFT_BIT & 1:
         return 0.4
     return 0.0
 
@@ -280,8 +568,7 @@ def parse_rank_int(s: str) -> int:
 
 def prestige_penalty(journal: JournalRow) -> float:
     penalties = []
-    for r in [journal.citescore_rank, journal.snip_rank, journal.sjr_rank, journal.jif_rank]:
-        v = parse_rank_int(r)
+    for v in journal.rank_ints:
         if v <= 10:
             penalties.append(1.2)
         elif v <= 30:
@@ -293,70 +580,403 @@ def prestige_penalty(journal: JournalRow) -> float:
 
 def value_score(ajg_2024: str) -> float:
     level, star = parse_ajg_rating(ajg_2024)
+    return value_from_rating(level, star)
+
+
+def value_from_rating(level: int, star: bool) -> float:
     score = {1: 1.0, 2: 2.0, 3: 3.0, 4: 4.0}.get(level, 1.0)
     if level == 4 and star:
         score += 0.2
     return score
 
 
-def total_score(paper: PaperProfile, journal: JournalRow) -> Dict[str, float]:
+# Mode weights as ordered (component, weight) terms. Terms are accumulated left to right,
+# which keeps totals bit-identical to the original hand-written formulas.
+MODE_WEIGHTS: Dict[str, List[Tuple[str, float]]] = {
+    # easy: 投稿难度最低（更稳妥/门槛更低）
+    "easy": [("easy", 10.0), ("fit", 0.1), ("prestige_pen", -0.6), ("method_pen", -0.6), ("domain", 1.0)],
+    # medium: 中等难度（折中）
+    "medium": [
+        ("fit", 6.0),
+        ("easy", 6.0),
+        ("value", 2.0),
+        ("prestige_pen", -0.6),
+        ("method_pen", -0.8),
+        ("domain", 2.0),
+    ],
+    # hard: 投稿难度最高（更偏高门槛/更“冲刺”）
+    "hard": [("value", 10.0), ("fit", 0.2), ("prestige_pen", -0.8), ("method_pen", -0.8), ("domain", 2.0)],
+}
+
+
+def mode_weights(mode: str) -> List[Tuple[str, float]]:
+    # Unknown modes fall back to hard (matches the original if/elif/else).
+    return MODE_WEIGHTS.get(mode) or MODE_WEIGHTS["hard"]
+
+
+def total_score(
+    paper: PaperProfile, journal: JournalRow, signals: Optional[PaperSignals] = None
+) -> Dict[str, float]:
     """Compute per-journal scores inside the topic-fit gated candidate pool.
 
     New semantics:
     - easy: 投稿难度最低（更稳妥/门槛更低）
     - medium: 中等难度（折中）
     - hard: 投稿难度最高（更偏高门槛/更“冲刺”）
+
+    For many journals at once prefer score_batch(), which yields the same numbers.
     """
 
     # Note: topic-fit gating happens before calling this function.
-    f = fit_score(paper, journal)
-    e = easiness_score(journal.ajg_2024)
-    v = value_score(journal.ajg_2024)
-    p = prestige_penalty(journal)
-    m = method_heaviness_penalty(paper, journal)
-    d = domain_preference_bonus(paper, journal)
+    comps = {
+        "fit": fit_score(paper, journal, signals),
+        "easy": easiness_from_rating(journal.rating_level, journal.rating_star),
+        "value": value_from_rating(journal.rating_level, journal.rating_star),
+        "prestige_pen": prestige_penalty(journal),
+        "method_pen": method_heaviness_penalty(paper, journal),
+        "domain": domain_preference_bonus(paper, journal),
+    }
+
+    total = 0.0
+    for name, w in mode_weights(paper.mode):
+        total += w * comps[name]
+
+    return {
+        "total": total,
+        "easy": comps["easy"],
+        "value": comps["value"],
+        "fit": comps["fit"],
+        "prestige_pen": comps["prestige_pen"],
+        "method_pen": comps["method_pen"],
+    }
+
+
+# journals -> 论文与各期刊的语义相似度（同顺序）；由 semantic_scorer() 构造。
+SemanticScorer = Callable[[List[JournalRow]], Sequence[float]]
+
+
+class ScoreVectors:
+    """Component scores for a list of journals, one array per component.
 
-    if paper.mode == "easy":
-        total = (10.0 * e) + (0.1 * f) - (0.6 * p) - (0.6 * m) + (1.0 * d)
-    elif paper.mode == "medium":
-        total = (6.0 * f) + (6.0 * e) + (2.0 * v) - (0.6 * p) - (0.8 * m) + (2.0 * d)
-    else:  # hard
-        total = (10.0 * v) + (0.2 * f) - (0.8 * p) - (0.8 * m) + (2.0 * d)
+    Components are mode-independent; `total(mode)` is a cheap linear combination over
+    the same vectors, so easy/medium/hard can all be ranked from one scoring pass.
+    Arrays are NumPy float64 when NumPy is available, plain lists otherwise.
+    """
+
+    COMPONENTS = ("fit", "easy", "value", "prestige_pen", "method_pen", "domain")
+
+    def __init__(
+        self, journals: List[JournalRow], components: Dict[str, List[float]], *, semantic_weight: float = 0.0
+    ) -> None:
+        self.journals = journals
+        # 语义分量（abs_semantic.py）可选：权重为 0 时既不存储也不参与 total，默认输出逐位不变。
+        self.semantic_weight = float(semantic_weight)
+        self.names: Tuple[str, ...] = self.COMPONENTS + (("semantic",) if self.semantic_weight else ())
+        self.components: Dict[str, Sequence[float]] = {}
+        for name in self.names:
+            values = components[name]
+            self.components[name] = _np.asarray(values, dtype=_np.float64) if _np is not None else list(values)
+        self._totals: Dict[str, Sequence[float]] = {}
+        self._positions: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.journals)
+
+    def total(self, mode: str) -> Sequence[float]:
+        cached = self._totals.get(mode)
+        if cached is not None:
+            return cached
+        terms = mode_weights(mode)
+        if self.semantic_weight:
+            terms = list(terms) + [("semantic", self.semantic_weight)]
+        if _np is not None:
+            acc = _np.zeros(len(self.journals), dtype=_np.float64)
+            for name, w in terms:
+                acc = acc + w * self.components[name]
+            out: Sequence[float] = acc
+        else:
+            acc_list = [0.0] * len(self.journals)
+            for name, w in terms:
+                col = self.components[name]
+                acc_list = [a + w * x for a, x in zip(acc_list, col)]
+            out = acc_list
+        self._totals[mode] = out
+        return out
+
+    def row(self, i: int, mode: str) -> Dict[str, float]:
+        """Per-journal score dict in the same shape as total_score()."""
+        c = self.components
+        out = {
+            "total": float(self.total(mode)[i]),
+            "easy": float(c["easy"][i]),
+            "value": float(c["value"][i]),
+            "fit": float(c["fit"][i]),
+            "prestige_pen": float(c["prestige_pen"][i]),
+            "method_pen": float(c["method_pen"][i]),
+        }
+        if self.semantic_weight:
+            out["semantic"] = float(c["semantic"][i])
+        return out
 
-    return {"total": total, "easy": e, "value": v, "fit": f, "prestige_pen": p, "method_pen": m}
+    def _position_map(self) -> Dict[int, int]:
+        if self._positions is None:
+            self._positions = {id(j): i for i, j in enumerate(self.journals)}
+        return self._positions
+
+    def missing(self, journals: List[JournalRow]) -> List[JournalRow]:
+        """Journals of `journals` that have no component scores in these vectors."""
+        positions = self._position_map()
+        return [j for j in journals if id(j) not in positions]
+
+    @classmethod
+    def concat(cls, a: "ScoreVectors", b: "ScoreVectors") -> "ScoreVectors":
+        comps = {name: list(a.components[name]) + list(b.components[name]) for name in a.names}
+        return cls(a.journals + b.journals, comps, semantic_weight=a.semantic_weight)
+
+    def take(self, journals: List[JournalRow]) -> "ScoreVectors":
+        """Sub-vectors for `journals` (which must be a subset of self.journals) without re-scoring."""
+        positions = self._position_map()
+        idx = [positions[id(j)] for j in journals]
+        if _np is not None:
+            sel = _np.asarray(idx, dtype=_np.intp)
+            comps = {name: self.components[name][sel] for name in self.names}
+        else:
+            comps = {name: [self.components[name][i] for i in idx] for name in self.names}
+        return ScoreVectors(list(journals), comps, semantic_weight=self.semantic_weight)
+
+    def ranked(self, mode: str) -> List[Tuple[JournalRow, Dict[str, float]]]:
+        """(journal, scores) sorted by total desc (stable, like the per-journal path)."""
+        totals = self.total(mode)
+        if _np is not None:
+            # Stable ascending sort of -total keeps ties in input order, like sorted(reverse=True).
+            order: Sequence[int] = _np.argsort(-totals, kind="stable").tolist()
+        else:
+            order = sorted(range(len(self.journals)), key=lambda i: totals[i], reverse=True)
+        return [(self.journals[i], self.row(i, mode)) for i in order]
 
 
-def load_ajg_csv(path: str) -> List[JournalRow]:
+def score_batch(
+    paper: PaperProfile,
+    journals: List[JournalRow],
+    *,
+    signals: Optional[PaperSignals] = None,
+    fit: Optional[Sequence[float]] = None,
+    semantic: Optional[SemanticScorer] = None,
+    semantic_weight: float = 0.0,
+) -> ScoreVectors:
+    """Compute all mode-independent score components for `journals` in one pass.
+
+    `fit` may carry fit scores already computed during gating (same order as `journals`).
+    With a non-zero `semantic_weight`, `semantic` (see abs_semantic.py) scores all journals
+    in one vectorised call and the result is blended into the totals.
+    """
+    if signals is None:
+        signals = paper_signals(paper)
+    comps: Dict[str, List[float]] = {name: [] for name in ScoreVectors.COMPONENTS}
+    fit_col, easy_col, value_col = comps["fit"], comps["easy"], comps["value"]
+    prest_col, method_col, domain_col = comps["prestige_pen"], comps["method_pen"], comps["domain"]
+    for idx, j in enumerate(journals):
+        fit_col.append(float(fit[idx]) if fit is not None else fit_score(paper, j, signals))
+        easy_col.append(easiness_from_rating(j.rating_level, j.rating_star))
+        value_col.append(value_from_rating(j.rating_level, j.rating_star))
+        prest_col.append(prestige_penalty(j))
+        method_col.append(method_heaviness_penalty(paper, j))
+        domain_col.append(domain_preference_bonus(paper, j))
+    if semantic_weight:
+        if semantic is None:
+            raise RuntimeError("semantic_weight 非 0 时必须提供语义打分器")
+        comps["semantic"] = list(semantic(journals))
+    return ScoreVectors(journals, comps, semantic_weight=semantic_weight)
+
+
+# JournalRow attribute -> AJG core CSV header.
+AJG_CSV_COLUMNS: List[Tuple[str, str]] = [
+    ("field", "Field"),
+    ("title", "Journal Title"),
+    ("ajg_2024", "AJG 2024"),
+    ("ajg_2021", "AJG 2021"),
+    ("citescore_rank", "Citescore rank"),
+    ("snip_rank", "SNIP rank"),
+    ("sjr_rank", "SJR rank"),
+    ("jif_rank", "JIF rank"),
+    ("sdg_pct", "SDG content indicator (2017-21)"),
+    ("intl_pct", "International co-authorship (2017-21)"),
+    ("collab_pct", "Academic-non-academic collaboration (2017-21)"),
+    ("policy_value", "Citations in policy documents (2017-21)"),
+]
+
+RANK_ATTRS = ["citescore_rank", "snip_rank", "sjr_rank", "jif_rank"]
+# Snapshot float columns: attribute -> JournalRow pre-parsed attribute.
+NUM_ATTRS = [
+    ("sdg_pct", "sdg_pct_value"),
+    ("intl_pct", "intl_pct_value"),
+    ("collab_pct", "collab_pct_value"),
+    ("policy_value", "policy_value_num"),
+]
+
+
+def rating_code(r: str) -> int:
+    """AJG rating as a compact integer code: 0=未评级, 1..4, 5=4*（与 AJG 原始数据一致）。"""
+    level, star = parse_ajg_rating(r)
+    return 5 if (level == 4 and star) else level
+
+
+def parse_float(s: str) -> float:
+    try:
+        return float((s or "").strip())
+    except Exception:
+        return float("nan")
+
+
+def parse_pct_float(s: str) -> float:
+    return parse_float((s or "").strip().rstrip("%"))
+
+
+def _resolve_ajg_csv_path(path: str) -> str:
     # Accept both absolute and relative paths.
     # Relative paths are resolved against this repo/skill root for portability.
     if not os.path.isabs(path):
         path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", path))
     if not os.path.exists(path):
         raise RuntimeError(f"AJG CSV 不存在: {path}")
+    return path
+
 
+def _parse_ajg_csv(path: str) -> List[JournalRow]:
     with open(path, "r", encoding="utf-8", newline="") as f:
         r = csv.DictReader(f)
         rows = []
         for row in r:
-            rows.append(
-                JournalRow(
-                    field=(row.get("Field") or "").strip(),
-                    title=(row.get("Journal Title") or "").strip(),
-                    ajg_2024=(row.get("AJG 2024") or "").strip(),
-                    ajg_2021=(row.get("AJG 2021") or "").strip(),
-                    citescore_rank=(row.get("Citescore rank") or "").strip(),
-                    snip_rank=(row.get("SNIP rank") or "").strip(),
-                    sjr_rank=(row.get("SJR rank") or "").strip(),
-                    jif_rank=(row.get("JIF rank") or "").strip(),
-                    sdg_pct=(row.get("SDG content indicator (2017-21)") or "").strip(),
-                    intl_pct=(row.get("International co-authorship (2017-21)") or "").strip(),
-                    collab_pct=(row.get("Academic-non-academic collaboration (2017-21)") or "").strip(),
-                    policy_value=(row.get("Citations in policy documents (2017-21)") or "").strip(),
-                )
-            )
+            rows.append(JournalRow(**{attr: (row.get(col) or "").strip() for attr, col in AJG_CSV_COLUMNS}))
         return rows
 
 
+def write_ajg_snapshot(csv_path: str, rows: Optional[List[JournalRow]] = None) -> str:
+    """Compile the AJG core CSV into a columnar snapshot next to it (see ajg_snapshot.py).
+
+    Besides the raw string columns, the snapshot stores parsed integer ranks, rating
+    codes, percentages and title rule masks so loaders never have to re-parse them.
+    """
+    csv_path = _resolve_ajg_csv_path(csv_path)
+    if rows is None:
+        rows = _parse_ajg_csv(csv_path)
+    columns: List[Tuple[str, str, List[object]]] = []
+    for attr, _col in AJG_CSV_COLUMNS:
+        columns.append((attr, "str", [getattr(j, attr) for j in rows]))
+    columns.append(("ajg_2024_code", "i32", [rating_code(j.ajg_2024) for j in rows]))
+    columns.append(("ajg_2021_code", "i32", [rating_code(j.ajg_2021) for j in rows]))
+    for idx, attr in enumerate(RANK_ATTRS):
+        columns.append((attr + "_int", "i32", [j.rank_ints[idx] for j in rows]))
+    for attr, parsed_attr in NUM_ATTRS:
+        columns.append((attr + "_float", "f64", [getattr(j, parsed_attr) for j in rows]))
+    columns.append(("title_rule_mask", "i32", [j.title_mask for j in rows]))
+    return write_snapshot(
+        snapshot_path_for(csv_path),
+        source_csv=csv_path,
+        row_count=len(rows),
+        columns=columns,
+        extra={"title_rules": TITLE_RULES_FINGERPRINT},
+    )
+
+
+def _rows_from_snapshot(snap) -> List[JournalRow]:
+    raw = zip(*[snap.strings(attr) for attr, _col in AJG_CSV_COLUMNS])
+    codes = list(snap.numbers("ajg_2024_code"))
+    ranks = zip(*[list(snap.numbers(attr + "_int")) for attr in RANK_ATTRS])
+    nums = zip(*[list(snap.numbers(attr + "_float")) for attr, _parsed in NUM_ATTRS])
+    masks = list(snap.numbers("title_rule_mask"))
+    return [
+        JournalRow.from_parsed(values, rating_code=code, rank_ints=rank, pct_values=num, title_mask=mask)
+        for values, code, rank, num, mask in zip(raw, codes, ranks, nums, masks)
+    ]
+
+
+class ScopePartition:
+    """一个 Field 白名单下的候选期刊（保持 CSV 行序）及其按星级分组的下标。"""
+
+    __slots__ = ("journals", "by_rating")
+
+    def __init__(self, journals: List[JournalRow], by_rating: Dict[str, List[int]]) -> None:
+        self.journals = journals
+        self.by_rating = by_rating
+
+
+class CatalogIndex:
+    """AJG 目录的 Field → 星级（ajg_2024）→ 行下标 分区。
+
+    每份加载结果只建一次：Field 白名单过滤变成若干下标列表的并集，已知 Field 校验直接查
+    `known_fields`；同一白名单的 ScopePartition 会被缓存（批量/常驻服务的后续论文直接复用）。
+    """
+
+    def __init__(self, rows: Sequence[JournalRow]) -> None:
+        self.rows = rows
+        self.by_field: Dict[str, Dict[str, List[int]]] = {}
+        for i, r in enumerate(rows):
+            self.by_field.setdefault(r.field, {}).setdefault((r.ajg_2024 or "").strip(), []).append(i)
+        self.known_fields: FrozenSet[str] = frozenset(f for f in self.by_field if (f or "").strip())
+        self._scopes: Dict[Tuple[str, ...], ScopePartition] = {}
+
+    def scope(self, fields: Sequence[str]) -> ScopePartition:
+        key = tuple(sorted(set(fields)))
+        part = self._scopes.get(key)
+        if part is None:
+            labelled = sorted(
+                (i, rating) for f in key for rating, idx in self.by_field.get(f, {}).items() for i in idx
+            )
+            by_rating: Dict[str, List[int]] = {}
+            for pos, (_i, rating) in enumerate(labelled):
+                by_rating.setdefault(rating, []).append(pos)
+            part = ScopePartition([self.rows[i] for i, _r in labelled], by_rating)
+            self._scopes[key] = part
+        return part
+
+
+class JournalCatalog(list):
+    """load_ajg_csv() 的返回值：JournalRow 列表 + 惰性构建的 CatalogIndex（视为只读）。"""
+
+    _partitions: Optional[CatalogIndex] = None
+
+    @property
+    def partitions(self) -> CatalogIndex:
+        if self._partitions is None:
+            self._partitions = CatalogIndex(self)
+        return self._partitions
+
+
+def catalog_index(rows: Sequence[JournalRow]) -> CatalogIndex:
+    """已加载目录复用其分区；普通列表（切片、测试数据等）则现建一份。"""
+    if isinstance(rows, JournalCatalog):
+        return rows.partitions
+    return CatalogIndex(rows)
+
+
+def load_ajg_csv(path: str, *, use_snapshot: bool = True) -> List[JournalRow]:
+    """Load AJG core rows, preferring the compiled snapshot when it is fresh.
+
+    Falls back to parsing the CSV when the snapshot is missing/stale/corrupt or was built
+    with different TITLE_KEYWORD_GROUPS, and then (best-effort) rewrites the snapshot so
+    the next run can skip CSV parsing. The rows come back as a JournalCatalog, whose
+    field/rating partitions are built on first use and then shared by every paper.
+    """
+    path = _resolve_ajg_csv_path(path)
+
+    if use_snapshot:
+        snap = open_fresh_snapshot(path)
+        if snap is not None:
+            with snap:
+                # Snapshots built with other title keyword groups carry stale masks: rebuild.
+                if snap.extra.get("title_rules") == TITLE_RULES_FINGERPRINT:
+                    return JournalCatalog(_rows_from_snapshot(snap))
+
+    rows = JournalCatalog(_parse_ajg_csv(path))
+    if use_snapshot:
+        try:
+            write_ajg_snapshot(path, rows)
+        except OSError:
+            pass
+    return rows
+
+
 def parse_field_scope(raw: str) -> List[str]:
     # NOTE:
     # AJG CSV 的 Field 列里存在带逗号的单个 Field 值，例如：
@@ -478,38 +1098,55 @@ def apply_rating_mix(
     return out
 
 
-def render_report(
+_REPORT_TABLE = TableSpec(
+    [
+        "Field", "Journal", "AJG 2024", "AJG 2021", "FitScore", "EasyScore", "ValueScore", "PrestigePen",
+        "Citescore", "SNIP", "SJR", "JIF", "SDG", "Intl", "Collab", "Policy", "理由(简)",
+    ],
+    "llll" + "r" * 12 + "l",
+    escape=md_escape,
+)
+
+
+def journal_md_cells(j: JournalRow) -> Tuple[str, ...]:
+    """Markdown-escaped raw fields of `j` (field order of _JOURNAL_RAW_FIELDS), cached on the row.
+
+    Rows are shared across papers/modes, so a multi-paper batch escapes each journal once.
+    """
+    cells = j.md_cells
+    if cells is None:
+        cells = j.md_cells = tuple(md_escape(getattr(j, f)) for f in _JOURNAL_RAW_FIELDS)
+    return cells
+
+
+def report_model(
     paper: PaperProfile,
     ranked: List[Tuple[JournalRow, Dict[str, float]]],
     topk: int,
     *,
     gating_meta: Optional[GatingMeta] = None,
-) -> str:
-    lines: List[str] = []
-    lines.append("# 投稿期刊推荐（基于AJG目录）")
-    lines.append("")
-    lines.append(f"- 生成时间：{now_local_str()}")
-    lines.append(f"- 论文领域：{paper.field}")
-    lines.append(f"- 难度：{paper.mode}")
-    lines.append("")
-    lines.append("## 论文信息")
-    lines.append("")
-    lines.append(f"- 标题：{paper.title}")
-    if paper.abstract:
-        lines.append(f"- 摘要：{paper.abstract}")
-    lines.append("")
+) -> ReportModel:
+    """Intermediate model of the per-mode report (see abs_report; render_report renders it)."""
+    model = ReportModel()
+    model.heading("投稿期刊推荐（基于AJG目录）", 1)
+    model.lines([f"生成时间：{now_local_str()}", f"论文领域：{paper.field}", f"难度：{paper.mode}"])
+    model.heading("论文信息")
+    model.lines([f"标题：{paper.title}"] + ([f"摘要：{paper.abstract}"] if paper.abstract else []))
 
     if gating_meta is not None:
-        lines.append("## 候选集（主题贴合）")
-        lines.append("")
+        model.heading("候选集（主题贴合）")
+        items: List[str] = []
         if isinstance(getattr(gating_meta, "field_scope_effective", None), list):
-            lines.append(f"- 候选 Field：{', '.join(getattr(gating_meta, 'field_scope_effective'))}")
-        lines.append(f"- 策略：{gating_meta.strategy}")
-        lines.append(f"- 候选集大小：{gating_meta.total_candidates_after}（筛选前：{gating_meta.total_candidates_before}）")
-        lines.append(f"- 目标候选 TopN：{gating_meta.candidate_topn}")
-        lines.append(f"- 最小候选数：{gating_meta.min_candidates}")
-        lines.append(f"- 是否触发回退：{'是' if gating_meta.fallback_used else '否'}")
-        lines.append("")
+            items.append(f"候选 Field：{', '.join(getattr(gating_meta, 'field_scope_effective'))}")
+        items += [
+            f"策略：{gating_meta.strategy}",
+            f"候选集大小：{gating_meta.total_candidates_after}（筛选前：{gating_meta.total_candidates_before}）",
+            f"目标候选 TopN：{gating_meta.candidate_topn}",
+            f"最小候选数：{gating_meta.min_candidates}",
+            f"是否触发回退：{'是' if gating_meta.fallback_used else '否'}",
+            f"重新打分期刊数：{getattr(gating_meta, 'rescored', 0)}（回退扩容/星级过滤复用首轮分数）",
+        ]
+        model.lines(items)
 
     # Keep only topk for output, but preserve global ordering inside each AJG bucket.
     # Also apply a small rating-mix rule so easy/medium feel more layered.
@@ -527,67 +1164,59 @@ def render_report(
     for bucket in ordered_buckets:
         if bucket not in buckets:
             continue
-        lines.append(f"## {bucket}")
-        lines.append("")
-        lines.append(
-            "| Field | Journal | AJG 2024 | AJG 2021 | FitScore | EasyScore | ValueScore | PrestigePen | Citescore | SNIP | SJR | JIF | SDG | Intl | Collab | Policy | 理由(简) |"
-        )
-        lines.append("|---|---|---|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---|")
+        model.heading(bucket)
+        table = model.table(_REPORT_TABLE)
         for j, s in buckets[bucket]:
             reason = []
             if s["fit"] >= 2.0:
                 reason.append("主题匹配")
             if s["easy"] >= 3.0:
                 reason.append("相对易")
-            try:
-                if j.policy_value and float(j.policy_value or 0) > 1:
-                    reason.append("政策相关度高")
-            except Exception:
-                pass
+            if j.policy_value_num > 1:
+                reason.append("政策相关度高")
             if not reason:
                 reason.append("备选")
 
-            lines.append(
-                "| "
-                + " | ".join(
-                    [
-                        md_escape(j.field),
-                        md_escape(j.title),
-                        md_escape(j.ajg_2024),
-                        md_escape(j.ajg_2021),
-                        md_escape(f"{s.get('fit', 0.0):.2f}"),
-                        md_escape(f"{s.get('easy', 0.0):.2f}"),
-                        md_escape(f"{s.get('value', 0.0):.2f}"),
-                        md_escape(f"{s.get('prestige_pen', 0.0):.2f}"),
-                        md_escape(j.citescore_rank),
-                        md_escape(j.snip_rank),
-                        md_escape(j.sjr_rank),
-                        md_escape(j.jif_rank),
-                        md_escape(j.sdg_pct),
-                        md_escape(j.intl_pct),
-                        md_escape(j.collab_pct),
-                        md_escape(j.policy_value),
-                        md_escape("/".join(reason)),
-                    ]
-                )
-                + " |"
+            # Scores are plain numbers and reasons are fixed labels: neither needs escaping.
+            scores = (
+                f"{s.get('fit', 0.0):.2f}",
+                f"{s.get('easy', 0.0):.2f}",
+                f"{s.get('value', 0.0):.2f}",
+                f"{s.get('prestige_pen', 0.0):.2f}",
+            )
+            why = "/".join(reason)
+            md = journal_md_cells(j)
+            table.add(
+                (j.field, j.title, j.ajg_2024, j.ajg_2021) + scores
+                + (j.citescore_rank, j.snip_rank, j.sjr_rank, j.jif_rank, j.sdg_pct, j.intl_pct, j.collab_pct, j.policy_value, why),
+                md[:4] + scores + md[4:] + (why,),
             )
-        lines.append("")
 
-    lines.append("## 说明")
-    lines.append("")
-    lines.append("- 本推荐仅基于本地AJG核心目录字段与摘要关键词匹配，不包含外网审稿周期/版面费/投稿偏好等信息。")
+    notes = ["本推荐仅基于本地AJG核心目录字段与摘要关键词匹配，不包含外网审稿周期/版面费/投稿偏好等信息。"]
     if paper.mode in {"easy", "medium"}:
-        lines.append("- 为增强层次感：在同一难度的星级桶内，系统会“尽量”混入更高一档星级（easy 尝试包含少量 2；medium 尝试包含少量 3）。若主题贴合候选不足，则可能无法满足。")
+        notes.append("为增强层次感：在同一难度的星级桶内，系统会“尽量”混入更高一档星级（easy 尝试包含少量 2；medium 尝试包含少量 3）。若主题贴合候选不足，则可能无法满足。")
     if gating_meta is not None:
-        lines.append(
-            f"- 已对所有模式启用“主题贴合候选集”前置筛选（策略：{gating_meta.strategy}；候选：{gating_meta.total_candidates_after}/{gating_meta.total_candidates_before}；回退：{'是' if gating_meta.fallback_used else '否'}）。"
+        notes.append(
+            f"已对所有模式启用“主题贴合候选集”前置筛选（策略：{gating_meta.strategy}；候选：{gating_meta.total_candidates_after}/{gating_meta.total_candidates_before}；回退：{'是' if gating_meta.fallback_used else '否'}）。"
         )
     if not paper.abstract:
-        lines.append("- 你未提供摘要：主题贴合判断可信度会降低；建议补充摘要/引言或更具体的关键词以获得更稳健的候选集。")
-    lines.append("- 如果你希望更精准（例如更聚焦农业经济/贸易政策/政治经济学子领域），建议补充引言或JEL分类。")
+        notes.append("你未提供摘要：主题贴合判断可信度会降低；建议补充摘要/引言或更具体的关键词以获得更稳健的候选集。")
+    notes.append("如果你希望更精准（例如更聚焦农业经济/贸易政策/政治经济学子领域），建议补充引言或JEL分类。")
+    model.heading("说明")
+    model.lines(notes)
+    return model
+
 
-    return "\n".join(lines)
+def render_report(
+    paper: PaperProfile,
+    ranked: List[Tuple[JournalRow, Dict[str, float]]],
+    topk: int,
+    *,
+    gating_meta: Optional[GatingMeta] = None,
+    fmt: str = "md",
+) -> str:
+    """Render the per-mode report; `fmt` is one of abs_report.REPORT_FORMATS (default Markdown)."""
+    return report_model(paper, ranked, topk, gating_meta=gating_meta).render(fmt)
 
 
 def stable_journal_id(j: JournalRow) -> str:
@@ -695,45 +1324,44 @@ def _estimate_balanced_pool_size(
     return max(int(min_pool_size), min(int(max_pool_size), int(target)))
 
 
-def rebalance_by_rating_quota(
-    ranked: List[Tuple[JournalRow, Dict[str, float]]],
+def _best_effort_quota(target_n: int, allowed_ratings: List[str], available_by_rating: Dict[str, int]) -> Dict[str, int]:
+    """Equal share capped by availability; the remainder goes round-robin (allowed_ratings order)
+    to ratings that still have spare capacity. Whole rounds are applied in bulk, so this is O(k)."""
+    quota: Dict[str, int] = {r: min(target_n // len(allowed_ratings), available_by_rating[r]) for r in allowed_ratings}
+    remain = target_n - sum(quota.values())
+    while remain > 0:
+        spare = [r for r in allowed_ratings if quota[r] < available_by_rating[r]]
+        if not spare:
+            break
+        rounds = min(remain // len(spare), min(available_by_rating[r] - quota[r] for r in spare))
+        if rounds == 0:
+            # Last, partial round: the first `remain` ratings with capacity get one more.
+            for r in spare[:remain]:
+                quota[r] += 1
+            break
+        for r in spare:
+            quota[r] += rounds
+        remain -= rounds * len(spare)
+    return quota
+
+
+RankedItem = Tuple[JournalRow, Dict[str, float]]
+
+
+def _select_by_rating_quota(
+    by_rating: Dict[str, List[RankedItem]],
     *,
     allowed_ratings: List[str],
     target_n: int,
     mode: str,
-    exact_balance: bool = False,
-) -> Tuple[List[Tuple[JournalRow, Dict[str, float]]], Dict[str, object]]:
-    """Rebalance exported candidate pools to be as 1:1 as possible across allowed ratings.
+    exact_balance: bool,
+) -> Tuple[List[RankedItem], Dict[str, object], Dict[str, List[RankedItem]]]:
+    """Quota selection over per-rating ranked streams (see rebalance_by_rating_quota).
 
-    Policy:
-    - Best-effort 1:1 across `allowed_ratings` inside the same mode bucket.
-    - If a rating lacks enough candidates, fill from the adjacent rating within the same bucket
-      (easy: 1<->2; medium: 2<->3; hard: 4<->4*).
-    - Keep stable ordering by consuming from the ranked lists; never invent new journals.
-    - When exact_balance=True: use exact quota distribution for precise 1:1 balance.
+    Each stream is consumed through a cursor, so every item is looked at most once.
+    Also returns the items taken from each rating (in rank order), which is exactly the
+    per-rating grouping of the selection and lets a second, smaller pass skip regrouping.
     """
-
-    mode = (mode or "").strip()
-    allowed_ratings = [r for r in (allowed_ratings or []) if r]
-    if target_n <= 0 or not ranked or not allowed_ratings:
-        meta: Dict[str, object] = {
-            "enabled": True,
-            "allowed_ratings": list(allowed_ratings),
-            "target_pool_size": int(max(target_n, 0)),
-            "available_by_rating": {},
-            "selected_by_rating": {},
-            "filled": False,
-            "insufficient_total_candidates": True,
-        }
-        return ranked[: max(target_n, 0)], meta
-
-    by_rating: Dict[str, List[Tuple[JournalRow, Dict[str, float]]]] = {r: [] for r in allowed_ratings}
-    for it in ranked:
-        j, _ = it
-        r = (j.ajg_2024 or "").strip()
-        if r in by_rating:
-            by_rating[r].append(it)
-
     available_by_rating = {r: len(by_rating.get(r) or []) for r in allowed_ratings}
     available_total = sum(int(available_by_rating.get(r, 0)) for r in allowed_ratings)
 
@@ -747,54 +1375,38 @@ def rebalance_by_rating_quota(
     # adjacent rating within the same bucket (policy below).
     target_n_eff = min(int(target_n), int(available_total))
 
-    # Quotas: best-effort 1:1 across allowed ratings, but never exceed availability.
-    # Start from an equal share and then distribute remainder to ratings that still have spare capacity.
     if exact_balance:
         # Use exact quota allocation for precise 1:1 balance
-        quota, quota_desc = compute_exact_rating_quota(
-            target_n_eff, allowed_ratings
-        )
+        quota, quota_desc = compute_exact_rating_quota(target_n_eff, allowed_ratings)
     else:
-        # Original logic: best-effort 1:1
-        base = target_n_eff // k
-        rem = target_n_eff % k
-        quota: Dict[str, int] = {r: min(base, int(available_by_rating.get(r, 0))) for r in allowed_ratings}
-
-        # Distribute remainder deterministically by allowed_ratings order, but only to ratings with capacity.
-        remain = target_n_eff - sum(quota.values())
-        idx = 0
-        while remain > 0 and k > 0:
-            r = allowed_ratings[idx % k]
-            cap = int(available_by_rating.get(r, 0))
-            if quota.get(r, 0) < cap:
-                quota[r] = int(quota.get(r, 0)) + 1
-                remain -= 1
-            idx += 1
-            # Safety: if we loop too much with no progress, break.
-            if idx > (k * (target_n_eff + 2)):
-                break
+        quota = _best_effort_quota(target_n_eff, allowed_ratings, available_by_rating)
         quota_desc = f"最佳1:1（目标{target_n_eff}本，实际{sum(quota.values())}本）"
 
-    selected: List[Tuple[JournalRow, Dict[str, float]]] = []
+    selected: List[RankedItem] = []
+    taken: Dict[str, List[RankedItem]] = {r: [] for r in allowed_ratings}
+    cursor: Dict[str, int] = {r: 0 for r in allowed_ratings}
     used_ids: set = set()
     selected_by_rating: Dict[str, int] = {r: 0 for r in allowed_ratings}
 
     def take_from(rating: str, n: int) -> int:
-        taken = 0
         lst = by_rating.get(rating) or []
-        while taken < n and lst:
-            item = lst.pop(0)
+        i = cursor.get(rating, 0)
+        got = 0
+        while got < n and i < len(lst):
+            item = lst[i]
+            i += 1
             jid = stable_journal_id(item[0])
             if jid in used_ids:
                 continue
             used_ids.add(jid)
             selected.append(item)
-            taken += 1
-        return taken
+            taken.setdefault(rating, []).append(item)
+            got += 1
+        cursor[rating] = i
+        return got
 
     for r in allowed_ratings:
-        got = take_from(r, quota.get(r, 0))
-        selected_by_rating[r] += got
+        selected_by_rating[r] += take_from(r, quota.get(r, 0))
 
     # Adjacent-within-bucket fill policy.
     fill_order: List[str]
@@ -812,6 +1424,7 @@ def rebalance_by_rating_quota(
         a, b = fill_order
         return [b] if rating == a else [a]
 
+    # Every round either takes at least one item or stops, so this is O(k * target).
     filled = False
     while len(selected) < target_n_eff:
         progress = False
@@ -836,20 +1449,15 @@ def rebalance_by_rating_quota(
         if not progress:
             break
 
-    # If still short but candidates remain in any allowed bucket, keep filling round-robin.
-    if len(selected) < target_n_eff:
-        for r in allowed_ratings:
-            while len(selected) < target_n_eff:
-                got = take_from(r, 1)
-                if got:
-                    filled = True
-                else:
-                    break
-            if len(selected) >= target_n_eff:
-                break
+    # If still short but candidates remain in any allowed bucket, keep filling in rating order.
+    for r in allowed_ratings:
+        if len(selected) >= target_n_eff:
+            break
+        if take_from(r, target_n_eff - len(selected)):
+            filled = True
 
     insufficient_total = len(selected) < target_n_eff
-    meta2: Dict[str, object] = {
+    meta: Dict[str, object] = {
         "enabled": True,
         "allowed_ratings": list(allowed_ratings),
         "target_pool_size": int(target_n_eff),
@@ -861,7 +1469,121 @@ def rebalance_by_rating_quota(
         "quota_description": quota_desc,
         "exact_balance": exact_balance,
     }
-    return selected, meta2
+    return selected, meta, taken
+
+
+def _empty_rebalance_meta(allowed_ratings: List[str], target_n: int) -> Dict[str, object]:
+    return {
+        "enabled": True,
+        "allowed_ratings": list(allowed_ratings),
+        "target_pool_size": int(max(target_n, 0)),
+        "available_by_rating": {},
+        "selected_by_rating": {},
+        "filled": False,
+        "insufficient_total_candidates": True,
+    }
+
+
+def _group_by_rating(ranked: List[RankedItem], allowed_ratings: List[str]) -> Dict[str, List[RankedItem]]:
+    by_rating: Dict[str, List[RankedItem]] = {r: [] for r in allowed_ratings}
+    for it in ranked:
+        lst = by_rating.get((it[0].ajg_2024 or "").strip())
+        if lst is not None:
+            lst.append(it)
+    return by_rating
+
+
+def rebalance_by_rating_quota(
+    ranked: List[Tuple[JournalRow, Dict[str, float]]],
+    *,
+    allowed_ratings: List[str],
+    target_n: int,
+    mode: str,
+    exact_balance: bool = False,
+) -> Tuple[List[Tuple[JournalRow, Dict[str, float]]], Dict[str, object]]:
+    """Rebalance exported candidate pools to be as 1:1 as possible across allowed ratings.
+
+    Policy:
+    - Best-effort 1:1 across `allowed_ratings` inside the same mode bucket.
+    - If a rating lacks enough candidates, fill from the adjacent rating within the same bucket
+      (easy: 1<->2; medium: 2<->3; hard: 4<->4*).
+    - Keep stable ordering by consuming from the ranked lists; never invent new journals.
+    - When exact_balance=True: use exact quota distribution for precise 1:1 balance.
+
+    One grouping pass plus cursor consumption: O(len(ranked)).
+    """
+
+    mode = (mode or "").strip()
+    allowed_ratings = [r for r in (allowed_ratings or []) if r]
+    if target_n <= 0 or not ranked or not allowed_ratings:
+        return ranked[: max(target_n, 0)], _empty_rebalance_meta(allowed_ratings, target_n)
+
+    selected, meta, _taken = _select_by_rating_quota(
+        _group_by_rating(ranked, allowed_ratings),
+        allowed_ratings=allowed_ratings,
+        target_n=target_n,
+        mode=mode,
+        exact_balance=exact_balance,
+    )
+    return selected, meta
+
+
+def rebalance_pool_and_topk(
+    ranked: List[Tuple[JournalRow, Dict[str, float]]],
+    *,
+    allowed_ratings: List[str],
+    pool_n: int,
+    topk: int,
+    mode: str,
+    exact_balance: bool = False,
+) -> Tuple[List[RankedItem], Dict[str, object], List[RankedItem], Dict[str, object]]:
+    """Balanced pool and its exact-1:1 TopK from one grouping of `ranked`.
+
+    Same results as rebalance_by_rating_quota(ranked, target_n=pool_n) followed by
+    rebalance_by_rating_quota(pool, target_n=topk, exact_balance=True): the TopK pass reads
+    the per-rating streams the pool pass already produced instead of regrouping the pool.
+    """
+    mode = (mode or "").strip()
+    allowed_ratings = [r for r in (allowed_ratings or []) if r]
+    if pool_n <= 0 or not ranked or not allowed_ratings:
+        pool, pool_meta = ranked[: max(pool_n, 0)], _empty_rebalance_meta(allowed_ratings, pool_n)
+        top, top_meta = rebalance_by_rating_quota(
+            pool, allowed_ratings=allowed_ratings, target_n=topk, mode=mode, exact_balance=True
+        )
+        return pool, pool_meta, top, top_meta
+
+    pool, pool_meta, taken = _select_by_rating_quota(
+        _group_by_rating(ranked, allowed_ratings),
+        allowed_ratings=allowed_ratings,
+        target_n=pool_n,
+        mode=mode,
+        exact_balance=exact_balance,
+    )
+    if topk <= 0 or not pool:
+        return pool, pool_meta, pool[: max(topk, 0)], _empty_rebalance_meta(allowed_ratings, topk)
+    top, top_meta, _taken = _select_by_rating_quota(
+        taken, allowed_ratings=allowed_ratings, target_n=topk, mode=mode, exact_balance=True
+    )
+    return pool, pool_meta, top, top_meta
+
+
+def candidate_to_dict(j: JournalRow, s: Dict[str, float]) -> Dict[str, object]:
+    return {
+        "id": stable_journal_id(j),
+        "field": j.field,
+        "journal": j.title,
+        "ajg_2024": j.ajg_2024,
+        "ajg_2021": j.ajg_2021,
+        "signals": {
+            "fit_score": float(s.get("fit", 0.0)),
+            "easy_score": float(s.get("easy", 0.0)),
+            "value_score": float(s.get("value", 0.0)),
+            "prestige_penalty": float(s.get("prestige_pen", 0.0)),
+            "method_penalty": float(s.get("method_pen", 0.0)),
+            "total_score": float(s.get("total", 0.0)),
+            **({"semantic_score": float(s["semantic"])} if "semantic" in s else {}),
+        },
+    }
 
 
 def candidate_pool_to_dict(
@@ -876,25 +1598,7 @@ def candidate_pool_to_dict(
     field_scope_requested: str = "",
     field_scope_effective: Optional[List[str]] = None,
 ) -> Dict[str, object]:
-    pool = []
-    for j, s in candidates:
-        pool.append(
-            {
-                "id": stable_journal_id(j),
-                "field": j.field,
-                "journal": j.title,
-                "ajg_2024": j.ajg_2024,
-                "ajg_2021": j.ajg_2021,
-                "signals": {
-                    "fit_score": float(s.get("fit", 0.0)),
-                    "easy_score": float(s.get("easy", 0.0)),
-                    "value_score": float(s.get("value", 0.0)),
-                    "prestige_penalty": float(s.get("prestige_pen", 0.0)),
-                    "method_penalty": float(s.get("method_pen", 0.0)),
-                    "total_score": float(s.get("total", 0.0)),
-                },
-            }
-        )
+    pool = [candidate_to_dict(j, s) for j, s in candidates]
 
     meta: Dict[str, object] = {
         "generated_at": now_local_str(),
@@ -921,6 +1625,7 @@ def candidate_pool_to_dict(
             "total_after": gating_meta.total_candidates_after,
             "fallback_used": gating_meta.fallback_used,
             "per_rating_stats": getattr(gating_meta, "per_rating_stats", {}),
+            "rescored": getattr(gating_meta, "rescored", 0),
         }
 
     return {"meta": meta, "candidates": pool}
@@ -945,6 +1650,8 @@ class GatingMeta:
     field_scope_effective: List[str]
     # 新增：按星级的统计信息（用于分层 gating 模式）
     per_rating_stats: Dict[str, int] = field(default_factory=dict)  # 每个星级的选择数量
+    # 本次 gating 中分数不在已有分量向量里、必须重新计算的期刊数（复用首轮分数时为 0）
+    rescored: int = 0
 
 
 def gate_by_topic_fit(
@@ -955,6 +1662,8 @@ def gate_by_topic_fit(
     candidate_topn: Optional[int] = None,
     min_candidates: Optional[int] = None,
     rating_filter: Optional[str] = None,
+    signals: Optional[PaperSignals] = None,
+    selector: Optional["FitSelector"] = None,
 ) -> Tuple[List[JournalRow], Dict[str, float], GatingMeta]:
     """构造主题贴合候选集（TopN + 回退）。
 
@@ -970,6 +1679,8 @@ def gate_by_topic_fit(
         candidate_topn: 每星级最大候选数（None 表示使用默认值）
         min_candidates: 每星级最小候选数（None 表示使用默认值）
         rating_filter: 星级过滤（逗号分隔，如 "1,2,3"），为空则不按星级分层
+        signals: 论文侧预计算结果（None 则在此计算一次）
+        selector: 基于 candidates 已建好的 FitSelector（多模式/回退共享时传入，避免重复打分与排序）
 
     Returns:
         (gated, fit_map, meta): 筛选后的期刊列表，fit_score 映射，元数据
@@ -989,6 +1700,11 @@ def gate_by_topic_fit(
         )
         return [], {}, meta
 
+    if selector is None:
+        if signals is None:
+            signals = paper_signals(paper)
+        selector = FitSelector(candidates, [fit_score(paper, j, signals) for j in candidates])
+
     # 解析星级过滤
     allowed_ratings = set()
     if rating_filter:
@@ -996,14 +1712,16 @@ def gate_by_topic_fit(
 
     # 如果指定了星级过滤，使用分层 gating 策略
     if allowed_ratings:
-        return _gate_by_topic_fit_per_rating(
+        gated, fit_map, meta = _gate_by_topic_fit_per_rating(
             paper,
             candidates,
             topk=topk,
             candidate_topn=candidate_topn,
             min_candidates=min_candidates,
             allowed_ratings=allowed_ratings,
+            selector=selector,
         )
+        return gated, fit_map, meta
 
     # 否则使用原有统一排序策略（V1）
     default_topn = max(topk * 8, 80)
@@ -1011,17 +1729,15 @@ def gate_by_topic_fit(
     candidate_topn = int(candidate_topn or default_topn)
     min_candidates = int(min_candidates or default_min_candidates)
 
-    scored = [(j, fit_score(paper, j)) for j in candidates]
-    scored.sort(key=lambda x: x[1], reverse=True)
-
-    chosen_topn = min(candidate_topn, len(scored))
+    chosen_topn = min(candidate_topn, total_before)
     fallback_used = False
     if chosen_topn < min_candidates:
-        chosen_topn = min(min_candidates, len(scored))
+        chosen_topn = min(min_candidates, total_before)
         fallback_used = True
 
-    gated = [j for j, _ in scored[:chosen_topn]]
-    fit_map = {j.title: s for j, s in scored[:chosen_topn]}
+    top = selector.top(chosen_topn)
+    gated = [j for j, _ in top]
+    fit_map = {j.title: s for j, s in top}
 
     meta = GatingMeta(
         strategy="topn",
@@ -1044,6 +1760,7 @@ def _gate_by_topic_fit_per_rating(
     candidate_topn: Optional[int],
     min_candidates: Optional[int],
     allowed_ratings: Set[str],
+    selector: "FitSelector",
 ) -> Tuple[List[JournalRow], Dict[str, float], GatingMeta]:
     """按星级分层进行主题贴合 gating。
 
@@ -1051,6 +1768,7 @@ def _gate_by_topic_fit_per_rating(
     合并所有星级的筛选结果后返回。
     """
 
+    _ = paper
     total_before = len(candidates)
 
     # 默认参数
@@ -1059,13 +1777,6 @@ def _gate_by_topic_fit_per_rating(
     per_rating_topn = int(candidate_topn or default_topn)
     per_rating_min = int(min_candidates or default_min_candidates)
 
-    # 按星级分组
-    by_rating: Dict[str, List[JournalRow]] = {r: [] for r in allowed_ratings}
-    for j in candidates:
-        r = (j.ajg_2024 or "").strip()
-        if r in by_rating:
-            by_rating[r].append(j)
-
     # 在每个星级内进行主题贴合 gating
     gated_all: List[JournalRow] = []
     fit_map_all: Dict[str, float] = {}
@@ -1074,22 +1785,18 @@ def _gate_by_topic_fit_per_rating(
     fallback_used = False
 
     for rating in sorted(allowed_ratings, key=_rating_sort_key):
-        journals = by_rating.get(rating, [])
-        if not journals:
+        n_rating = selector.group_size(rating)
+        if not n_rating:
             continue
 
-        # 计算主题贴合分数并排序
-        scored = [(j, fit_score(paper, j)) for j in journals]
-        scored.sort(key=lambda x: x[1], reverse=True)
-
         # 选择候选（考虑回退）
-        chosen = min(per_rating_topn, len(scored))
+        chosen = min(per_rating_topn, n_rating)
         if chosen < per_rating_min:
-            chosen = min(per_rating_min, len(scored))
+            chosen = min(per_rating_min, n_rating)
             fallback_used = True
 
-        # 提取选中的期刊
-        for j, s in scored[:chosen]:
+        # 按主题贴合分取该星级 TopN（FitSelector 内部缓存排序结果）
+        for j, s in selector.top(chosen, rating):
             gated_all.append(j)
             fit_map_all[j.title] = s
 
@@ -1111,62 +1818,149 @@ def _gate_by_topic_fit_per_rating(
     return gated_all, fit_map_all, meta
 
 
+class FitSelector:
+    """按 fit_score 取 TopN 的选择引擎（可按 AJG 2024 星级分组）。
+
+    fit 向量只在构造时给定一次；首次查询用堆选择（heapq.nlargest），之后若需要更大的
+    TopN（例如 candidate_topn 回退扩容），对该组整体排序一次并缓存，之后任意 TopN 都只是切片。
+    结果顺序与 ``sorted(..., key=fit, reverse=True)[:n]`` 完全一致（同分保持原顺序）。
+    """
+
+    def __init__(
+        self, journals: List[JournalRow], fit: Sequence[float], *, by_rating: Optional[Dict[str, List[int]]] = None
+    ) -> None:
+        self.journals = journals
+        self.fit: List[float] = [float(x) for x in fit]
+        # rating（None 表示全部）-> 组内下标（保持 journals 原顺序）；by_rating 可由 ScopePartition 预先给出
+        self._groups: Dict[Optional[str], List[int]] = {None: list(range(len(journals)))}
+        self._grouped = by_rating is not None
+        if by_rating is not None:
+            self._groups.update(by_rating)
+        # rating -> 按 fit 降序的下标前缀；_complete 中的组已整体排序
+        self._orders: Dict[Optional[str], List[int]] = {}
+        self._complete: Set[Optional[str]] = set()
+
+    def _group(self, rating: Optional[str]) -> List[int]:
+        if not self._grouped and rating is not None:
+            for i, j in enumerate(self.journals):
+                self._groups.setdefault((j.ajg_2024 or "").strip(), []).append(i)
+            self._grouped = True
+        return self._groups.get(rating, [])
+
+    def group_size(self, rating: Optional[str] = None) -> int:
+        return len(self._group(rating))
+
+    def top(self, n: int, rating: Optional[str] = None) -> List[Tuple[JournalRow, float]]:
+        idx = self._group(rating)
+        n = min(int(n), len(idx))
+        order = self._orders.get(rating)
+        if order is None or (len(order) < n and rating not in self._complete):
+            fit = self.fit.__getitem__
+            if order is None and n < len(idx):
+                order = heapq.nlargest(n, idx, key=fit)
+            else:
+                order = sorted(idx, key=fit, reverse=True)
+                self._complete.add(rating)
+            self._orders[rating] = order
+        return [(self.journals[i], self.fit[i]) for i in order[:n]]
+
+
+class ScoredCandidates:
+    """一篇论文的候选期刊及其全部与模式无关的分量分数（只算一次，可反复复用）。
+
+    gate() 扩大/缩小 candidate_topn 或换星级过滤时只在 FitSelector 上取 TopN，并按分量向量的
+    覆盖情况统计需要重新打分的期刊（只补算缺失的那些，数量写入 GatingMeta.rescored/报告；
+    正常复用首轮分数时为 0）；rank() 只做模式加权与排序。
+    """
+
+    def __init__(
+        self,
+        paper: PaperProfile,
+        journals: List[JournalRow],
+        *,
+        signals: PaperSignals,
+        by_rating: Optional[Dict[str, List[int]]] = None,
+        semantic: Optional[SemanticScorer] = None,
+        semantic_weight: float = 0.0,
+    ) -> None:
+        self.paper = paper
+        self.journals = journals
+        self.signals = signals
+        self.semantic = semantic
+        self.semantic_weight = semantic_weight
+        self.vectors = score_batch(paper, journals, signals=signals, semantic=semantic, semantic_weight=semantic_weight)
+        self.selector = FitSelector(journals, self.vectors.components["fit"], by_rating=by_rating)
+
+    def gate(
+        self, *, topk: int, candidate_topn: Optional[int] = None, rating_filter: Optional[str] = None
+    ) -> Tuple[List[JournalRow], Dict[str, float], GatingMeta]:
+        gated, fit_map, meta = gate_by_topic_fit(
+            self.paper,
+            self.journals,
+            topk=topk,
+            candidate_topn=candidate_topn,
+            rating_filter=rating_filter,
+            signals=self.signals,
+            selector=self.selector,
+        )
+        missing = self.vectors.missing(gated)
+        if missing:
+            extra = score_batch(
+                self.paper, missing, signals=self.signals, semantic=self.semantic, semantic_weight=self.semantic_weight
+            )
+            self.vectors = ScoreVectors.concat(self.vectors, extra)
+        return gated, fit_map, replace(meta, rescored=len(missing))
+
+    def rank(self, journals: List[JournalRow], mode: str) -> List[Tuple[JournalRow, Dict[str, float]]]:
+        """(journal, scores) for `journals` (a subset of self.journals, e.g. from gate()) sorted by total for `mode`."""
+        return self.vectors.take(journals).ranked(mode)
+
+
 def _rating_sort_key(rating: str) -> int:
     """返回星级的排序键（用于一致性排序）。"""
     order = {"1": 1, "2": 2, "3": 3, "4": 4, "4*": 5}
     return order.get(rating, 999)
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(formatter_class=ColorHelpFormatter)
-    ap.add_argument("--ajg_csv", default=DEFAULT_AJG_CSV, help="AJG核心CSV路径（绝对/相对均可；相对路径基于项目根）")
-    ap.add_argument("--field", default="ECON", help="论文领域标签/关键词配置（默认ECON；不控制候选范围）")
-    ap.add_argument(
-        "--field_scope",
-        default="",
-        help=(
-            "候选期刊 Field 白名单（AJG CSV 的 Field 列，逗号分隔；精确匹配）。"
-            "为空则使用默认白名单：ECON,FINANCE,PUB SEC,REGIONAL STUDIES, PLANNING AND ENVIRONMENT,SOC SCI。"
-        ),
-    )
-    ap.add_argument("--title", required=True, help="论文标题")
-    ap.add_argument("--abstract", default="", help="论文摘要")
-    ap.add_argument("--mode", default="easy", choices=["easy", "medium", "hard"], help="投稿难度：easy(最容易)/medium(中等)/hard(最困难)")
-    ap.add_argument("--topk", type=int, default=10, help="输出期刊数（默认10）")
-    ap.add_argument(
-        "--profile",
-        default=os.environ.get("ABS_PROFILE", "general"),
-        choices=["general", "ling"],
-        help="主题贴合关键词配置：general(更通用)/ling(更偏个人研究方向)。也可用环境变量 ABS_PROFILE 覆盖。",
-    )
-    ap.add_argument(
-        "--export_candidate_pool_json",
-        default="",
-        help="导出候选池到 JSON（供 AI 二次筛选）。为空则不导出。建议绝对路径。",
-    )
-    ap.add_argument(
-        "--rating_filter",
-        default="",
-        help="AJG/ABS 星级过滤（逗号分隔，如: 1,2,3 或 3,4,4*）。为空则不过滤。",
-    )
-    ap.add_argument(
-        "--exact_rating_balance",
-        action="store_true",
-        help="启用精确星级平衡（每个模式内部按固定配额分配：easy:5x2星+5x1星；medium:5x3星+5x2星；hard:5x4*+5x4星）"
-    )
-    args = ap.parse_args()
+@dataclass
+class RecommendContext:
+    """Mode-independent state for one paper: candidates, paper signals and component scores.
 
-    # Make profile available to scoring functions without threading through all signatures.
-    os.environ["ABS_PROFILE"] = args.profile
+    Built once by prepare_recommendation() and shared by every difficulty mode, so
+    easy/medium/hard only differ in gating, weighting and rebalancing.
+    """
 
-    paper = PaperProfile(field=args.field, title=args.title, abstract=args.abstract, mode=args.mode)
-    rows = load_ajg_csv(args.ajg_csv)
-    requested_scope_raw = (args.field_scope or "").strip()
-    field_scope_effective = parse_field_scope(requested_scope_raw) if requested_scope_raw else list(DEFAULT_FIELD_SCOPE)
+    ajg_csv: str
+    field: str
+    title: str
+    abstract: str
+    field_scope_requested: str
+    field_scope_effective: List[str]
+    candidates: List[JournalRow]
+    signals: PaperSignals
+    scored: ScoredCandidates
+
+    def paper(self, mode: str) -> PaperProfile:
+        return PaperProfile(field=self.field, title=self.title, abstract=self.abstract, mode=mode)
+
+
+@dataclass
+class RecommendResult:
+    """One mode's output: ranked rows used for the report, gating meta, report and pool."""
+
+    paper: PaperProfile
+    ranked: List[Tuple[JournalRow, Dict[str, float]]]
+    gating_meta: GatingMeta
+    report: str
+    candidate_pool: Optional[Dict[str, object]] = None
+
+
+def resolve_field_scope(rows: List[JournalRow], raw: str, *, index: Optional[CatalogIndex] = None) -> List[str]:
+    field_scope_effective = parse_field_scope(raw) if raw else list(DEFAULT_FIELD_SCOPE)
     if not field_scope_effective:
         raise RuntimeError("--field_scope 解析后为空；请提供至少一个 Field")
 
-    known_fields = {r.field for r in rows if (r.field or "").strip()}
+    known_fields = (index or catalog_index(rows)).known_fields
     unknown = [x for x in field_scope_effective if x not in known_fields]
     if unknown:
         known_sorted = sorted(known_fields)
@@ -1176,20 +1970,86 @@ def main() -> int:
             + "\n可选 Field（来自 CSV）:\n- "
             + "\n- ".join(known_sorted)
         )
+    return field_scope_effective
+
+
+def semantic_scorer(rows: List[JournalRow], ajg_csv: str, text: str) -> SemanticScorer:
+    """Scorer for the semantic similarity between `text` and journals of `rows` (index cached per CSV)."""
+    index = get_semantic_index(_resolve_ajg_csv_path(ajg_csv), [(r.field, r.title) for r in rows])
+    query = index.query(text)
+    return lambda journals: index.similarities_for(query, [(j.field, j.title) for j in journals])
+
+
+def prepare_recommendation(
+    rows: List[JournalRow],
+    *,
+    title: str,
+    abstract: str = "",
+    field: str = "ECON",
+    field_scope: str = "",
+    profile: Optional[str] = None,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    semantic_weight: float = 0.0,
+) -> RecommendContext:
+    """Validate the field scope and compute every mode-independent score once.
+
+    A non-zero `semantic_weight` adds the semantic fit (abs_semantic.py) to every total.
+    """
+    requested_scope_raw = (field_scope or "").strip()
+    index = catalog_index(rows)
+    field_scope_effective = resolve_field_scope(rows, requested_scope_raw, index=index)
+    part = index.scope(field_scope_effective)
+
+    # Mode does not affect any component; "easy" is only a placeholder here.
+    paper = PaperProfile(field=field, title=title, abstract=abstract, mode="easy")
+    # Paper-side keyword matching is done once here and reused for every journal.
+    signals = paper_signals(paper, profile=profile)
+    return RecommendContext(
+        ajg_csv=ajg_csv,
+        field=field,
+        title=title,
+        abstract=abstract,
+        field_scope_requested=requested_scope_raw,
+        field_scope_effective=field_scope_effective,
+        candidates=part.journals,
+        signals=signals,
+        scored=ScoredCandidates(
+            paper,
+            part.journals,
+            signals=signals,
+            by_rating=part.by_rating,
+            semantic=semantic_scorer(rows, ajg_csv, f"{title}\n{abstract}") if semantic_weight else None,
+            semantic_weight=semantic_weight,
+        ),
+    )
 
-    cand = [r for r in rows if r.field in set(field_scope_effective)]
+
+def recommend_mode(
+    ctx: RecommendContext,
+    mode: str,
+    *,
+    topk: int = 10,
+    rating_filter: str = "",
+    exact_rating_balance: bool = False,
+    export_pool: bool = False,
+) -> RecommendResult:
+    """Gate, rank, rebalance and render one difficulty mode from a prepared context."""
+    paper = ctx.paper(mode)
+    field_scope_effective = ctx.field_scope_effective
 
     # Parse rating filter once for use in gating.
-    rating_filter = (args.rating_filter or "").strip()
+    rating_filter_raw = rating_filter
+    rating_filter = (rating_filter or "").strip()
 
     def build_ranked(*, candidate_topn: Optional[int]) -> Tuple[List[Tuple[JournalRow, Dict[str, float]]], GatingMeta]:
         # Pass rating_filter to gate_by_topic_fit for per-rating gating (V2).
-        gated, fit_map, gmeta = gate_by_topic_fit(
-            paper, cand,
-            topk=args.topk,
+        # Widening candidate_topn (Phase 2) re-slices the cached fit ranking; nothing is re-scored.
+        gated, fit_map, gmeta = ctx.scored.gate(
+            topk=topk,
             candidate_topn=candidate_topn,
             rating_filter=rating_filter or None,
         )
+        ranked = ctx.scored.rank(gated, paper.mode)
         # Preserve per-rating stats from gating meta.
         per_rating_stats = getattr(gmeta, "per_rating_stats", {})
         gmeta = GatingMeta(
@@ -1201,14 +2061,10 @@ def main() -> int:
             fallback_used=gmeta.fallback_used,
             field_scope_effective=list(field_scope_effective),
             per_rating_stats=per_rating_stats,
+            rescored=gmeta.rescored,
         )
-        scored_local: List[Tuple[JournalRow, Dict[str, float]]] = []
-        for j in gated:
-            s = total_score(paper, j)
-            s["fit"] = float(fit_map.get(j.title, s.get("fit", 0.0)))
-            scored_local.append((j, s))
-        scored_local.sort(key=lambda x: x[1]["total"], reverse=True)
-        return scored_local, gmeta
+        # Components were computed once in prepare_recommendation(); only weighting runs here.
+        return ranked, gmeta
 
     # Phase 1: normal gating (with per-rating support if rating_filter is set).
     scored, gmeta = build_ranked(candidate_topn=None)
@@ -1227,8 +2083,8 @@ def main() -> int:
     # Phase 2 fallback: if filtered is too small, expand the gating candidate_topn.
     # With per-rating gating (V2), this fallback is less critical since each rating
     # already has guaranteed minimum candidates. We still keep it for safety.
-    if allowed and len(filtered) < int(args.topk):
-        expanded_topn = max(gmeta.candidate_topn * 2, gmeta.candidate_topn + 80, int(args.topk) * 20)
+    if allowed and len(filtered) < int(topk):
+        expanded_topn = max(gmeta.candidate_topn * 2, gmeta.candidate_topn + 80, int(topk) * 20)
         scored2, gmeta2 = build_ranked(candidate_topn=expanded_topn)
         # Use same filtering logic as above.
         filtered2 = scored2
@@ -1236,7 +2092,7 @@ def main() -> int:
             filtered2 = [x for x in scored2 if (x[0].ajg_2024 or "").strip() in allowed]
         if len(filtered2) >= len(filtered):
             scored = scored2
-            gmeta = gmeta2
+            gmeta = replace(gmeta2, rescored=gmeta.rescored + gmeta2.rescored)
             filtered = filtered2
 
     # Phase 3 fallback (soft): if still too small, do NOT expand the rating filter silently.
@@ -1252,8 +2108,8 @@ def main() -> int:
 
     # For exact balance mode, we need to generate a balanced pool first,
     # then select TopK from the balanced pool for the report.
-    if getattr(args, "exact_rating_balance", False) or args.export_candidate_pool_json:
-        allowed_ordered = _normalize_allowed_ratings(effective_rating_str or rating_filter, mode=args.mode)
+    if exact_rating_balance or export_pool:
+        allowed_ordered = _normalize_allowed_ratings(effective_rating_str or rating_filter, mode=mode)
 
         # Calculate available counts
         avail_tmp: Dict[str, int] = {}
@@ -1263,63 +2119,174 @@ def main() -> int:
                 avail_tmp[r] = int(avail_tmp.get(r, 0)) + 1
 
         # Estimate pool size
-        pool_min = int(args.topk) * 10
-        pool_max = min(len(scored), max(int(args.topk) * 30, 150))
+        pool_min = int(topk) * 10
+        pool_max = min(len(scored), max(int(topk) * 30, 150))
         pool_size = _estimate_balanced_pool_size(
             avail_tmp,
             allowed_ratings=allowed_ordered,
             min_pool_size=min(pool_min, pool_max),
             max_pool_size=pool_max,
-            exact_balance=getattr(args, "exact_rating_balance", False),
-            target_topk=args.topk,
-        )
-
-        # Create balanced pool
-        scored_for_pool, rebalance_meta = rebalance_by_rating_quota(
-            scored,
-            allowed_ratings=allowed_ordered,
-            target_n=pool_size,
-            mode=args.mode,
-            exact_balance=getattr(args, "exact_rating_balance", False),
+            exact_balance=exact_rating_balance,
+            target_topk=topk,
         )
 
-        # For exact balance mode, use the balanced pool for the report
-        report_scored = scored_for_pool if getattr(args, "exact_rating_balance", False) else scored
+        if exact_rating_balance:
+            # Balanced pool, then exact 1:1 TopK drawn from that pool (one pass over `scored`).
+            scored_for_pool, rebalance_meta, report_scored, _topk_meta = rebalance_pool_and_topk(
+                scored,
+                allowed_ratings=allowed_ordered,
+                pool_n=pool_size,
+                topk=topk,
+                mode=mode,
+                exact_balance=True,
+            )
+        else:
+            scored_for_pool, rebalance_meta = rebalance_by_rating_quota(
+                scored,
+                allowed_ratings=allowed_ordered,
+                target_n=pool_size,
+                mode=mode,
+                exact_balance=False,
+            )
+            report_scored = scored
     else:
         report_scored = scored
         scored_for_pool = []
         rebalance_meta = {}
 
-    # For exact balance mode, apply exact 1:1 balance to TopK as well
-    if getattr(args, "exact_rating_balance", False):
-        allowed_ordered = _normalize_allowed_ratings(effective_rating_str or rating_filter, mode=args.mode)
-        report_scored, topk_rebalance_meta = rebalance_by_rating_quota(
-            report_scored,
-            allowed_ratings=allowed_ordered,
-            target_n=args.topk,
-            mode=args.mode,
-            exact_balance=True,
-        )
-
-    report = render_report(paper, report_scored, topk=args.topk, gating_meta=gmeta)
-    print(report)
+    report = render_report(paper, report_scored, topk=topk, gating_meta=gmeta)
 
-    if args.export_candidate_pool_json:
+    pool_obj: Optional[Dict[str, object]] = None
+    if export_pool:
         pool_obj = candidate_pool_to_dict(
             paper,
-            args.ajg_csv,
+            ctx.ajg_csv,
             scored_for_pool,
-            mode=args.mode,
+            mode=mode,
             gating_meta=gmeta,
-            rating_filter=args.rating_filter,
+            rating_filter=rating_filter_raw,
             rating_filter_effective=effective_rating_str,
-            field_scope_requested=requested_scope_raw,
+            field_scope_requested=ctx.field_scope_requested,
             field_scope_effective=field_scope_effective,
         )
         meta = pool_obj.get('meta')
         if isinstance(meta, dict):
             meta['rating_rebalance'] = rebalance_meta
-        write_json(args.export_candidate_pool_json, pool_obj)
+
+    return RecommendResult(paper=paper, ranked=report_scored, gating_meta=gmeta, report=report, candidate_pool=pool_obj)
+
+
+def recommend_modes(
+    rows: List[JournalRow],
+    *,
+    title: str,
+    abstract: str = "",
+    field: str = "ECON",
+    field_scope: str = "",
+    modes: Sequence[str] = ("easy", "medium", "hard"),
+    rating_filter_by_mode: Optional[Dict[str, str]] = None,
+    topk: int = 10,
+    profile: Optional[str] = None,
+    exact_rating_balance: bool = False,
+    export_pool: bool = False,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    semantic_weight: float = 0.0,
+) -> Dict[str, RecommendResult]:
+    """Recommend several difficulty modes from a single scoring run (data loaded by the caller)."""
+    ctx = prepare_recommendation(
+        rows,
+        title=title,
+        abstract=abstract,
+        field=field,
+        field_scope=field_scope,
+        profile=profile,
+        ajg_csv=ajg_csv,
+        semantic_weight=semantic_weight,
+    )
+    rating_filter_by_mode = rating_filter_by_mode or {}
+    return {
+        m: recommend_mode(
+            ctx,
+            m,
+            topk=topk,
+            rating_filter=rating_filter_by_mode.get(m, ""),
+            exact_rating_balance=exact_rating_balance,
+            export_pool=export_pool,
+        )
+        for m in modes
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(formatter_class=ColorHelpFormatter)
+    ap.add_argument("--ajg_csv", default=DEFAULT_AJG_CSV, help="AJG核心CSV路径（绝对/相对均可；相对路径基于项目根）")
+    ap.add_argument("--field", default="ECON", help="论文领域标签/关键词配置（默认ECON；不控制候选范围）")
+    ap.add_argument(
+        "--field_scope",
+        default="",
+        help=(
+            "候选期刊 Field 白名单（AJG CSV 的 Field 列，逗号分隔；精确匹配）。"
+            "为空则使用默认白名单：ECON,FINANCE,PUB SEC,REGIONAL STUDIES, PLANNING AND ENVIRONMENT,SOC SCI。"
+        ),
+    )
+    ap.add_argument("--title", required=True, help="论文标题")
+    ap.add_argument("--abstract", default="", help="论文摘要")
+    ap.add_argument("--mode", default="easy", choices=["easy", "medium", "hard"], help="投稿难度：easy(最容易)/medium(中等)/hard(最困难)")
+    ap.add_argument("--topk", type=int, default=10, help="输出期刊数（默认10）")
+    ap.add_argument(
+        "--profile",
+        default=os.environ.get("ABS_PROFILE", "general"),
+        choices=["general", "ling"],
+        help="主题贴合关键词配置：general(更通用)/ling(更偏个人研究方向)。也可用环境变量 ABS_PROFILE 覆盖。",
+    )
+    ap.add_argument(
+        "--export_candidate_pool_json",
+        default="",
+        help="导出候选池到 JSON（供 AI 二次筛选）。为空则不导出。建议绝对路径。",
+    )
+    ap.add_argument(
+        "--rating_filter",
+        default="",
+        help="AJG/ABS 星级过滤（逗号分隔，如: 1,2,3 或 3,4,4*）。为空则不过滤。",
+    )
+    ap.add_argument(
+        "--exact_rating_balance",
+        action="store_true",
+        help="启用精确星级平衡（每个模式内部按固定配额分配：easy:5x2星+5x1星；medium:5x3星+5x2星；hard:5x4*+5x4星）"
+    )
+    ap.add_argument(
+        "--pool_format",
+        default="json",
+        choices=list(POOL_FORMATS),
+        help="候选池文件格式：json(缩进，默认)/compact(单行压缩)/jsonl(首行 meta，之后每行一个候选；自动改用 .jsonl 后缀)",
+    )
+    args = ap.parse_args()
+
+    # Make profile available to scoring functions without threading through all signatures.
+    os.environ["ABS_PROFILE"] = args.profile
+
+    rows = load_ajg_csv(args.ajg_csv)
+    ctx = prepare_recommendation(
+        rows,
+        title=args.title,
+        abstract=args.abstract,
+        field=args.field,
+        field_scope=args.field_scope,
+        profile=args.profile,
+        ajg_csv=args.ajg_csv,
+    )
+    result = recommend_mode(
+        ctx,
+        args.mode,
+        topk=args.topk,
+        rating_filter=args.rating_filter,
+        exact_rating_balance=args.exact_rating_balance,
+        export_pool=bool(args.export_candidate_pool_json),
+    )
+    print(result.report)
+
+    if args.export_candidate_pool_json and result.candidate_pool is not None:
+        write_pool(args.export_candidate_pool_json, result.candidate_pool, fmt=args.pool_format)
 
     return 0
 
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Latency benchmark for the recommendation pipeline (offline; stdlib only).
+
+Times each stage on synthetic paper corpora and writes one JSON record per run, so
+results from different commits can be compared:
+
+- load_csv / load_snapshot: load_ajg_csv() with and without the compiled snapshot
+- total_score:  total_score() over the full catalogue, one journal at a time
+- score_batch:  the batched equivalent used by the pipeline
+- gate:         gate_by_topic_fit() over the default field scope
+- rebalance:    rebalance_by_rating_quota() on the gated ranking (exact balance)
+- render:       render_report()
+- recommend:    in-process recommend() for all three modes
+- cli_hybrid:   `abs_journal.py recommend --hybrid --auto_ai --no-cache` (subprocess, end to end)
+
+Corpora are generated from a fixed seed (titles/abstracts mixing topic words and words
+from AJG journal titles), so every run of the same --sizes/--seed sees the same papers.
+
+Run:
+  python3 /ABS_JOURNAL_HOME/scripts/abs_bench.py --sizes 1,10,100
+  python3 /ABS_JOURNAL_HOME/scripts/abs_bench.py --compare reports/bench/bench_<old>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from abs_article_impl import (
+    DEFAULT_AJG_CSV,
+    DEFAULT_FIELD_SCOPE,
+    PaperProfile,
+    catalog_index,
+    gate_by_topic_fit,
+    load_ajg_csv,
+    now_local_str,
+    paper_signals,
+    rebalance_by_rating_quota,
+    render_report,
+    score_batch,
+    total_score,
+)
+from abs_journal_api import recommend
+from abs_paths import reports_dir, skill_root
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_FORMAT = "abs-journal-bench/1"
+
+TOPIC_WORDS = (
+    "trade tariff export firm productivity innovation bank credit monetary policy inflation "
+    "labour wage migration education health inequality poverty climate carbon energy "
+    "housing urban regional tax public spending governance corruption election opinion "
+    "finance stock market volatility risk insurance household consumption savings china "
+    "panel data causal identification instrumental variable difference-in-differences "
+    "structural model survey experiment field evidence"
+).split()
+
+
+def synthetic_papers(rows: Sequence[Any], n: int, *, seed: int = 0) -> List[Dict[str, str]]:
+    """`n` reproducible papers: short titles and 3-sentence abstracts."""
+    rng = random.Random(f"{seed}:{n}")
+    title_words = sorted({w for r in rows for w in r.title.split() if len(w) > 3 and w.isalpha()})
+    papers = []
+    for i in range(n):
+        title = " ".join(rng.sample(TOPIC_WORDS, 3) + rng.sample(title_words, 2))
+        sentences = [" ".join(rng.sample(TOPIC_WORDS, 6) + rng.sample(title_words, 3)) for _ in range(3)]
+        papers.append({"id": str(i), "title": title.capitalize(), "abstract": ". ".join(sentences) + "."})
+    return papers
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples_ms),
+        "min_ms": round(min(samples_ms), 4),
+        "median_ms": round(statistics.median(samples_ms), 4),
+        "mean_ms": round(statistics.fmean(samples_ms), 4),
+    }
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """min/median/mean wall time of `repeat` calls, in milliseconds."""
+    samples = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return summarize(samples)
+
+
+def per_paper(items: Sequence[Any], fn: Callable[[Any], Any], repeat: int) -> Dict[str, float]:
+    """Time one pass of `fn` over the corpus (one item per paper); also report the time per paper."""
+    out = timed(lambda: [fn(x) for x in items], repeat)
+    out["per_paper_ms"] = round(out["median_ms"] / max(1, len(items)), 4)
+    return out
+
+
+def bench_stages(rows: List[Any], papers: List[Dict[str, str]], *, ajg_csv: str, repeat: int) -> Dict[str, Any]:
+    part = catalog_index(rows).scope(list(DEFAULT_FIELD_SCOPE))
+    mode = "medium"
+
+    def profile(p: Dict[str, str]) -> PaperProfile:
+        return PaperProfile(field="ECON", title=p["title"], abstract=p["abstract"], mode=mode)
+
+    prepared = [(profile(p), paper_signals(profile(p), profile="general")) for p in papers]
+
+    def ranked_for(paper: PaperProfile, signals: Any) -> List[Any]:
+        gated, _fit, _meta = gate_by_topic_fit(paper, part.journals, topk=10, rating_filter="2,3", signals=signals)
+        return score_batch(paper, gated, signals=signals).ranked(mode)
+
+    ranked = [ranked_for(paper, signals) for paper, signals in prepared]
+    stages: Dict[str, Any] = {}
+    stages["total_score"] = per_paper(prepared, lambda ps: [total_score(ps[0], j, ps[1]) for j in rows], repeat)
+    stages["score_batch"] = per_paper(prepared, lambda ps: score_batch(ps[0], rows, signals=ps[1]), repeat)
+    stages["gate"] = per_paper(
+        prepared,
+        lambda ps: gate_by_topic_fit(ps[0], part.journals, topk=10, rating_filter="2,3", signals=ps[1]),
+        repeat,
+    )
+    stages["rebalance"] = per_paper(
+        ranked,
+        lambda r: rebalance_by_rating_quota(r, allowed_ratings=["2", "3"], target_n=40, mode=mode, exact_balance=True),
+        repeat,
+    )
+    stages["render"] = per_paper(
+        list(zip(prepared, ranked)),
+        lambda pr: render_report(pr[0][0], pr[1], 10),
+        repeat,
+    )
+    stages["recommend"] = per_paper(
+        papers,
+        lambda p: recommend(
+            rows, title=p["title"], abstract=p["abstract"], modes=("easy", "medium", "hard"), profile="general",
+            ajg_csv=ajg_csv,
+        ),
+        repeat,
+    )
+    return stages
+
+
+def bench_cli(papers: List[Dict[str, str]], *, data_dir: str) -> Dict[str, float]:
+    """End-to-end hybrid CLI per paper (fresh interpreter each time; result cache off)."""
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for p in papers:
+            argv = [
+                sys.executable,
+                os.path.join(SCRIPTS_DIR, "abs_journal.py"),
+                "recommend",
+                "--data_dir", data_dir,
+                "--title", p["title"],
+                "--abstract", p["abstract"],
+                "--hybrid", "--auto_ai", "--no-cache",
+                "--export_candidate_pool_json", os.path.join(tmp, "pool.json"),
+                "--ai_output_json", os.path.join(tmp, "ai_output.json"),
+                "--ai_report_md", os.path.join(tmp, "ai_report.md"),
+            ]
+            t0 = time.perf_counter()
+            proc = subprocess.run(argv, capture_output=True, text=True)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+            if proc.returncode != 0:
+                raise RuntimeError(f"CLI 运行失败（{p['id']}）：\n{proc.stderr[-2000:]}")
+    out = summarize(samples)
+    out["per_paper_ms"] = out["median_ms"]
+    return out
+
+
+def git_commit(path: str) -> str:
+    try:
+        proc = subprocess.run(["git", "-C", path, "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return ""
+    return proc.stdout.strip() if proc.returncode == 0 else ""
+
+
+def run_bench(
+    *, ajg_csv: str, sizes: Sequence[int], repeat: int, cli_papers: int, seed: int = 0
+) -> Dict[str, Any]:
+    rows = load_ajg_csv(ajg_csv)
+    load = {
+        "load_csv": timed(lambda: load_ajg_csv(ajg_csv, use_snapshot=False), repeat),
+        "load_snapshot": timed(lambda: load_ajg_csv(ajg_csv), repeat),
+    }
+    corpora = []
+    for n in sizes:
+        papers = synthetic_papers(rows, n, seed=seed)
+        corpora.append({"papers": n, "stages": bench_stages(rows, papers, ajg_csv=ajg_csv, repeat=repeat)})
+    record: Dict[str, Any] = {
+        "format": BENCH_FORMAT,
+        "created_at": now_local_str(),
+        "commit": git_commit(str(skill_root())),
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": importlib.util.find_spec("numpy") is not None,
+            "cpu_count": os.cpu_count(),
+        },
+        "params": {"ajg_csv": ajg_csv, "rows": len(rows), "sizes": list(sizes), "repeat": repeat, "seed": seed},
+        "load": load,
+        "corpora": corpora,
+    }
+    if cli_papers > 0:
+        papers = synthetic_papers(rows, cli_papers, seed=seed)
+        record["cli_hybrid"] = bench_cli(papers, data_dir=os.path.dirname(os.path.abspath(ajg_csv)))
+    return record
+
+
+def flatten(record: Dict[str, Any]) -> Dict[str, float]:
+    """stage name -> per-call/per-paper median ms (for comparisons)."""
+    out = {f"load.{k}": v["median_ms"] for k, v in (record.get("load") or {}).items()}
+    for c in record.get("corpora") or []:
+        for k, v in (c.get("stages") or {}).items():
+            out[f"papers={c['papers']}.{k}"] = v["per_paper_ms"]
+    if record.get("cli_hybrid"):
+        out["cli_hybrid"] = record["cli_hybrid"]["per_paper_ms"]
+    return out
+
+
+def compare(base: Dict[str, Any], cur: Dict[str, Any]) -> List[str]:
+    a, b = flatten(base), flatten(cur)
+    lines = [f"{'stage':<32} {'base ms':>10} {'now ms':>10} {'ratio':>7}"]
+    for k in sorted(set(a) & set(b)):
+        ratio = b[k] / a[k] if a[k] else float("inf")
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        lines.append(f"{k:<32} {a[k]:>10.3f} {b[k]:>10.3f} {ratio:>7.2f}{flag}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="abs-journal 推荐流程耗时基准（离线）")
+    ap.add_argument("--ajg_csv", default=DEFAULT_AJG_CSV, help="AJG核心CSV路径")
+    ap.add_argument("--sizes", default="1,10,100", help="合成论文语料规模（逗号分隔，默认 1,10,100）")
+    ap.add_argument("--repeat", type=int, default=3, help="每项重复次数（取中位数，默认 3）")
+    ap.add_argument("--cli_papers", type=int, default=3, help="端到端 CLI（--hybrid --auto_ai）跑几篇；0 跳过")
+    ap.add_argument("--seed", type=int, default=0, help="合成语料随机种子")
+    ap.add_argument("--output", default="", help="结果 JSON 路径（默认 reports/bench/bench_<时间>_<commit>.json）")
+    ap.add_argument("--compare", default="", help="与之前的结果 JSON 对比并打印各阶段耗时比值")
+    args = ap.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    if not sizes or any(n <= 0 for n in sizes):
+        raise RuntimeError(f"--sizes 必须是正整数列表: {args.sizes!r}")
+    record = run_bench(
+        ajg_csv=os.path.abspath(args.ajg_csv), sizes=sizes, repeat=args.repeat, cli_papers=args.cli_papers, seed=args.seed
+    )
+
+    out_path = args.output
+    if not out_path:
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        out_path = os.path.join(str(reports_dir()), "bench", f"bench_{stamp}_{record['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+
+    for k, v in flatten(record).items():
+        print(f"{k:<32} {v:>10.3f} ms")
+    print(f"已写入基准结果：{out_path}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        print("\n".join(compare(base, record)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -25,13 +25,26 @@ Examples (portable; absolute paths can be derived at runtime):
 from __future__ import annotations
 
 import argparse
+import json
+import math
 import os
 import sys
-from typing import List
 
 from abs_paths import data_dir as default_data_dir
 from abs_paths import reports_dir as default_reports_dir
 from abs_paths import skill_root as resolve_skill_root
+from abs_journal_api import (
+    MODES,
+    iter_jsonl,
+    recommend,
+    recommend_batch,
+    recommend_cached,
+    run_hybrid,
+    update_ajg_data,
+)
+from abs_pool_io import POOL_FORMATS, pool_path_for, write_pool
+from abs_report import REPORT_FORMATS, report_path_for
+from abs_result_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, ResultCache
 
 
 SKILL_ROOT = str(resolve_skill_root())
@@ -42,14 +55,6 @@ DEFAULT_REPORTS_DIR = str(default_reports_dir())
 DEFAULT_AI_OUTPUT_JSON = "ai_output.json"
 DEFAULT_AI_REPORT_MD = "ai_report.md"
 
-# Default rating buckets for a more intuitive difficulty layering.
-# Users can override via --rating_filter explicitly.
-DEFAULT_RATING_FILTER_BY_MODE = {
-    "easy": "1,2",
-    "medium": "2,3",
-    "hard": "4,4*",
-}
-
 
 def resolve_inside_skill(path: str, *, base_dir: str) -> str:
     """Resolve a user path so that relative paths land inside this skill.
@@ -77,155 +82,23 @@ def strip_leading_dirs(path: str, *dirs: str) -> str:
     return path
 
 
-def run_py(script_rel: str, argv: List[str]) -> int:
-    script = os.path.join(SKILL_ROOT, script_rel)
-    if not os.path.isfile(script):
-        raise RuntimeError(f"脚本不存在: {script}")
-    import subprocess
-
-    proc = subprocess.run([sys.executable, script, *argv])
-    return int(proc.returncode)
+def _semantic_weight(value: str) -> float:
+    """argparse type for --semantic_weight: a finite number >= 0 (NaN/inf would poison every total)."""
+    try:
+        weight = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"必须是数字: {value!r}") from None
+    if not math.isfinite(weight) or weight < 0:
+        raise argparse.ArgumentTypeError(f"必须是非负有限数字: {value!r}")
+    return weight
 
 
-def _load_candidate_pools(export_json_list: List[str]) -> List[dict]:
-    import json
-
-    pools: List[dict] = []
-    for p in export_json_list:
-        if not p:
-            continue
-        with open(p, "r", encoding="utf-8") as f:
-            pools.append(json.load(f))
-    return pools
-
-
-def _select_topk_from_pools(export_json_list: List[str], *, topk: int) -> dict:
-    """Auto-pick top journals from candidate pools (offline; no external API)."""
-    pools = _load_candidate_pools(export_json_list)
-    if not pools:
-        raise RuntimeError("未找到候选池 JSON（请先生成候选池）")
-
-    modes = ["easy", "medium", "hard"]
-
-    by_mode = {}
-    for pool in pools:
-        meta = (pool or {}).get("meta") or {}
-        mode = (meta.get("mode") or "").strip() or "unknown"
-        by_mode[mode] = pool
-
-    # Track picked journal names across modes to enforce uniqueness
-    picked_names: set = set()
-
-    def pick_unique(mode: str) -> List[dict]:
-        pool = by_mode.get(mode) or pools[0]
-        candidates = (pool or {}).get("candidates") or []
-        meta = (pool or {}).get("meta") or {}
-
-        # Get rating filter from pool meta to implement 1:1 rating balance
-        rating_filter = meta.get("rating_filter_effective", "")
-        allowed_ratings = [r.strip() for r in rating_filter.split(",") if r.strip()] if rating_filter else []
-
-        def key(c: dict):
-            s = (c or {}).get("signals") or {}
-            return (float(s.get("total_score") or 0.0), float(s.get("fit_score") or 0.0))
-
-        # Group candidates by rating
-        by_rating = {}
-        for c in candidates:
-            rating = (c.get("ajg_2024") or "").strip()
-            if not rating or (allowed_ratings and rating not in allowed_ratings):
-                continue
-            if rating not in by_rating:
-                by_rating[rating] = []
-            by_rating[rating].append(c)
-
-        # Sort each rating group by score
-        for rating in by_rating:
-            by_rating[rating].sort(key=key, reverse=True)
-
-        # Implement 1:1 balanced sampling: pick evenly from each rating
-        out: List[dict] = []
-        if allowed_ratings and len(allowed_ratings) > 1:
-            # Calculate per-rating quota for 1:1 balance
-            per_rating_quota = topk // len(allowed_ratings)
-            remainder = topk % len(allowed_ratings)
-
-            # Pick from each rating group
-            for idx, rating in enumerate(allowed_ratings):
-                quota = per_rating_quota + (1 if idx < remainder else 0)
-                rating_list = by_rating.get(rating, [])
-
-                for c in rating_list:
-                    if len([x for x in out if (x.get("ajg_2024") or "").strip() == rating]) >= quota:
-                        break
-
-                    name = (c.get("journal") or "").strip()
-                    if not name or name in picked_names:
-                        continue
-
-                    out.append({
-                        "journal": name,
-                        "ajg_2024": c.get("ajg_2024", ""),
-                        "topic": "根据候选池打分（主题贴合/可投稿性/价值权重等）自动筛选",
-                    })
-                    picked_names.add(name)
-        else:
-            # Fallback: no rating filter or single rating, use simple ranking
-            ranked = sorted(candidates, key=key, reverse=True)
-            for c in ranked:
-                name = (c.get("journal") or "").strip()
-                if not name or name in picked_names:
-                    continue
-                out.append({
-                    "journal": name,
-                    "ajg_2024": c.get("ajg_2024", ""),
-                    "topic": "根据候选池打分（主题贴合/可投稿性/价值权重等）自动筛选",
-                })
-                picked_names.add(name)
-                if len(out) >= topk:
-                    break
-
-        # Pass 2: Fill remaining slots if needed (allow overlap)
-        if len(out) < topk:
-            all_ranked = sorted(candidates, key=key, reverse=True)
-            for c in all_ranked:
-                name = (c.get("journal") or "").strip()
-                if not name or any(x["journal"] == name for x in out):
-                    continue
-                out.append({
-                    "journal": name,
-                    "ajg_2024": c.get("ajg_2024", ""),
-                    "topic": "根据候选池打分（主题贴合/可投稿性/价值权重等）自动筛选",
-                })
-                if len(out) >= topk:
-                    break
-
-        if len(out) < topk:
-            raise RuntimeError(f"--auto_ai 生成失败：{mode} 仅选到 {len(out)}/{topk}（候选池不足）")
-        return out
-
-    ai_obj = {m: pick_unique(m) for m in modes}
-
-    # If we were given multiple pools (easy/medium/hard), embed them so that
-    # subset validation can correctly validate per-bucket membership.
-    multi_pool = len(pools) > 1 or any(k in by_mode for k in modes)
-    if multi_pool:
-        ai_obj["candidate_pool_by_mode"] = {m: (by_mode.get(m) or {}) for m in modes}
-        # In multi-pool mode, allow overlap across buckets by default for --auto_ai,
-        # since validation will be performed per-bucket membership. Cross-bucket
-        # non-overlap is a nice-to-have but can fail when pools are intentionally
-        # rebalanced or small.
-        ai_obj.setdefault("meta", {})
-        if isinstance(ai_obj["meta"], dict):
-            ai_obj["meta"]["allow_overlap"] = True
-
-    # Merge meta (may already exist).
-    meta = ai_obj.get("meta")
-    if not isinstance(meta, dict):
-        meta = {}
-    meta["generated_by"] = "abs_journal.py --auto_ai"
-    ai_obj["meta"] = meta
-    return ai_obj
+def _update(data_dir: str, *, overwrite: bool = False, incremental: bool = False, debug_http: bool = False) -> int:
+    try:
+        return update_ajg_data(data_dir, overwrite=overwrite, incremental=incremental, debug_http=debug_http)
+    except Exception as e:
+        sys.stderr.write(f"ERROR: {e}\n")
+        return 1
 
 
 def main() -> int:
@@ -233,7 +106,7 @@ def main() -> int:
     sub = ap.add_subparsers(dest="cmd", required=True)
 
     ap_rec = sub.add_parser("recommend", help="基于本地AJG数据推荐投稿期刊（默认不更新）")
-    ap_rec.add_argument("--update", action="store_true", help="显式更新AJG数据库后再推荐（默认不更新）")
+    ap_rec.add_argument("--update", action="store_true", help="显式更新AJG数据库后再推荐（增量更新；默认不更新）")
     ap_rec.add_argument(
         "--data_dir",
         default=str(default_data_dir()),
@@ -278,6 +151,12 @@ def main() -> int:
         default=DEFAULT_AI_REPORT_MD,
         help="混合流程最终报告 Markdown 输出路径。相对路径将写入本 skill 的 reports/ 下；需同时提供 --ai_output_json。",
     )
+    ap_rec.add_argument(
+        "--report_format",
+        choices=REPORT_FORMATS,
+        default="md",
+        help="混合流程最终报告格式（默认 md；json/csv/html 由同一报告模型生成，扩展名随格式替换）",
+    )
     ap_rec.add_argument(
         "--rating_filter",
         default="",
@@ -288,6 +167,68 @@ def main() -> int:
         action="store_true",
         help="启用精确星级平衡（默认推荐：easy:5x2星+5x1星；medium:5x3星+5x2星；hard:5x4*+5x4星）"
     )
+    ap_rec.add_argument(
+        "--pool_format",
+        default="json",
+        choices=list(POOL_FORMATS),
+        help="候选池文件格式：json(缩进，默认)/compact(单行压缩)/jsonl(首行 meta，之后每行一个候选；自动改用 .jsonl 后缀)",
+    )
+    ap_rec.add_argument(
+        "--semantic_weight",
+        type=_semantic_weight,
+        default=0.0,
+        help="语义贴合度权重（离线 n-gram 向量余弦相似度，见 abs_semantic.py；默认 0=关闭，建议 0.5~2）",
+    )
+    ap_rec.add_argument(
+        "--no_cache",
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="不读写推荐结果缓存（默认按 论文/参数/AJG 数据/关键词表 的哈希缓存到 .cache/results/）",
+    )
+
+    ap_batch = sub.add_parser("recommend-batch", help="批量推荐：读取论文 JSONL，多进程打分，逐篇写出结果 JSONL")
+    ap_batch.add_argument(
+        "--input",
+        required=True,
+        help="论文 JSONL（每行一个对象：title 必填；可选 id/abstract/field/field_scope/rating_filter，覆盖下方默认值）",
+    )
+    ap_batch.add_argument("--output", required=True, help="结果 JSONL（每篇一行：各模式 TopK + 候选池）。相对路径将写入本 skill 的 reports/ 下。")
+    ap_batch.add_argument(
+        "--data_dir",
+        default=str(default_data_dir()),
+        help="AJG数据目录（绝对路径推荐）",
+    )
+    ap_batch.add_argument("--modes", default=",".join(MODES), help="逗号分隔的难度列表（默认 easy,medium,hard）")
+    ap_batch.add_argument("--topk", type=int, default=10, help="每个难度输出期刊数（默认10）")
+    ap_batch.add_argument("--field", default="ECON", help="默认论文领域标签/关键词配置（默认ECON）")
+    ap_batch.add_argument("--field_scope", default="", help="默认候选期刊 Field 白名单（留空使用内置白名单）")
+    ap_batch.add_argument("--rating_filter", default="", help="默认星级过滤（留空按 mode 自动分层）")
+    ap_batch.add_argument("--exact_rating_balance", action="store_true", help="启用精确星级平衡")
+    ap_batch.add_argument("--semantic_weight", type=_semantic_weight, default=0.0, help="语义贴合度权重（离线 n-gram 向量余弦相似度，见 abs_semantic.py；默认 0=关闭，建议 0.5~2）")
+    ap_batch.add_argument("--no_pool", action="store_true", help="结果中不包含候选池（仅输出 TopK）")
+    ap_batch.add_argument("--workers", type=int, default=0, help="并行进程数（默认 CPU 核数；1 表示单进程）")
+
+    ap_serve = sub.add_parser("serve", help="启动本地推荐服务（常驻内存；数据文件变化时自动重载）")
+    ap_serve.add_argument(
+        "--data_dir",
+        default=str(default_data_dir()),
+        help="AJG数据目录（绝对路径推荐）",
+    )
+    ap_serve.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    ap_serve.add_argument("--port", type=int, default=8765, help="监听端口（默认 8765）")
+    ap_serve.add_argument("--unix", default="", help="改用 Unix socket 监听（指定 socket 路径）")
+    ap_serve.add_argument("--quiet", action="store_true", help="不打印访问日志")
+
+    ap_sess = sub.add_parser(
+        "session",
+        help="会话模式：从 stdin 逐行读取 JSON 请求（与 serve 的 /recommend 请求体相同），逐行输出结果；同一论文换 mode/星级过滤时不重新打分",
+    )
+    ap_sess.add_argument(
+        "--data_dir",
+        default=str(default_data_dir()),
+        help="AJG数据目录（绝对路径推荐）",
+    )
 
     ap_up = sub.add_parser("update", help="更新AJG数据库（需要 env: AJG_EMAIL/AJG_PASSWORD）")
     ap_up.add_argument(
@@ -296,27 +237,101 @@ def main() -> int:
         help="输出数据目录（绝对路径推荐）",
     )
     ap_up.add_argument("--overwrite", action="store_true", help="允许覆盖既有输出文件（默认不覆盖）")
+    ap_up.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量更新：按 ISSN/标题与现有数据比对，只改写有变化的文件并追加 changelog（无变化时不重建 snapshot）",
+    )
     ap_up.add_argument("--debug-http", action="store_true")
 
+    ap_cache = sub.add_parser("cache", help="管理推荐结果缓存（.cache/results/，可用 ABS_JOURNAL_CACHE_DIR 覆盖）")
+    ap_cache.add_argument("action", choices=["prune", "clear", "stats"], help="prune=按 LRU 裁剪到上限；clear=全部删除；stats=查看占用")
+    ap_cache.add_argument("--max_mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024), help="prune 的总大小上限（MB）")
+    ap_cache.add_argument("--max_entries", type=int, default=DEFAULT_MAX_ENTRIES, help="prune 的条目数上限")
+
+    ap_snap = sub.add_parser("compile-snapshot", help="将 AJG 核心 CSV 编译为二进制 snapshot（推荐时自动优先读取）")
+    ap_snap.add_argument(
+        "--data_dir",
+        default=str(default_data_dir()),
+        help="AJG数据目录（绝对路径推荐）",
+    )
+    ap_snap.add_argument("--ajg_csv", default="", help="指定 CSV 路径（默认 <data_dir>/ajg_2024_journals_core_custom.csv）")
+    ap_snap.add_argument("--semantic", action="store_true", help="同时构建语义向量矩阵（<csv stem>.semvec；--semantic_weight 使用）")
+
     args, unknown = ap.parse_known_args()
 
+    if args.cmd == "compile-snapshot":
+        from abs_article_impl import write_ajg_snapshot
+
+        csv_path = args.ajg_csv or os.path.join(os.path.abspath(args.data_dir), "ajg_2024_journals_core_custom.csv")
+        print(f"已写入 AJG snapshot：{write_ajg_snapshot(csv_path)}")
+        if args.semantic:
+            from abs_article_impl import load_ajg_csv
+            from abs_semantic import write_semantic_index
+
+            rows = load_ajg_csv(csv_path)
+            sem_path, _index = write_semantic_index(os.path.abspath(csv_path), [(r.field, r.title) for r in rows])
+            print(f"已写入语义向量：{sem_path}")
+        return 0
+
+    if args.cmd == "recommend-batch":
+        out_path = resolve_inside_skill(
+            strip_leading_dirs(args.output.strip(), "reports", "reports/reports"), base_dir=DEFAULT_REPORTS_DIR
+        )
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        records = recommend_batch(
+            iter_jsonl(os.path.abspath(args.input)),
+            modes=[m.strip() for m in args.modes.split(",") if m.strip()],
+            field=args.field,
+            field_scope=args.field_scope,
+            rating_filter=args.rating_filter,
+            topk=args.topk,
+            exact_rating_balance=args.exact_rating_balance,
+            export_pool=not args.no_pool,
+            ajg_csv=os.path.join(os.path.abspath(args.data_dir), "ajg_2024_journals_core_custom.csv"),
+            workers=args.workers or None,
+            semantic_weight=args.semantic_weight,
+        )
+        total = failed = 0
+        with open(out_path, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                f.flush()
+                total += 1
+                if "error" in rec:
+                    failed += 1
+                    print(f"[{rec['index']}] 失败：{rec['error']}", file=sys.stderr)
+        print(f"已写入批量推荐结果：{out_path}（{total} 篇，失败 {failed} 篇）")
+        return 0 if not failed else 1
+
+    if args.cmd == "cache":
+        cache = ResultCache(max_bytes=int(args.max_mb * 1024 * 1024), max_entries=args.max_entries)
+        if args.action == "prune":
+            print(f"已裁剪推荐结果缓存：删除 {cache.prune()} 条")
+        elif args.action == "clear":
+            print(f"已清空推荐结果缓存：删除 {cache.clear()} 条")
+        stats = cache.stats()
+        print(f"缓存目录：{stats['root']}（{stats['entries']} 条，{stats['bytes'] / (1024 * 1024):.2f} MB）")
+        return 0
+
+    if args.cmd == "serve":
+        from abs_server import serve
+
+        return serve(data_dir=args.data_dir, host=args.host, port=args.port, unix_socket=args.unix, quiet=args.quiet)
+
+    if args.cmd == "session":
+        from abs_server import serve_stdio
+
+        return serve_stdio(data_dir=args.data_dir)
+
     if args.cmd == "update":
-        fetch_args = [
-            "--outdir",
-            os.path.abspath(args.data_dir),
-        ]
-        if args.overwrite:
-            fetch_args.append("--overwrite")
-        if args.debug_http:
-            fetch_args.append("--debug-http")
-        return run_py("scripts/ajg_fetch.py", fetch_args)
+        return _update(args.data_dir, overwrite=args.overwrite, incremental=args.incremental, debug_http=args.debug_http)
 
     if args.cmd == "recommend":
         data_dir = os.path.abspath(args.data_dir)
         os.makedirs(DEFAULT_REPORTS_DIR, exist_ok=True)
         if args.update:
-            fetch_args = ["--outdir", data_dir]
-            returncode = run_py("scripts/ajg_fetch.py", fetch_args)
+            returncode = _update(data_dir, incremental=True)
             if returncode != 0:
                 return returncode
 
@@ -329,7 +344,7 @@ def main() -> int:
         if args.hybrid and not export_json:
             export_json = resolve_inside_skill("candidate_pool.json", base_dir=DEFAULT_REPORTS_DIR)
 
-        modes = ["easy", "medium", "hard"]
+        modes = list(MODES)
         if args.mode and args.mode not in modes:
             raise RuntimeError(f"非法 --mode: {args.mode}（允许：easy/medium/hard）")
 
@@ -346,40 +361,36 @@ def main() -> int:
             export_json_list = [f"{base}_{m}{ext or '.json'}" for m in selected_modes]
         else:
             export_json_list = [export_json] if export_json else [""]
+        export_json_list = [pool_path_for(p, args.pool_format) if p else "" for p in export_json_list]
 
         # Auto-enable exact_rating_balance for hybrid mode to ensure 1:1 rating distribution in recommendations
         if args.hybrid and not args.exact_rating_balance:
             args.exact_rating_balance = True
 
+        # All selected modes are scored in-process from one data load: the CSV/snapshot is
+        # read once and mode-independent components (fit/prestige/method/domain) are shared.
+        rec_kwargs = dict(
+            title=args.title,
+            abstract=args.abstract,
+            modes=selected_modes,
+            field=args.field,
+            field_scope=args.field_scope,
+            rating_filter=args.rating_filter,
+            topk=args.topk,
+            exact_rating_balance=bool(getattr(args, "exact_rating_balance", False)),
+            export_pool=any(export_json_list),
+            ajg_csv=os.path.join(data_dir, "ajg_2024_journals_core_custom.csv"),
+            semantic_weight=args.semantic_weight,
+        )
+        if args.no_cache:
+            results = recommend(**rec_kwargs)
+        else:
+            results = recommend_cached(cache=ResultCache(), **rec_kwargs)
         for m, out_json in zip(selected_modes, export_json_list):
-            rating_filter = (args.rating_filter or "").strip()
-            if not rating_filter:
-                rating_filter = DEFAULT_RATING_FILTER_BY_MODE.get(m, "")
-            rec_args = [
-                "--ajg_csv",
-                os.path.join(data_dir, "ajg_2024_journals_core_custom.csv"),
-                "--title",
-                args.title,
-                "--abstract",
-                args.abstract,
-                "--field",
-                args.field,
-                "--field_scope",
-                args.field_scope,
-                "--mode",
-                m,
-                "--topk",
-                str(args.topk),
-                "--export_candidate_pool_json",
-                out_json,
-                "--rating_filter",
-                rating_filter,
-            ]
-            if getattr(args, "exact_rating_balance", False):
-                rec_args.append("--exact_rating_balance")
-            returncode = run_py("scripts/abs_article_impl.py", rec_args)
-            if returncode != 0:
-                return returncode
+            res = results[m]
+            print(res.report)
+            if out_json and res.candidate_pool is not None:
+                write_pool(out_json, res.candidate_pool, fmt=args.pool_format)
 
         if not args.hybrid:
             return 0
@@ -395,61 +406,43 @@ def main() -> int:
         if args.ai_output_json:
             if not export_json_list or any((not p) for p in export_json_list):
                 raise RuntimeError("混合流程需要候选池 JSON 输出（请提供 --export_candidate_pool_json）")
-            pool_arg = export_json_list if multi_pool else export_json_list[0]
             ai_output_path = resolve_inside_skill(args.ai_output_json, base_dir=DEFAULT_REPORTS_DIR)
 
+            # Pools, AI selection, validation and report all run over the in-memory pool
+            # dicts (run_hybrid); the JSON/report files below are written as artifacts only.
             if args.auto_ai:
                 if not args.ai_report_md:
                     raise RuntimeError("--auto_ai 需要同时提供 --ai_report_md（用于输出最终报告）")
+                ai_output = None
+            else:
+                if not os.path.exists(ai_output_path):
+                    raise RuntimeError(f"JSON 不存在: {ai_output_path}")
+                with open(ai_output_path, "r", encoding="utf-8") as f:
+                    ai_output = json.load(f)
+
+            hyb = run_hybrid(results, ai_output=ai_output, topk=args.topk, report_format=args.report_format)
+            if args.auto_ai:
                 os.makedirs(os.path.dirname(ai_output_path) or ".", exist_ok=True)
-                import json
-
-                auto = _select_topk_from_pools(export_json_list, topk=args.topk)
                 with open(ai_output_path, "w", encoding="utf-8") as f:
-                    json.dump(auto, f, ensure_ascii=False, indent=2)
+                    # ai_output embeds all three pools; non-default pool formats keep it minified too.
+                    if args.pool_format == "json":
+                        json.dump(hyb.ai_output, f, ensure_ascii=False, indent=2)
+                    else:
+                        json.dump(hyb.ai_output, f, ensure_ascii=False, separators=(",", ":"))
                 print(f"已自动生成 AI 输出 JSON：{ai_output_path}")
 
-            returncode = run_py(
-                "scripts/abs_ai_review.py",
-                [
-                    "--candidate_pool_json",
-                    # For --auto_ai, we embed candidate pools into ai_output.json, so pass that file.
-                    ai_output_path if args.auto_ai else (pool_arg if isinstance(pool_arg, str) else pool_arg[0]),
-                    "--ai_output_json",
-                    ai_output_path,
-                    "--topk",
-                    str(args.topk),
-                ],
-            )
-            if returncode != 0:
-                return returncode
+            if not hyb.ok:
+                print("INVALID")
+                for e in hyb.errors:
+                    print("-", e)
+                return 2
+            print("OK")
 
             if args.ai_report_md:
-                out_md = resolve_inside_skill(args.ai_report_md, base_dir=DEFAULT_REPORTS_DIR)
+                out_md = report_path_for(resolve_inside_skill(args.ai_report_md, base_dir=DEFAULT_REPORTS_DIR), args.report_format)
                 os.makedirs(os.path.dirname(out_md) or ".", exist_ok=True)
-                import subprocess
-
-                pool_for_report = pool_arg if isinstance(pool_arg, str) else pool_arg[0]
-                proc = subprocess.run(
-                    [
-                        sys.executable,
-                        os.path.join(SKILL_ROOT, "scripts", "hybrid_report.py"),
-                        "--candidate_pool_json",
-                        pool_for_report,
-                        "--ai_output_json",
-                        ai_output_path,
-                        "--topk",
-                        str(args.topk),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-                if proc.returncode != 0:
-                    print(proc.stdout, end="")
-                    print(proc.stderr, end="", file=sys.stderr)
-                    return int(proc.returncode)
                 with open(out_md, "w", encoding="utf-8") as f:
-                    f.write(proc.stdout)
+                    f.write(hyb.report if hyb.report.endswith("\n") else hyb.report + "\n")
                 print(f"已写入混合流程报告：{out_md}")
             return 0
 
@@ -0,0 +1,736 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""In-process API for ABS-Journal (what `abs_journal.py` wraps).
+
+Every stage returns Python objects instead of writing JSON for the next
+subprocess to re-read, so a batch of recommendations can run in one
+interpreter from a single data load:
+
+    from abs_journal_api import load_rows, recommend_hybrid
+
+    rows = load_rows()
+    for title, abstract in papers:
+        res = recommend_hybrid(rows, title=title, abstract=abstract)
+        if res.ok:
+            print(res.report)
+        else:
+            print(res.errors)
+
+Re-asking about the same paper with another mode or rating filter goes through a
+RecommendSession, which keeps the mode-independent scores of recent papers:
+
+    session = RecommendSession(rows)
+    session.recommend(title=title, modes=["medium"])
+    session.recommend(title=title, modes=["hard"], rating_filter="3,4")  # no rescoring
+
+Files are only written when the caller asks for artifacts (the CLI does).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from abs_ai_review import validate_subset
+from abs_article_impl import (
+    DEFAULT_AJG_CSV,
+    JournalRow,
+    RecommendContext,
+    RecommendResult,
+    candidate_to_dict,
+    keyword_file_path,
+    load_ajg_csv,
+    now_local_str,
+    prepare_recommendation,
+    recommend_mode,
+    recommend_modes,
+)
+from abs_result_cache import ResultCache, cache_key
+from abs_result_cache import data_digest as cache_data_digest
+from abs_result_cache import file_digest as cache_file_digest
+from abs_semantic import SEMANTIC_FINGERPRINT, raw_jsonl_path_for
+from hybrid_report import render_report as render_hybrid_report
+
+MODES = ("easy", "medium", "hard")
+
+# Default rating buckets for a more intuitive difficulty layering.
+# Users can override via --rating_filter explicitly.
+DEFAULT_RATING_FILTER_BY_MODE = {
+    "easy": "1,2",
+    "medium": "2,3",
+    "hard": "4,4*",
+}
+
+AUTO_AI_TOPIC = "根据候选池打分（主题贴合/可投稿性/价值权重等）自动筛选"
+
+
+@dataclass
+class HybridResult:
+    """Hybrid flow output: per-mode results, the AI selection, validation errors and report."""
+
+    results: Dict[str, RecommendResult]
+    ai_output: Dict[str, Any]
+    errors: List[str]
+    report: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def pools(self) -> Dict[str, Dict[str, Any]]:
+        return {m: r.candidate_pool or {} for m, r in self.results.items()}
+
+
+def load_rows(ajg_csv: str = DEFAULT_AJG_CSV) -> List[JournalRow]:
+    return load_ajg_csv(ajg_csv)
+
+
+def rating_filters_for(modes: Sequence[str], rating_filter: str = "") -> Dict[str, str]:
+    """Explicit `rating_filter` applies to every mode; otherwise use the per-mode defaults."""
+    rating_filter = (rating_filter or "").strip()
+    return {m: rating_filter or DEFAULT_RATING_FILTER_BY_MODE.get(m, "") for m in modes}
+
+
+def recommend(
+    rows: Optional[List[JournalRow]] = None,
+    *,
+    title: str,
+    abstract: str = "",
+    modes: Sequence[str] = ("easy",),
+    field: str = "ECON",
+    field_scope: str = "",
+    rating_filter: str = "",
+    topk: int = 10,
+    profile: Optional[str] = None,
+    exact_rating_balance: bool = False,
+    export_pool: bool = True,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    semantic_weight: float = 0.0,
+) -> Dict[str, RecommendResult]:
+    """Recommend `modes` for one paper; `rows` defaults to loading `ajg_csv`.
+
+    `semantic_weight` > 0 blends the offline semantic fit (abs_semantic.py) into total_score.
+    """
+    bad = [m for m in modes if m not in MODES]
+    if not modes or bad:
+        raise RuntimeError(f"非法 mode: {bad or modes}（允许：easy/medium/hard）")
+    if rows is None:
+        rows = load_ajg_csv(ajg_csv)
+    return recommend_modes(
+        rows,
+        title=title,
+        abstract=abstract,
+        field=field,
+        field_scope=field_scope,
+        modes=modes,
+        rating_filter_by_mode=rating_filters_for(modes, rating_filter),
+        topk=topk,
+        profile=profile if profile is not None else os.environ.get("ABS_PROFILE", "general"),
+        exact_rating_balance=exact_rating_balance,
+        export_pool=export_pool,
+        ajg_csv=ajg_csv,
+        semantic_weight=float(semantic_weight),
+    )
+
+
+def recommend_cached(
+    rows: Optional[List[JournalRow]] = None,
+    *,
+    cache: ResultCache,
+    title: str,
+    abstract: str = "",
+    modes: Sequence[str] = ("easy",),
+    field: str = "ECON",
+    field_scope: str = "",
+    rating_filter: str = "",
+    topk: int = 10,
+    profile: Optional[str] = None,
+    exact_rating_balance: bool = False,
+    export_pool: bool = True,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    semantic_weight: float = 0.0,
+) -> Dict[str, Any]:
+    """`recommend()` through the on-disk result cache.
+
+    Each mode is looked up separately; only the missing modes are computed (in
+    one shared pass) and stored. Hits are CachedResult objects, misses are
+    RecommendResult objects; both expose `report` and `candidate_pool`. A hit's
+    generation time and AJG path are refreshed and its report notes the cache hit.
+    The AJG rows are not loaded at all when every mode hits.
+    """
+    bad = [m for m in modes if m not in MODES]
+    if not modes or bad:
+        raise RuntimeError(f"非法 mode: {bad or modes}（允许：easy/medium/hard）")
+    profile = profile if profile is not None else os.environ.get("ABS_PROFILE", "general")
+    filters = rating_filters_for(modes, rating_filter)
+    shared = {
+        "title": title,
+        "abstract": abstract,
+        "field": field,
+        "field_scope": field_scope,
+        "profile": profile,
+        "topk": int(topk),
+        "exact_rating_balance": bool(exact_rating_balance),
+        "export_pool": bool(export_pool),
+        "ajg_sha256": cache_data_digest(ajg_csv),
+        "keywords_sha256": cache_file_digest(keyword_file_path(profile)),
+    }
+    if semantic_weight:
+        # Only keyed when enabled, so entries written without semantic scoring stay valid.
+        shared["semantic"] = {
+            "weight": float(semantic_weight),
+            "features": SEMANTIC_FINGERPRINT,
+            "raw_sha256": cache_file_digest(raw_jsonl_path_for(ajg_csv)),
+        }
+    params = {m: {**shared, "mode": m, "rating_filter": filters[m]} for m in modes}
+    keys = {m: cache_key(params[m]) for m in modes}
+
+    out: Dict[str, Any] = {}
+    for m in modes:
+        hit = cache.get(keys[m])
+        if hit is not None:
+            hit.mark_hit(now=now_local_str(), ajg_csv=ajg_csv)
+            out[m] = hit
+    missing = [m for m in modes if m not in out]
+    if missing:
+        fresh = recommend(
+            rows,
+            title=title,
+            abstract=abstract,
+            modes=missing,
+            field=field,
+            field_scope=field_scope,
+            rating_filter=rating_filter,
+            topk=topk,
+            profile=profile,
+            exact_rating_balance=exact_rating_balance,
+            export_pool=export_pool,
+            ajg_csv=ajg_csv,
+            semantic_weight=semantic_weight,
+        )
+        for m, res in fresh.items():
+            cache.put(keys[m], params[m], report=res.report, candidate_pool=res.candidate_pool)
+            out[m] = res
+    return {m: out[m] for m in modes}
+
+
+@dataclass
+class _SessionEntry:
+    """One paper's slot in a RecommendSession; `lock` serializes scoring and ranking on `ctx`."""
+
+    lock: threading.Lock
+    ctx: Optional[RecommendContext] = None
+
+
+class RecommendSession:
+    """Per-paper memo of mode-independent scores (RecommendContext) over one set of AJG rows.
+
+    The first request for a paper scores its candidates once (fit, prestige, method,
+    domain, semantic); later requests for the same paper with another mode, rating
+    filter, TopK or balance setting only redo gating, mode weighting, rebalancing and
+    rendering. Keeps the `max_papers` most recently used papers; thread-safe: the
+    session lock only guards the LRU lookup/insert, and each paper's scoring runs under
+    its own lock, so requests for different papers proceed in parallel.
+    """
+
+    def __init__(
+        self, rows: Optional[List[JournalRow]] = None, *, ajg_csv: str = DEFAULT_AJG_CSV, max_papers: int = 32
+    ) -> None:
+        self.ajg_csv = ajg_csv
+        self.max_papers = max(1, int(max_papers))
+        self.hits = 0
+        self.misses = 0
+        self._rows = rows
+        self._contexts: "OrderedDict[Tuple[Any, ...], _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> List[JournalRow]:
+        if self._rows is None:
+            with self._lock:
+                if self._rows is None:
+                    self._rows = load_ajg_csv(self.ajg_csv)
+        return self._rows
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+
+    def _entry(self, key: Tuple[Any, ...]) -> _SessionEntry:
+        with self._lock:
+            entry = self._contexts.get(key)
+            if entry is not None:
+                self._contexts.move_to_end(key)
+                self.hits += 1
+                return entry
+            entry = _SessionEntry(threading.Lock())
+            self.misses += 1
+            self._contexts[key] = entry
+            while len(self._contexts) > self.max_papers:
+                self._contexts.popitem(last=False)
+            return entry
+
+    def _drop(self, key: Tuple[Any, ...], entry: _SessionEntry) -> None:
+        with self._lock:
+            if self._contexts.get(key) is entry:
+                del self._contexts[key]
+
+    def _locked_context(
+        self,
+        *,
+        title: str,
+        abstract: str = "",
+        field: str = "ECON",
+        field_scope: str = "",
+        profile: Optional[str] = None,
+        semantic_weight: float = 0.0,
+    ) -> Tuple[_SessionEntry, RecommendContext]:
+        """(entry, ctx) with `entry.lock` held; the caller must release it."""
+        profile = profile if profile is not None else os.environ.get("ABS_PROFILE", "general")
+        key = (title, abstract, field, (field_scope or "").strip(), profile, float(semantic_weight))
+        entry = self._entry(key)
+        entry.lock.acquire()
+        if entry.ctx is None:
+            try:
+                entry.ctx = prepare_recommendation(
+                    self.rows,
+                    title=title,
+                    abstract=abstract,
+                    field=field,
+                    field_scope=field_scope,
+                    profile=profile,
+                    ajg_csv=self.ajg_csv,
+                    semantic_weight=float(semantic_weight),
+                )
+            except BaseException:
+                entry.lock.release()
+                self._drop(key, entry)
+                raise
+        return entry, entry.ctx
+
+    def context(
+        self,
+        *,
+        title: str,
+        abstract: str = "",
+        field: str = "ECON",
+        field_scope: str = "",
+        profile: Optional[str] = None,
+        semantic_weight: float = 0.0,
+    ) -> RecommendContext:
+        """The paper's scored context, computed on first use."""
+        entry, ctx = self._locked_context(
+            title=title,
+            abstract=abstract,
+            field=field,
+            field_scope=field_scope,
+            profile=profile,
+            semantic_weight=semantic_weight,
+        )
+        entry.lock.release()
+        return ctx
+
+    def recommend(
+        self,
+        *,
+        title: str,
+        abstract: str = "",
+        modes: Sequence[str] = ("easy",),
+        field: str = "ECON",
+        field_scope: str = "",
+        rating_filter: str = "",
+        topk: int = 10,
+        profile: Optional[str] = None,
+        exact_rating_balance: bool = False,
+        export_pool: bool = True,
+        semantic_weight: float = 0.0,
+    ) -> Dict[str, RecommendResult]:
+        """Same arguments and results as `recommend()`, reusing this session's scores."""
+        bad = [m for m in modes if m not in MODES]
+        if not modes or bad:
+            raise RuntimeError(f"非法 mode: {bad or modes}（允许：easy/medium/hard）")
+        filters = rating_filters_for(modes, rating_filter)
+        entry, ctx = self._locked_context(
+            title=title,
+            abstract=abstract,
+            field=field,
+            field_scope=field_scope,
+            profile=profile,
+            semantic_weight=semantic_weight,
+        )
+        try:
+            # The context's selector/vectors memoize orders and totals, so one paper's modes run serially.
+            return {
+                m: recommend_mode(
+                    ctx,
+                    m,
+                    topk=topk,
+                    rating_filter=filters[m],
+                    exact_rating_balance=exact_rating_balance,
+                    export_pool=export_pool,
+                )
+                for m in modes
+            }
+        finally:
+            entry.lock.release()
+
+
+def select_topk_from_pools(pools: List[Dict[str, Any]], *, topk: int) -> Dict[str, Any]:
+    """Auto-pick top journals from candidate pools (offline; no external API)."""
+    pools = [p for p in pools if p is not None]
+    if not pools:
+        raise RuntimeError("未找到候选池 JSON（请先生成候选池）")
+
+    modes = list(MODES)
+
+    by_mode = {}
+    for pool in pools:
+        meta = (pool or {}).get("meta") or {}
+        mode = (meta.get("mode") or "").strip() or "unknown"
+        by_mode[mode] = pool
+
+    # Track picked journal names across modes to enforce uniqueness
+    picked_names: set = set()
+
+    def key(c: dict):
+        s = (c or {}).get("signals") or {}
+        return (float(s.get("total_score") or 0.0), float(s.get("fit_score") or 0.0))
+
+    def pick_unique(mode: str) -> List[dict]:
+        pool = by_mode.get(mode) or pools[0]
+        candidates = (pool or {}).get("candidates") or []
+        meta = (pool or {}).get("meta") or {}
+
+        # Get rating filter from pool meta to implement 1:1 rating balance
+        rating_filter = meta.get("rating_filter_effective", "")
+        allowed_ratings = [r.strip() for r in rating_filter.split(",") if r.strip()] if rating_filter else []
+
+        # One score sort per pool; every pass below walks it (or its per-rating slices) once.
+        ranked = sorted(candidates, key=key, reverse=True)
+        out: List[dict] = []
+        out_names: set = set()  # names already in `out` (O(1) duplicate check)
+
+        def take(c: dict, name: str) -> None:
+            out.append({
+                "journal": name,
+                "ajg_2024": c.get("ajg_2024", ""),
+                "topic": AUTO_AI_TOPIC,
+            })
+            out_names.add(name)
+
+        # Implement 1:1 balanced sampling: pick evenly from each rating
+        if allowed_ratings and len(allowed_ratings) > 1:
+            # Group candidates by rating (stable: keeps score order within each rating)
+            allowed = set(allowed_ratings)
+            by_rating: Dict[str, List[dict]] = {}
+            for c in ranked:
+                rating = (c.get("ajg_2024") or "").strip()
+                if rating in allowed:
+                    by_rating.setdefault(rating, []).append(c)
+
+            # Calculate per-rating quota for 1:1 balance
+            per_rating_quota = topk // len(allowed_ratings)
+            remainder = topk % len(allowed_ratings)
+
+            # Pick from each rating group; `taken` counts this rating's picks
+            for idx, rating in enumerate(allowed_ratings):
+                quota = per_rating_quota + (1 if idx < remainder else 0)
+                taken = 0
+                for c in by_rating.get(rating, []):
+                    if taken >= quota:
+                        break
+                    name = (c.get("journal") or "").strip()
+                    if not name or name in picked_names:
+                        continue
+                    take(c, name)
+                    picked_names.add(name)
+                    taken += 1
+        else:
+            # Fallback: no rating filter or single rating, use simple ranking
+            for c in ranked:
+                name = (c.get("journal") or "").strip()
+                if not name or name in picked_names:
+                    continue
+                take(c, name)
+                picked_names.add(name)
+                if len(out) >= topk:
+                    break
+
+        # Pass 2: Fill remaining slots if needed (allow overlap)
+        if len(out) < topk:
+            for c in ranked:
+                name = (c.get("journal") or "").strip()
+                if not name or name in out_names:
+                    continue
+                take(c, name)
+                if len(out) >= topk:
+                    break
+
+        if len(out) < topk:
+            raise RuntimeError(f"--auto_ai 生成失败：{mode} 仅选到 {len(out)}/{topk}（候选池不足）")
+        return out
+
+    ai_obj = {m: pick_unique(m) for m in modes}
+
+    # If we were given multiple pools (easy/medium/hard), embed them so that
+    # subset validation can correctly validate per-bucket membership.
+    multi_pool = len(pools) > 1 or any(k in by_mode for k in modes)
+    if multi_pool:
+        ai_obj["candidate_pool_by_mode"] = {m: (by_mode.get(m) or {}) for m in modes}
+        # In multi-pool mode, allow overlap across buckets by default for --auto_ai,
+        # since validation will be performed per-bucket membership. Cross-bucket
+        # non-overlap is a nice-to-have but can fail when pools are intentionally
+        # rebalanced or small.
+        ai_obj.setdefault("meta", {})
+        if isinstance(ai_obj["meta"], dict):
+            ai_obj["meta"]["allow_overlap"] = True
+
+    # Merge meta (may already exist).
+    meta = ai_obj.get("meta")
+    if not isinstance(meta, dict):
+        meta = {}
+    meta["generated_by"] = "abs_journal.py --auto_ai"
+    ai_obj["meta"] = meta
+    return ai_obj
+
+
+def review_ai_output(
+    results: Dict[str, RecommendResult], ai_output: Dict[str, Any], *, topk: int
+) -> List[str]:
+    """Subset-validate `ai_output`; returns the error list (empty means OK).
+
+    Auto-generated output embeds per-mode pools and is checked bucket by bucket;
+    a hand-written selection is checked against the easy pool, as the CLI always did.
+    """
+    if isinstance(ai_output.get("candidate_pool_by_mode"), dict):
+        return validate_subset(ai_output, ai_output, topk=topk)
+    first = next(iter(results.values()))
+    return validate_subset(first.candidate_pool or {}, ai_output, topk=topk)
+
+
+def run_hybrid(
+    results: Dict[str, RecommendResult],
+    *,
+    topk: int,
+    ai_output: Optional[Dict[str, Any]] = None,
+    report_format: str = "md",
+) -> HybridResult:
+    """Selection -> validation -> report over the in-memory pools of `results`.
+
+    `results` must hold all three modes with exported pools. Every step reads the
+    same pool dicts (the auto selection only references them), so nothing is
+    serialized or re-parsed; callers write pools/selection/report as artifacts.
+    """
+    if ai_output is None:
+        ai_output = select_topk_from_pools([r.candidate_pool for r in results.values()], topk=topk)
+    errors = review_ai_output(results, ai_output, topk=topk)
+    report = ""
+    if not errors:
+        first = next(iter(results.values()))
+        report = render_hybrid_report(first.candidate_pool or {}, ai_output, topk=topk, fmt=report_format)
+    return HybridResult(results=results, ai_output=ai_output, errors=errors, report=report)
+
+
+def recommend_hybrid(
+    rows: Optional[List[JournalRow]] = None,
+    *,
+    title: str,
+    abstract: str = "",
+    ai_output: Optional[Dict[str, Any]] = None,
+    field: str = "ECON",
+    field_scope: str = "",
+    rating_filter: str = "",
+    topk: int = 10,
+    profile: Optional[str] = None,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    report_format: str = "md",
+    semantic_weight: float = 0.0,
+) -> HybridResult:
+    """Full hybrid flow in memory: pools for all modes -> AI selection -> validation -> report.
+
+    Without `ai_output` the selection is generated offline from the pools (the
+    CLI's --auto_ai). The report is only rendered when validation passes, in
+    `report_format` (one of abs_report.REPORT_FORMATS).
+    """
+    results = recommend(
+        rows,
+        title=title,
+        abstract=abstract,
+        modes=MODES,
+        field=field,
+        field_scope=field_scope,
+        rating_filter=rating_filter,
+        topk=topk,
+        profile=profile,
+        exact_rating_balance=True,
+        export_pool=True,
+        ajg_csv=ajg_csv,
+        semantic_weight=semantic_weight,
+    )
+    return run_hybrid(results, ai_output=ai_output, topk=topk, report_format=report_format)
+
+
+def results_to_dict(
+    results: Dict[str, RecommendResult], *, topk: int, report: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """JSON-ready view of per-mode results: TopK entries and pool (plus the Markdown report if asked)."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for m, r in results.items():
+        item: Dict[str, Any] = {
+            "topk": [candidate_to_dict(j, s) for j, s in r.ranked[:topk]],
+            "pool": r.candidate_pool,
+        }
+        if report:
+            item["report"] = r.report
+        out[m] = item
+    return out
+
+
+# Per-paper keys in a batch JSONL record; anything missing falls back to the batch defaults.
+BATCH_PAPER_KEYS = ("title", "abstract", "field", "field_scope", "rating_filter")
+
+# Worker-process state for recommend_batch(): rows and options are loaded once per process.
+_BATCH_ROWS: Optional[List[JournalRow]] = None
+_BATCH_OPTS: Dict[str, Any] = {}
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per non-empty line of a JSONL file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"JSONL 解析失败: {path}:{lineno}: {e}")
+            if not isinstance(obj, dict):
+                raise RuntimeError(f"JSONL 每行必须是 JSON 对象: {path}:{lineno}")
+            yield obj
+
+
+def _batch_init(ajg_csv: str, opts: Dict[str, Any]) -> None:
+    global _BATCH_ROWS, _BATCH_OPTS
+    _BATCH_ROWS = load_ajg_csv(ajg_csv)
+    _BATCH_OPTS = dict(opts, ajg_csv=ajg_csv)
+
+
+def _batch_one(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+    index, paper = item
+    opts = _BATCH_OPTS
+    rec: Dict[str, Any] = {"index": index, "id": paper.get("id", index), "title": paper.get("title") or ""}
+    try:
+        if not (paper.get("title") or "").strip():
+            raise RuntimeError("缺少 title")
+        kwargs = {k: opts[k] for k in BATCH_PAPER_KEYS if k in opts}
+        kwargs.update({k: paper[k] for k in BATCH_PAPER_KEYS if paper.get(k) is not None})
+        results = recommend(
+            _BATCH_ROWS,
+            modes=opts["modes"],
+            topk=opts["topk"],
+            profile=opts["profile"],
+            exact_rating_balance=opts["exact_rating_balance"],
+            export_pool=opts["export_pool"],
+            ajg_csv=opts["ajg_csv"],
+            semantic_weight=opts.get("semantic_weight", 0.0),
+            **kwargs,
+        )
+    except Exception as e:
+        rec["error"] = str(e)
+        return rec
+    rec["results"] = results_to_dict(results, topk=opts["topk"])
+    return rec
+
+
+def recommend_batch(
+    papers: Iterable[Dict[str, Any]],
+    *,
+    modes: Sequence[str] = MODES,
+    field: str = "ECON",
+    field_scope: str = "",
+    rating_filter: str = "",
+    topk: int = 10,
+    profile: Optional[str] = None,
+    exact_rating_balance: bool = False,
+    export_pool: bool = True,
+    ajg_csv: str = DEFAULT_AJG_CSV,
+    workers: Optional[int] = None,
+    semantic_weight: float = 0.0,
+) -> Iterator[Dict[str, Any]]:
+    """Recommend many papers, yielding one result record per paper in input order.
+
+    Each paper is a dict with `title` and optionally `id`, `abstract`, `field`,
+    `field_scope` and `rating_filter` (overriding the batch defaults). Papers
+    are scored across `workers` processes (default: CPU count, capped at the number
+    of papers); each worker loads the AJG rows and keyword tables once. `workers=1`
+    runs in-process. `papers` is consumed lazily: at most `2 * workers` papers are in
+    flight, so a large JSONL streams instead of being queued up front.
+    A failing paper yields a record with `error` instead of `results`.
+    """
+    opts = {
+        "modes": tuple(modes),
+        "field": field,
+        "field_scope": field_scope,
+        "rating_filter": rating_filter,
+        "topk": int(topk),
+        "profile": profile if profile is not None else os.environ.get("ABS_PROFILE", "general"),
+        "exact_rating_balance": bool(exact_rating_balance),
+        "export_pool": bool(export_pool),
+        "semantic_weight": float(semantic_weight),
+    }
+    workers = int(workers or os.cpu_count() or 1)
+    items = enumerate(papers)
+    # Peek at most `workers` papers: a short batch never starts more processes than papers.
+    head = list(itertools.islice(items, max(workers, 1)))
+    if not head:
+        return
+    workers = min(workers, len(head))
+    items = itertools.chain(head, items)
+    if workers <= 1:
+        _batch_init(ajg_csv, opts)
+        yield from map(_batch_one, items)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init, initargs=(ajg_csv, opts)) as ex:
+        window: deque = deque()
+        for item in items:
+            window.append(ex.submit(_batch_one, item))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def update_ajg_data(
+    data_dir: str, *, overwrite: bool = False, incremental: bool = False, debug_http: bool = False
+) -> int:
+    """Fetch the latest AJG dataset into `data_dir` (network; needs AJG_EMAIL/AJG_PASSWORD).
+
+    With `incremental`, existing files are diffed by ISSN/title and only changed files are
+    rewritten (see ajg_diff.py).
+    """
+    import ajg_fetch
+
+    argv = ["--outdir", os.path.abspath(data_dir)]
+    if overwrite:
+        argv.append("--overwrite")
+    if incremental:
+        argv.append("--incremental")
+    if debug_http:
+        argv.append("--debug-http")
+    try:
+        return ajg_fetch.main(argv)
+    except Exception as e:
+        ajg_fetch.append_progress(f"失败：{e}")
+        raise
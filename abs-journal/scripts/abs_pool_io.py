@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Candidate pool serialization (stdlib only).
+
+Formats (same content; only the encoding differs):
+- json:    pretty-printed ``{"meta": ..., "candidates": [...]}`` (indent=2; the historical default)
+- compact: the same object minified on one line
+- jsonl:   a header record ``{"format": POOL_JSONL_FORMAT, "meta": ...}`` followed by one
+           candidate per line
+
+Writers emit one candidate at a time, so the whole file text is never built in memory.
+read_pool() detects the format itself and returns the full object, so every consumer
+(abs_ai_review.py, hybrid_report.py) accepts all three formats and per-mode pools. For JSONL
+pools the consumers stream instead (is_jsonl_pool() + iter_pool()): abs_ai_review only
+collects the journal-name set and hybrid_report only the journal index, one line at a
+time. json/compact are single JSON documents and are parsed whole.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+POOL_FORMATS = ("json", "compact", "jsonl")
+POOL_JSONL_FORMAT = "abs-journal-pool/jsonl"
+
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def pool_path_for(path: str, fmt: str) -> str:
+    """jsonl pools get a .jsonl suffix; json/compact keep the requested path."""
+    if fmt == "jsonl":
+        base, ext = os.path.splitext(path)
+        return path if ext == ".jsonl" else base + ".jsonl"
+    return path
+
+
+def write_pool(path: str, pool: Dict[str, Any], *, fmt: str = "json") -> str:
+    """Write `pool` in `fmt` and return the path actually written (see pool_path_for)."""
+    if fmt not in POOL_FORMATS:
+        raise RuntimeError(f"非法候选池格式: {fmt}（允许：{'/'.join(POOL_FORMATS)}）")
+    path = pool_path_for(path, fmt)
+    out_dir = os.path.dirname(os.path.abspath(path))
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    meta = pool.get("meta") or {}
+    candidates: Iterable[Any] = pool.get("candidates") or []
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "json":
+            json.dump(pool, f, ensure_ascii=False, indent=2)
+        elif fmt == "compact":
+            f.write('{"meta":' + json.dumps(meta, **_COMPACT) + ',"candidates":[')
+            for i, c in enumerate(candidates):
+                f.write(("," if i else "") + json.dumps(c, **_COMPACT))
+            f.write("]}")
+        else:
+            f.write(json.dumps({"format": POOL_JSONL_FORMAT, "meta": meta}, **_COMPACT) + "\n")
+            for c in candidates:
+                f.write(json.dumps(c, **_COMPACT) + "\n")
+    return path
+
+
+def _first_record(f: IO[str]) -> Optional[Any]:
+    """Parse the first line: a JSONL header, a whole compact pool, or None (pretty JSON)."""
+    try:
+        return json.loads(f.readline())
+    except ValueError:
+        return None
+
+
+def _is_jsonl_header(head: Any) -> bool:
+    return isinstance(head, dict) and head.get("format") == POOL_JSONL_FORMAT
+
+
+def is_jsonl_pool(path: str) -> bool:
+    """True if `path` is a JSONL pool (header record on the first line)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return _is_jsonl_header(_first_record(f))
+    except OSError:
+        return False
+
+
+@contextmanager
+def iter_pool(path: str) -> Iterator[Tuple[Dict[str, Any], Iterator[Any]]]:
+    """``with iter_pool(path) as (meta, candidates):`` for a single pool in any format.
+
+    For JSONL the candidates are parsed lazily, one line at a time; the file is closed when
+    the block exits, whether or not the iterator was exhausted.
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"JSON 不存在: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        head = _first_record(f)
+        if _is_jsonl_header(head):
+            yield dict(head.get("meta") or {}), (json.loads(line) for line in f if line.strip())
+            return
+        if head is None:
+            f.seek(0)
+            head = json.load(f)
+    if not isinstance(head, dict):
+        raise RuntimeError(f"候选池 JSON 必须是对象: {path}")
+    yield head.get("meta") or {}, iter(head.get("candidates") or [])
+
+
+def read_pool(path: str) -> Dict[str, Any]:
+    """Load a pool file (json / compact / jsonl) as ``{"meta", "candidates"}``.
+
+    Other JSON objects (per-mode ``{"easy": pool, ...}``, ai_output.json with embedded
+    pools) are returned unchanged, so callers can keep accepting them.
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"JSON 不存在: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        head = _first_record(f)
+        if _is_jsonl_header(head):
+            return {"meta": dict(head.get("meta") or {}), "candidates": [json.loads(x) for x in f if x.strip()]}
+        if head is not None:
+            return head
+        f.seek(0)
+        return json.load(f)
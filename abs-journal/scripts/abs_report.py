@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Shared report model and renderers (stdlib only).
+
+Reports (abs_article_impl.render_report, hybrid_report.render_report) are first built as
+a ReportModel: an ordered list of blocks (headings, bullet lists, tables). The model is
+then rendered to one of REPORT_FORMATS:
+
+- md:   the historical Markdown layout (blocks separated by one blank line)
+- json: ``{"title", "sections": [{"heading", "level", "lines", "tables"}]}``
+- csv:  every table row, prefixed with its section heading (header repeated only when
+        the columns change)
+- html: a standalone page
+
+Tables are compiled once per column layout (TableSpec: header/separator lines and a
+``str.format`` row template). Cells and bullet items are stored raw; Markdown escaping
+happens in the renderer, except for table rows / bullet lists given pre-escaped ``md``
+text (journal cells cached per JournalRow, see abs_article_impl.journal_md_cells).
+"""
+
+from __future__ import annotations
+
+import csv
+import html
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+REPORT_FORMATS = ("md", "json", "csv", "html")
+
+
+def md_cell(s: str) -> str:
+    """Escape a Markdown table cell (pipes only)."""
+    s = s or ""
+    return s.replace("|", "\\|") if "|" in s else s
+
+
+def md_cell_inline(s: str) -> str:
+    """Escape a Markdown table cell and fold it onto one trimmed line."""
+    return (s or "").replace("|", "\\|").replace("\n", " ").strip()
+
+
+class TableSpec:
+    """A table layout compiled once: header, separator and a row template.
+
+    `aligns` holds one of "l"/"r" per column.
+    """
+
+    __slots__ = ("columns", "aligns", "escape", "header", "separator", "_row")
+
+    def __init__(self, columns: Sequence[str], aligns: str, *, escape: Callable[[str], str] = md_cell) -> None:
+        if len(columns) != len(aligns):
+            raise RuntimeError(f"表格列数与对齐方式数量不一致: {len(columns)} != {len(aligns)}")
+        self.columns = tuple(columns)
+        self.aligns = aligns
+        self.escape = escape
+        self.header = "| " + " | ".join(self.columns) + " |"
+        self.separator = "|" + "|".join("---:" if a == "r" else "---" for a in aligns) + "|"
+        self._row = ("| " + " | ".join(["{}"] * len(self.columns)) + " |").format
+
+    def md_row(self, cells: Sequence[str]) -> str:
+        """Render already-escaped cells."""
+        return self._row(*cells)
+
+
+@dataclass
+class TableRow:
+    """Raw display cells; `md` optionally carries the same cells already Markdown-escaped."""
+
+    cells: Tuple[str, ...]
+    md: Optional[Tuple[str, ...]] = None
+
+
+@dataclass
+class Heading:
+    text: str
+    level: int = 2
+
+
+@dataclass
+class Lines:
+    """Consecutive lines: an optional lead sentence followed by bullet items.
+
+    `md` optionally carries the same items as Markdown (used instead of `items` for md only).
+    """
+
+    items: List[str] = field(default_factory=list)
+    lead: str = ""
+    md: Optional[List[str]] = None
+
+
+@dataclass
+class Table:
+    spec: TableSpec
+    rows: List[TableRow] = field(default_factory=list)
+
+    def add(self, cells: Sequence[str], md: Optional[Sequence[str]] = None) -> None:
+        self.rows.append(TableRow(tuple(cells), tuple(md) if md is not None else None))
+
+
+Block = Union[Heading, Lines, Table]
+
+
+@dataclass
+class ReportModel:
+    blocks: List[Block] = field(default_factory=list)
+
+    def heading(self, text: str, level: int = 2) -> None:
+        self.blocks.append(Heading(text, level))
+
+    def lines(self, items: Sequence[str], *, lead: str = "", md: Optional[Sequence[str]] = None) -> None:
+        self.blocks.append(Lines(list(items), lead, list(md) if md is not None else None))
+
+    def table(self, spec: TableSpec) -> Table:
+        t = Table(spec)
+        self.blocks.append(t)
+        return t
+
+    def render(self, fmt: str = "md") -> str:
+        renderer = _RENDERERS.get(fmt)
+        if renderer is None:
+            raise RuntimeError(f"非法报告格式: {fmt}（允许：{'/'.join(REPORT_FORMATS)}）")
+        return renderer(self)
+
+    def sections(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """(title, sections): blocks grouped under their nearest heading (level >= 2)."""
+        title = ""
+        sections: List[Dict[str, Any]] = []
+        current: Optional[Dict[str, Any]] = None
+        for b in self.blocks:
+            if isinstance(b, Heading):
+                if b.level == 1 and not title:
+                    title = b.text
+                    continue
+                current = {"heading": b.text, "level": b.level, "lines": [], "tables": []}
+                sections.append(current)
+                continue
+            if current is None:
+                current = {"heading": "", "level": 2, "lines": [], "tables": []}
+                sections.append(current)
+            if isinstance(b, Lines):
+                current["lines"].extend(([b.lead] if b.lead else []) + b.items)
+            else:
+                current["tables"].append({"columns": list(b.spec.columns), "rows": [list(r.cells) for r in b.rows]})
+        return title, sections
+
+
+def to_markdown(model: ReportModel) -> str:
+    out: List[str] = []
+    last = len(model.blocks) - 1
+    for i, b in enumerate(model.blocks):
+        if isinstance(b, Heading):
+            out.append("#" * b.level + " " + b.text)
+        elif isinstance(b, Lines):
+            if b.lead:
+                out.append(b.lead)
+            out.extend("- " + x for x in (b.md if b.md is not None else b.items))
+        else:
+            spec = b.spec
+            esc = spec.escape
+            out.append(spec.header)
+            out.append(spec.separator)
+            for r in b.rows:
+                out.append(spec.md_row(r.md if r.md is not None else [esc(c) for c in r.cells]))
+        if i < last:
+            out.append("")
+    return "\n".join(out)
+
+
+def to_json(model: ReportModel) -> str:
+    title, sections = model.sections()
+    return json.dumps({"title": title, "sections": sections}, ensure_ascii=False, indent=2)
+
+
+def to_csv(model: ReportModel) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    section = ""
+    columns: Optional[Tuple[str, ...]] = None
+    for b in model.blocks:
+        if isinstance(b, Heading):
+            section = b.text
+        elif isinstance(b, Table):
+            if b.spec.columns != columns:
+                columns = b.spec.columns
+                w.writerow(("Section",) + columns)
+            for r in b.rows:
+                w.writerow((section,) + r.cells)
+    return buf.getvalue()
+
+
+def to_html(model: ReportModel) -> str:
+    e = html.escape
+    title, _sections = model.sections()
+    out = [
+        "<!DOCTYPE html>",
+        '<html lang="zh-CN">',
+        '<head><meta charset="utf-8"><title>' + e(title) + "</title></head>",
+        "<body>",
+    ]
+    for b in model.blocks:
+        if isinstance(b, Heading):
+            out.append(f"<h{b.level}>{e(b.text)}</h{b.level}>")
+        elif isinstance(b, Lines):
+            if b.lead:
+                out.append(f"<p>{e(b.lead)}</p>")
+            if b.items:
+                out.append("<ul>" + "".join(f"<li>{e(x)}</li>" for x in b.items) + "</ul>")
+        else:
+            styles = [' style="text-align:right"' if a == "r" else "" for a in b.spec.aligns]
+            out.append("<table>")
+            out.append("<thead><tr>" + "".join(f"<th{s}>{e(c)}</th>" for c, s in zip(b.spec.columns, styles)) + "</tr></thead>")
+            out.append("<tbody>")
+            for r in b.rows:
+                out.append("<tr>" + "".join(f"<td{s}>{e(c)}</td>" for c, s in zip(r.cells, styles)) + "</tr>")
+            out.append("</tbody></table>")
+    out.append("</body></html>")
+    return "\n".join(out) + "\n"
+
+
+_RENDERERS: Dict[str, Callable[[ReportModel], str]] = {
+    "md": to_markdown,
+    "json": to_json,
+    "csv": to_csv,
+    "html": to_html,
+}
+
+
+def report_path_for(path: str, fmt: str) -> str:
+    """Swap a report path's extension to match `fmt` (md keeps the given path)."""
+    if fmt == "md":
+        return path
+    return os.path.splitext(path)[0] + "." + fmt
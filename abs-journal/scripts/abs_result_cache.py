@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""On-disk cache of per-mode recommendation results (stdlib only).
+
+An entry stores the Markdown report and candidate pool of one mode. Its key is
+a SHA-256 over every input that can change them: paper text, field/field_scope,
+mode, rating filter, profile, TopK, balance/export flags, the AJG data digest
+and the keyword file digest (plus CACHE_VERSION, bumped when scoring changes).
+
+Layout: <cache_dir>/results/<key[:2]>/<key>.json. A hit refreshes the file
+mtime, so pruning by oldest mtime evicts least-recently-used entries first.
+<root>/usage.json keeps approximate running totals (entries, bytes) so put() only
+walks the tree when a limit is crossed; prune() rewrites it with exact numbers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from abs_paths import cache_dir
+from ajg_snapshot import file_sha256, open_fresh_snapshot
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 1000
+USAGE_FILE = "usage.json"
+
+
+@dataclass
+class CachedResult:
+    """One mode's cached output (same `report`/`candidate_pool` attributes as RecommendResult)."""
+
+    report: str
+    candidate_pool: Optional[Dict[str, Any]]
+    cached: bool = True
+
+    def mark_hit(self, *, now: str, ajg_csv: str) -> None:
+        """Stamp a hit with the current time/AJG path; the original time is kept as meta.cached_from."""
+        meta = (self.candidate_pool or {}).get("meta")
+        stored = ""
+        if isinstance(meta, dict):
+            stored = str(meta.get("generated_at") or "")
+            meta["cached_from"] = stored
+            meta["generated_at"] = now
+            meta["ajg_csv"] = os.path.abspath(ajg_csv)
+        note = f"生成时间：{now}（命中本地结果缓存" + (f"，原结果生成于 {stored}）" if stored else "）")
+        self.report = re.sub(r"生成时间：[^\n]*", lambda _m: note, self.report, count=1)
+
+
+def data_digest(ajg_csv: str) -> str:
+    """SHA-256 of the AJG CSV, read from a fresh snapshot header when possible."""
+    snap = open_fresh_snapshot(ajg_csv)
+    if snap is not None:
+        with snap:
+            digest = str(snap.source.get("sha256") or "")
+        if digest:
+            return digest
+    return file_sha256(ajg_csv)
+
+
+def file_digest(path: str) -> str:
+    return file_sha256(path) if os.path.isfile(path) else "missing"
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    payload = json.dumps({"version": CACHE_VERSION, **params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """LRU-bounded directory of cached mode results."""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.root = Path(root) if root else cache_dir() / "results"
+        self.max_bytes = int(max_bytes)
+        self.max_entries = int(max_entries)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedResult(report=str(obj.get("report") or ""), candidate_pool=obj.get("candidate_pool"))
+
+    def put(self, key: str, params: Dict[str, Any], *, report: str, candidate_pool: Optional[Dict[str, Any]]) -> None:
+        """Store one entry (best-effort: I/O errors are ignored); prune once the running totals cross a limit."""
+        path = self._path(key)
+        obj = {"key": key, "params": params, "report": report, "candidate_pool": candidate_pool}
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".json.tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        usage = self._read_usage()
+        if usage is None:
+            self.prune()  # no running totals yet: one full walk establishes them
+            return
+        entries, total = usage[0] + 1, usage[1] + len(data)
+        if entries > self.max_entries or total > self.max_bytes:
+            self.prune()
+        else:
+            self._write_usage(entries, total)
+
+    def _read_usage(self) -> Optional[Tuple[int, int]]:
+        try:
+            with open(self.root / USAGE_FILE, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            return int(obj["entries"]), int(obj["bytes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_usage(self, entries: int, total: int) -> None:
+        # Approximate (overwrites and concurrent writers may over-count); an over-count only
+        # makes the next prune() come earlier, and prune() rewrites exact totals.
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / (USAGE_FILE + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries, "bytes": total}, f)
+            os.replace(tmp, self.root / USAGE_FILE)
+        except OSError:
+            pass
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        out: List[Tuple[float, int, Path]] = []
+        if not self.root.is_dir():
+            return out
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for p in sub.glob("*.json"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {"root": str(self.root), "entries": len(entries), "bytes": sum(size for _m, size, _p in entries)}
+
+    def prune(self, *, max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> int:
+        """Delete least-recently-used entries until both limits hold; returns the number removed."""
+        max_bytes = self.max_bytes if max_bytes is None else int(max_bytes)
+        max_entries = self.max_entries if max_entries is None else int(max_entries)
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _m, size, _p in entries)
+        count = len(entries)
+        removed = 0
+        for _mtime, size, path in entries:
+            if total <= max_bytes and count <= max_entries:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+            removed += 1
+        if self.root.is_dir():
+            self._write_usage(count, total)
+        return removed
+
+    def clear(self) -> int:
+        return self.prune(max_bytes=0, max_entries=0)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Optional offline semantic fit: hashed n-gram TF-IDF vectors + cosine similarity (stdlib; NumPy optional).
+
+Every AJG journal gets one L2-normalised vector built from
+- its title (word unigrams + bigrams),
+- a short description of its AJG Field,
+- the SDG profile from ``ajg_2024_journals_raw.jsonl`` (each SDG's share of the journal's
+  SDG-tagged output weights a few keywords for that goal).
+
+Features are hashed into SEMANTIC_DIM buckets (signed CRC32, so no vocabulary is stored)
+and weighted by IDF over the catalogue. The matrix is stored next to the AJG snapshot as
+``<csv stem>.semvec`` (an ajg_snapshot file with one f32 column of width SEMANTIC_DIM) and
+is rebuilt when the CSV, the raw JSONL or the feature definition changes.
+
+A paper is scored against all journals with one matrix-vector product (NumPy) or, without
+NumPy, a sparse dot product over the paper's non-zero buckets. Similarities are in [-1, 1]
+(in practice [0, 1]) and are blended into total_score with --semantic_weight (off by default).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ajg_snapshot import open_fresh_snapshot, source_stamp, write_snapshot
+
+try:  # Optional: one BLAS matrix-vector product instead of a Python loop.
+    import numpy as _np
+except ImportError:  # pragma: no cover - depends on environment
+    _np = None
+
+SEMVEC_SUFFIX = ".semvec"
+SEMANTIC_DIM = 2048
+RAW_JSONL_NAME = "ajg_2024_journals_raw.jsonl"
+
+TITLE_WEIGHT = 2.0
+FIELD_WEIGHT = 1.0
+SDG_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+SDG_TOP_GOALS = 3
+
+STOPWORDS = frozenset(
+    "a an and at by for from in into of on or the to with its their journal review quarterly "
+    "international annals studies study research letters bulletin proceedings transactions".split()
+)
+
+# AJG Field code -> descriptive words (the codes themselves carry little text).
+FIELD_TERMS: Dict[str, str] = {
+    "ACCOUNT": "accounting auditing financial reporting",
+    "BUS HIST & ECON HIST": "business history economic history historical",
+    "ECON": "economics economic policy markets",
+    "ENT-SBM": "entrepreneurship small business",
+    "ETHICS-CSR-MAN": "business ethics corporate social responsibility management",
+    "FINANCE": "finance financial markets banking",
+    "HRM&EMP": "human resource management employment labour",
+    "IB&AREA": "international business area studies",
+    "INFO MAN": "information management information systems",
+    "INNOV": "innovation technology",
+    "MDEV&EDU": "management development education learning",
+    "MKT": "marketing consumer",
+    "OPS&TECH": "operations technology management supply chain",
+    "OR&MANSCI": "operations research management science optimization",
+    "ORG STUD": "organization studies",
+    "PSYCH (GENERAL)": "psychology behaviour",
+    "PSYCH (WOP-OB)": "work organizational psychology behaviour",
+    "PUB SEC": "public sector public administration public policy",
+    "REGIONAL STUDIES, PLANNING AND ENVIRONMENT": "regional urban planning environment",
+    "SECTOR": "sector industry",
+    "SOC SCI": "social sciences society",
+    "STRAT": "strategy strategic management",
+}
+
+# UN SDG number -> keywords.
+SDG_TERMS: Dict[int, str] = {
+    1: "poverty poor income inequality",
+    2: "hunger food agriculture agricultural farm rural",
+    3: "health wellbeing medical",
+    4: "education school learning",
+    5: "gender women equality",
+    6: "water sanitation",
+    7: "energy renewable electricity",
+    8: "growth employment labour work productivity",
+    9: "industry innovation infrastructure",
+    10: "inequality migration trade",
+    11: "cities urban housing transport",
+    12: "consumption production sustainability",
+    13: "climate carbon emissions",
+    14: "ocean marine fisheries",
+    15: "land forest biodiversity",
+    16: "institutions governance justice peace",
+    17: "partnership finance aid development",
+}
+
+SEMANTIC_FINGERPRINT = hashlib.sha1(
+    json.dumps(
+        [SEMANTIC_DIM, TITLE_WEIGHT, FIELD_WEIGHT, SDG_WEIGHT, BIGRAM_WEIGHT, SDG_TOP_GOALS, sorted(STOPWORDS), FIELD_TERMS, SDG_TERMS],
+        sort_keys=True,
+    ).encode("utf-8")
+).hexdigest()[:16]
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    out = []
+    for t in _TOKEN_RE.findall((text or "").lower()):
+        if t in STOPWORDS:
+            continue
+        # Light plural folding so "markets"/"market" share a bucket.
+        if len(t) > 4 and t.endswith("s") and not t.endswith("ss"):
+            t = t[:-1]
+        out.append(t)
+    return out
+
+
+def ngrams(tokens: Sequence[str]) -> List[Tuple[str, float]]:
+    """Unigrams (weight 1) and adjacent bigrams (weight BIGRAM_WEIGHT)."""
+    out = [(t, 1.0) for t in tokens]
+    out.extend((f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(tokens, tokens[1:]))
+    return out
+
+
+def hashed_counts(parts: Iterable[Tuple[str, float]]) -> Dict[int, float]:
+    """Signed hashed term frequencies of weighted text parts."""
+    out: Dict[int, float] = {}
+    for text, weight in parts:
+        if weight <= 0:
+            continue
+        for g, gw in ngrams(tokenize(text)):
+            h = zlib.crc32(g.encode("utf-8"))
+            b = h % SEMANTIC_DIM
+            w = weight * gw
+            out[b] = out.get(b, 0.0) + (w if (h >> 31) & 1 else -w)
+    return out
+
+
+def raw_jsonl_path_for(csv_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), RAW_JSONL_NAME)
+
+
+def semvec_path_for(csv_path: str) -> str:
+    base, _ext = os.path.splitext(os.path.abspath(csv_path))
+    return base + SEMVEC_SUFFIX
+
+
+def _load_sdg_profiles(raw_path: str) -> Dict[Tuple[str, str], Dict[int, float]]:
+    """(field, title) -> {sdg: share of SDG-tagged output} from the raw AJG JSONL."""
+    out: Dict[Tuple[str, str], Dict[int, float]] = {}
+    if not os.path.isfile(raw_path):
+        return out
+    with open(raw_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            counts = {}
+            for g in SDG_TERMS:
+                v = rec.get(f"scholarly_output_sdg_{g}_2017_2021")
+                if isinstance(v, (int, float)) and v > 0:
+                    counts[g] = float(v)
+            total = sum(counts.values())
+            if total > 0:
+                key = (str(rec.get("field") or "").strip(), str(rec.get("title") or "").strip())
+                out[key] = {g: c / total for g, c in counts.items()}
+    return out
+
+
+def journal_parts(field: str, title: str, sdg: Optional[Dict[int, float]]) -> List[Tuple[str, float]]:
+    parts = [(title, TITLE_WEIGHT), (FIELD_TERMS.get(field, field), FIELD_WEIGHT)]
+    # Only the dominant goals: a long tail of small SDG shares mostly adds hash collisions.
+    top = sorted((sdg or {}).items(), key=lambda kv: (-kv[1], kv[0]))[:SDG_TOP_GOALS]
+    for g, share in top:
+        parts.append((SDG_TERMS[g], SDG_WEIGHT * share))
+    return parts
+
+
+def _normalise(vec: Dict[int, float]) -> Dict[int, float]:
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    return {b: v / norm for b, v in vec.items()} if norm > 0 else {}
+
+
+class SemanticIndex:
+    """Dense (n x SEMANTIC_DIM) journal matrix, IDF vector and (field, title) -> row positions."""
+
+    def __init__(self, keys: List[Tuple[str, str]], idf: Sequence[float], matrix: Sequence[float]) -> None:
+        self.keys = keys
+        self.dim = SEMANTIC_DIM
+        self.idf = list(idf)
+        self.positions: Dict[Tuple[str, str], int] = {}
+        for i, k in enumerate(keys):
+            self.positions.setdefault(k, i)
+        if _np is not None:
+            self.matrix = _np.array(matrix, dtype=_np.float32).reshape(len(keys), self.dim)
+        else:
+            self.matrix = array("f", matrix)
+
+    @classmethod
+    def build(cls, keys: List[Tuple[str, str]], raw_path: str = "") -> "SemanticIndex":
+        sdg = _load_sdg_profiles(raw_path) if raw_path else {}
+        tfs = [hashed_counts(journal_parts(f, t, sdg.get((f, t)))) for f, t in keys]
+        df = [0] * SEMANTIC_DIM
+        for tf in tfs:
+            for b in tf:
+                df[b] += 1
+        n = len(keys)
+        idf = [math.log((1.0 + n) / (1.0 + d)) + 1.0 for d in df]
+        matrix = array("f", bytes(4 * n * SEMANTIC_DIM))
+        for i, tf in enumerate(tfs):
+            base = i * SEMANTIC_DIM
+            for b, v in _normalise({b: v * idf[b] for b, v in tf.items()}).items():
+                matrix[base + b] = v
+        return cls(keys, idf, matrix)
+
+    def query(self, text: str) -> Dict[int, float]:
+        """L2-normalised TF-IDF vector of a paper (title + abstract) as {bucket: weight}."""
+        tf = hashed_counts([(text, 1.0)])
+        return _normalise({b: v * self.idf[b] for b, v in tf.items()})
+
+    def similarities(self, text: str, keys: Sequence[Tuple[str, str]]) -> List[float]:
+        """Cosine similarity of `text` to each journal in `keys` (0.0 for unknown journals)."""
+        return self.similarities_for(self.query(text), keys)
+
+    def similarities_for(self, q: Dict[int, float], keys: Sequence[Tuple[str, str]]) -> List[float]:
+        """Same as similarities() for an already computed query vector."""
+        pos = [self.positions.get(k, -1) for k in keys]
+        if not q:
+            return [0.0] * len(keys)
+        if _np is not None:
+            qv = _np.zeros(self.dim, dtype=_np.float32)
+            for b, v in q.items():
+                qv[b] = v
+            sims = (self.matrix @ qv).astype(_np.float64)  # one product for the whole catalogue
+            return [float(sims[i]) if i >= 0 else 0.0 for i in pos]
+        m, dim, items = self.matrix, self.dim, list(q.items())
+        return [sum(v * m[i * dim + b] for b, v in items) if i >= 0 else 0.0 for i in pos]
+
+
+def write_semantic_index(csv_path: str, keys: List[Tuple[str, str]]) -> Tuple[str, SemanticIndex]:
+    raw_path = raw_jsonl_path_for(csv_path)
+    index = SemanticIndex.build(keys, raw_path)
+    flat = index.matrix.ravel().tolist() if _np is not None else index.matrix
+    out = write_snapshot(
+        semvec_path_for(csv_path),
+        source_csv=csv_path,
+        row_count=len(keys),
+        columns=[("field", "str", [k[0] for k in keys]), ("title", "str", [k[1] for k in keys]),
+                 ("vectors", "f32", flat, SEMANTIC_DIM)],
+        extra={"semantic": SEMANTIC_FINGERPRINT, "idf": index.idf, "raw": _raw_stamp(raw_path)},
+    )
+    return out, index
+
+
+def _raw_stamp(raw_path: str) -> Optional[Dict[str, int]]:
+    return source_stamp(raw_path) if os.path.isfile(raw_path) else None
+
+
+def _read_semantic_index(csv_path: str) -> Optional[SemanticIndex]:
+    snap = open_fresh_snapshot(csv_path, semvec_path_for(csv_path))
+    if snap is None:
+        return None
+    with snap:
+        extra = snap.extra
+        if extra.get("semantic") != SEMANTIC_FINGERPRINT or extra.get("raw") != _raw_stamp(raw_jsonl_path_for(csv_path)):
+            return None
+        keys = list(zip(snap.strings("field"), snap.strings("title")))
+        vectors = snap.numbers("vectors")
+        # Copy out of the mmap so the snapshot can be closed (no exported pointers left).
+        matrix = array("f", vectors.tobytes())
+        if isinstance(vectors, memoryview):
+            vectors.release()
+    return SemanticIndex(keys, extra.get("idf") or [], matrix)
+
+
+_INDEX_CACHE: Dict[str, Tuple[Tuple[object, ...], SemanticIndex]] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_semantic_index(csv_path: str, keys: List[Tuple[str, str]]) -> SemanticIndex:
+    """Memoised index for `csv_path`: in-process cache -> .semvec file -> build (and write, best-effort)."""
+    csv_path = os.path.abspath(csv_path)
+    raw_path = raw_jsonl_path_for(csv_path)
+    stamp = (tuple(source_stamp(csv_path).values()), str(_raw_stamp(raw_path)))
+    with _INDEX_LOCK:
+        hit = _INDEX_CACHE.get(csv_path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        index = _read_semantic_index(csv_path)
+        if index is None or index.keys != keys:
+            try:
+                _path, index = write_semantic_index(csv_path, keys)
+            except OSError:
+                index = SemanticIndex.build(keys, raw_path)
+        _INDEX_CACHE[csv_path] = (stamp, index)
+        return index
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Local recommendation daemon (stdlib only; HTTP over TCP or a Unix socket).
+
+Keeps the parsed AJG rows and compiled keyword matchers in memory so that each
+request only pays for scoring. Files under the data directory are re-stamped
+on every request; when any of them changes the rows are reloaded before the
+request is answered (keyword tables already reload themselves on change).
+/recommend keeps the scores of recently asked papers (RecommendSession), so asking
+again for the same paper with another mode or rating filter skips rescoring.
+
+Endpoints (JSON in/out):
+  GET  /health     -> {"ok", "rows", "ajg_csv", "loaded_at", "reloads", "session"}
+  POST /recommend  -> {"results": {mode: {"topk", "pool", "report"?}}, "elapsed_ms"}
+  POST /hybrid     -> {"ok", "errors", "ai_output", "report", "pools", "elapsed_ms"}
+  POST /reload     -> force a reload
+
+`abs_journal.py session` answers the same /recommend bodies over stdin/stdout
+(one JSON object per line) without opening a socket.
+
+Request body keys: title (required), abstract, modes (list or "easy,medium"),
+field, field_scope, rating_filter, topk, profile, exact_rating_balance,
+export_pool, report (include Markdown per mode), semantic_weight,
+ai_output and report_format (md/json/csv/html; /hybrid only).
+
+Usage:
+  python3 scripts/abs_journal.py serve --port 8765
+  curl -s localhost:8765/recommend -d '{"title": "...", "modes": ["medium"]}'
+
+  python3 scripts/abs_journal.py serve --unix /tmp/abs-journal.sock
+  curl -s --unix-socket /tmp/abs-journal.sock http://x/recommend -d '{"title": "..."}'
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import signal
+import socketserver
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from abs_article_impl import get_keyword_matcher, load_ajg_csv, now_local_str
+from abs_journal_api import MODES, RecommendSession, results_to_dict, run_hybrid
+from abs_semantic import SEMVEC_SUFFIX
+from ajg_diff import CHANGELOG_SUFFIX
+from ajg_snapshot import SNAPSHOT_SUFFIX
+from abs_paths import data_dir as default_data_dir
+from abs_report import REPORT_FORMATS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1 << 20
+
+
+def data_stamp(data_dir: str) -> Tuple[Tuple[str, int, int], ...]:
+    """(name, size, mtime_ns) of every data file; snapshots, changelogs and temp files are skipped."""
+    out: List[Tuple[str, int, int]] = []
+    try:
+        entries = list(os.scandir(data_dir))
+    except OSError:
+        return ()
+    for e in entries:
+        if not e.is_file() or e.name.endswith((SNAPSHOT_SUFFIX, SEMVEC_SUFFIX, CHANGELOG_SUFFIX, ".tmp")):
+            continue
+        st = e.stat()
+        out.append((e.name, int(st.st_size), int(st.st_mtime_ns)))
+    return tuple(sorted(out))
+
+
+class WarmData:
+    """AJG rows held in memory, reloaded when the data directory changes."""
+
+    def __init__(self, data_dir: str, *, profile: str = "general") -> None:
+        self.data_dir = os.path.abspath(data_dir)
+        self.ajg_csv = os.path.join(self.data_dir, "ajg_2024_journals_core_custom.csv")
+        self.profile = profile
+        self.rows: List[Any] = []
+        # Scores of recently asked papers; re-asking with another mode/rating filter skips rescoring.
+        self.session = RecommendSession([], ajg_csv=self.ajg_csv)
+        self.loaded_at = ""
+        self.reloads = 0
+        self._stamp: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        self._lock = threading.Lock()
+
+    def reload(self) -> None:
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        stamp = data_stamp(self.data_dir)
+        self.rows = load_ajg_csv(self.ajg_csv)
+        self.session = RecommendSession(self.rows, ajg_csv=self.ajg_csv)
+        get_keyword_matcher("ECON", profile=self.profile)
+        self._stamp = stamp
+        self.loaded_at = now_local_str()
+        self.reloads += 1
+
+    def current_session(self) -> RecommendSession:
+        """The session for the current rows (a reload starts a new, empty session)."""
+        self.current()
+        return self.session
+
+    def current(self) -> List[Any]:
+        """Return the rows, reloading first if any data file changed since the last load."""
+        if self._stamp is not None and data_stamp(self.data_dir) == self._stamp:
+            return self.rows
+        with self._lock:
+            if self._stamp is None or data_stamp(self.data_dir) != self._stamp:
+                self._load()
+            return self.rows
+
+
+def _parse_modes(raw: Any) -> List[str]:
+    if raw is None or raw == "":
+        return list(MODES)
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return [str(m).strip() for m in raw if str(m).strip()]
+
+
+def _int_param(body: Dict[str, Any], key: str, default: int) -> int:
+    raw = body.get(key)
+    if raw is None or raw == "":
+        return default
+    if isinstance(raw, bool) or not isinstance(raw, (int, str)):
+        raise ValueError(f"{key} 必须是正整数")
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{key} 必须是正整数") from None
+    if value <= 0:
+        raise ValueError(f"{key} 必须是正整数")
+    return value
+
+
+def _float_param(body: Dict[str, Any], key: str, default: float) -> float:
+    raw = body.get(key)
+    if raw is None or raw == "":
+        return default
+    if isinstance(raw, bool) or not isinstance(raw, (int, float, str)):
+        raise ValueError(f"{key} 必须是数字")
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{key} 必须是数字") from None
+    # NaN/inf would silently turn every total into NaN/inf (ranking becomes arbitrary).
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"{key} 必须是非负有限数字")
+    return value
+
+
+def _bool_param(body: Dict[str, Any], key: str, default: bool) -> bool:
+    raw = body.get(key)
+    if raw is None:
+        return default
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, int) and raw in (0, 1):
+        return bool(raw)
+    if isinstance(raw, str) and raw.strip().lower() in ("true", "false", "1", "0"):
+        return raw.strip().lower() in ("true", "1")
+    raise ValueError(f"{key} 必须是布尔值（true/false 或 1/0）")
+
+
+def _common_kwargs(body: Dict[str, Any], warm: WarmData) -> Dict[str, Any]:
+    title = body.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("缺少 title")
+    return {
+        "title": title,
+        "abstract": str(body.get("abstract") or ""),
+        "field": str(body.get("field") or "ECON"),
+        "field_scope": str(body.get("field_scope") or ""),
+        "rating_filter": str(body.get("rating_filter") or ""),
+        "topk": _int_param(body, "topk", 10),
+        "profile": str(body.get("profile") or warm.profile),
+        "ajg_csv": warm.ajg_csv,
+    }
+
+
+def handle_recommend(warm: WarmData, body: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs = _common_kwargs(body, warm)
+    kwargs.pop("ajg_csv")
+    results = warm.current_session().recommend(
+        modes=_parse_modes(body.get("modes")),
+        exact_rating_balance=_bool_param(body, "exact_rating_balance", False),
+        export_pool=_bool_param(body, "export_pool", True),
+        semantic_weight=_float_param(body, "semantic_weight", 0.0),
+        **kwargs,
+    )
+    return {"results": results_to_dict(results, topk=kwargs["topk"], report=_bool_param(body, "report", False))}
+
+
+def handle_hybrid(warm: WarmData, body: Dict[str, Any]) -> Dict[str, Any]:
+    ai_output = body.get("ai_output")
+    if ai_output is not None and not isinstance(ai_output, dict):
+        raise ValueError("ai_output 必须是 JSON 对象")
+    report_format = str(body.get("report_format") or "md")
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"非法 report_format: {report_format}（允许：{'/'.join(REPORT_FORMATS)}）")
+    kwargs = _common_kwargs(body, warm)
+    kwargs.pop("ajg_csv")
+    # Pools come from the warm session (per-paper scores reused across calls); selection,
+    # validation and report then run over those same dicts.
+    results = warm.current_session().recommend(
+        modes=MODES,
+        exact_rating_balance=True,
+        export_pool=True,
+        semantic_weight=_float_param(body, "semantic_weight", 0.0),
+        **kwargs,
+    )
+    res = run_hybrid(results, ai_output=ai_output, topk=kwargs["topk"], report_format=report_format)
+    return {"ok": res.ok, "errors": res.errors, "ai_output": res.ai_output, "report": res.report, "pools": res.pools}
+
+
+def handle_reload(warm: WarmData, _body: Dict[str, Any]) -> Dict[str, Any]:
+    warm.reload()
+    return {"ok": True, "rows": len(warm.rows), "loaded_at": warm.loaded_at}
+
+
+class RecommendHandler(BaseHTTPRequestHandler):
+    server_version = "abs-journal"
+    warm: WarmData  # set by make_server()
+    quiet = False
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, obj: Dict[str, Any]) -> None:
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/health":
+            self._send(404, {"error": f"unknown path: {self.path}"})
+            return
+        warm = self.warm
+        try:
+            rows = warm.current()
+        except Exception as e:  # a failed reload (missing CSV, corrupt snapshot) is a 500, not a dropped connection
+            self._send(500, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+            return
+        session = warm.session
+        self._send(
+            200,
+            {
+                "ok": True,
+                "rows": len(rows),
+                "ajg_csv": warm.ajg_csv,
+                "loaded_at": warm.loaded_at,
+                "reloads": warm.reloads,
+                "session": {"papers": len(session), "hits": session.hits, "misses": session.misses},
+            },
+        )
+
+    def do_POST(self) -> None:
+        route = {
+            "/recommend": handle_recommend,
+            "/hybrid": handle_hybrid,
+            "/reload": handle_reload,
+        }.get(self.path.rstrip("/"))
+        if route is None:
+            self._send(404, {"error": f"unknown path: {self.path}"})
+            return
+        t0 = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError("非法 Content-Length")
+            if length > MAX_BODY_BYTES:
+                raise ValueError("请求体过大")
+            raw = self.rfile.read(length) if length else b"{}"
+            body = json.loads(raw.decode("utf-8") or "{}")
+            if not isinstance(body, dict):
+                raise ValueError("请求体必须是 JSON 对象")
+            out = route(self.warm, body)
+        except (ValueError, RuntimeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except Exception as e:  # keep the daemon alive on unexpected failures
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        out["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        self._send(200, out)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        # BaseHTTPRequestHandler reads these for logging/headers.
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a leftover socket file at `path`; refuse to replace anything that is not a socket."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise RuntimeError(f"--unix 路径已存在且不是 socket，拒绝覆盖：{path}")
+    os.unlink(path)
+
+
+def make_server(
+    warm: WarmData, *, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = "", quiet: bool = False
+) -> socketserver.BaseServer:
+    """Build (but do not start) a server bound to `unix_socket` if given, else host:port."""
+    handler = type("BoundRecommendHandler", (RecommendHandler,), {"warm": warm, "quiet": quiet})
+    if unix_socket:
+        _remove_stale_socket(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, int(port)), handler)
+
+
+def serve_stdio(*, data_dir: str = "", inp: Optional[IO[str]] = None, out: Optional[IO[str]] = None) -> int:
+    """Answer /recommend-style JSON requests line by line (stdin -> stdout) from one warm session.
+
+    Each input line is a /recommend body; each output line is its response (or {"error"}),
+    flushed immediately so a caller can keep the process open and ask follow-ups.
+    """
+    inp = inp if inp is not None else sys.stdin
+    out = out if out is not None else sys.stdout
+    warm = WarmData(data_dir or str(default_data_dir()), profile=os.environ.get("ABS_PROFILE", "general"))
+    warm.reload()
+    for line in inp:
+        if not line.strip():
+            continue
+        t0 = time.perf_counter()
+        try:
+            body = json.loads(line)
+            if not isinstance(body, dict):
+                raise ValueError("请求必须是 JSON 对象")
+            resp = handle_recommend(warm, body)
+        except (ValueError, RuntimeError) as e:
+            resp = {"error": str(e)}
+        except Exception as e:  # one bad line must not end the session
+            resp = {"error": f"{type(e).__name__}: {e}"}
+        resp["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        out.write(json.dumps(resp, ensure_ascii=False) + "\n")
+        out.flush()
+    return 0
+
+
+def _raise_keyboard_interrupt(*_args: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(
+    *,
+    data_dir: str = "",
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_socket: str = "",
+    quiet: bool = False,
+) -> int:
+    warm = WarmData(data_dir or str(default_data_dir()), profile=os.environ.get("ABS_PROFILE", "general"))
+    warm.reload()
+    server = make_server(warm, host=host, port=port, unix_socket=unix_socket, quiet=quiet)
+    where = unix_socket or f"http://{host}:{server.server_address[1]}"
+    # Treat SIGTERM like Ctrl-C so the Unix socket file is cleaned up.
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    print(f"abs-journal 推荐服务已启动：{where}（{len(warm.rows)} 本期刊；数据目录：{warm.data_dir}）", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+    return 0
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Diff freshly fetched AJG records against the existing raw JSONL (stdlib only).
+
+Used by `ajg_fetch.py --incremental`: records are matched by a stable key (ISSN, else
+normalized title), so an update can report which journals were added, removed or
+re-rated, rewrite only the files whose content changed, and leave the CSV snapshot
+alone when the core CSV is byte-identical.
+
+Record fields starting with "_" (Algolia `_highlightResult`, `_tags`, ...) are search
+metadata and are ignored when comparing.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+CHANGELOG_SUFFIX = "_changelog.md"
+
+
+def changelog_name(ajg_year: int) -> str:
+    return f"ajg_{ajg_year}{CHANGELOG_SUFFIX}"
+
+
+def _norm_issn(v: Any) -> str:
+    return re.sub(r"\s+", "", str(v or "")).upper()
+
+
+def _norm_title(v: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(v or "").lower()).strip()
+
+
+def record_key(rec: Dict[str, Any]) -> str:
+    """Stable identity of a journal record: print ISSN, else e-ISSN, else normalized title."""
+    issn = _norm_issn(rec.get("print_issn")) or _norm_issn(rec.get("e_issn")) or _norm_issn(rec.get("issn"))
+    if issn:
+        return f"issn:{issn}"
+    return "title:" + _norm_title(rec.get("title") or rec.get("journal_title") or rec.get("journal"))
+
+
+def keyed_records(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """key -> record; repeated keys get a "#n" suffix so no record is dropped."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        key = base = record_key(rec)
+        n = 1
+        while key in out:
+            n += 1
+            key = f"{base}#{n}"
+        out[key] = rec
+    return out
+
+
+def _content(rec: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in rec.items() if not str(k).startswith("_")}
+
+
+def _rating(v: Any) -> str:
+    s = "" if v is None else str(v).strip()
+    return "4*" if s == "5" else s
+
+
+def _title(rec: Dict[str, Any]) -> str:
+    return str(rec.get("title") or rec.get("journal_title") or rec.get("journal") or "").strip()
+
+
+@dataclass
+class AjgDiff:
+    """Journal-level differences between two record sets (old -> new)."""
+
+    rating_key: str
+    added: List[Dict[str, str]] = field(default_factory=list)  # {key, title, rating}
+    removed: List[Dict[str, str]] = field(default_factory=list)  # {key, title, rating}
+    rerated: List[Dict[str, str]] = field(default_factory=list)  # {key, title, from, to}
+    changed: List[Dict[str, Any]] = field(default_factory=list)  # {key, title, fields}; other field edits
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.rerated or self.changed)
+
+    def summary(self) -> str:
+        return (
+            f"新增 {len(self.added)}，移除 {len(self.removed)}，星级变化 {len(self.rerated)}，"
+            f"其他字段变化 {len(self.changed)}，未变 {self.unchanged}"
+        )
+
+    def to_meta(self) -> Dict[str, Any]:
+        """Compact record for ajg_<year>_meta.json (titles, not full records)."""
+        return {
+            "added": [x["title"] for x in self.added],
+            "removed": [x["title"] for x in self.removed],
+            "rerated": [{"title": x["title"], "from": x["from"], "to": x["to"]} for x in self.rerated],
+            "changed_count": len(self.changed),
+            "unchanged_count": self.unchanged,
+        }
+
+
+def diff_records(
+    old: Iterable[Dict[str, Any]], new: Iterable[Dict[str, Any]], *, rating_key: str = "ajg_2024"
+) -> AjgDiff:
+    old_by = keyed_records(old)
+    new_by = keyed_records(new)
+    d = AjgDiff(rating_key=rating_key)
+    for key, rec in new_by.items():
+        prev = old_by.get(key)
+        if prev is None:
+            d.added.append({"key": key, "title": _title(rec), "rating": _rating(rec.get(rating_key))})
+            continue
+        a, b = _content(prev), _content(rec)
+        if a == b:
+            d.unchanged += 1
+            continue
+        r0, r1 = _rating(prev.get(rating_key)), _rating(rec.get(rating_key))
+        if r0 != r1:
+            d.rerated.append({"key": key, "title": _title(rec), "from": r0, "to": r1})
+        fields = sorted(k for k in set(a) | set(b) if k != rating_key and a.get(k) != b.get(k))
+        if fields:
+            d.changed.append({"key": key, "title": _title(rec), "fields": fields})
+    for key, rec in old_by.items():
+        if key not in new_by:
+            d.removed.append({"key": key, "title": _title(rec), "rating": _rating(rec.get(rating_key))})
+    return d
+
+
+def changelog_entry(diff: AjgDiff, *, retrieved_at_utc: str, data_source: str, files: Optional[List[str]] = None) -> str:
+    """One Markdown section for ajg_<year>_changelog.md (entries are appended, newest last)."""
+    lines = [f"## {retrieved_at_utc}", "", f"- 数据源：{data_source}", f"- 变化：{diff.summary()}"]
+    if diff.empty:
+        lines.append("- 无变化：未改写任何数据文件，snapshot 无需重建")
+    elif files is not None:
+        lines.append("- 改写文件：" + ("、".join(files) if files else "（无）"))
+    for label, items in (("新增", diff.added), ("移除", diff.removed)):
+        if items:
+            lines += ["", f"### {label}", ""]
+            lines += [f"- {x['title']}（{x['rating'] or '未评级'}）" for x in items]
+    if diff.rerated:
+        lines += ["", f"### 星级变化（{diff.rating_key}）", ""]
+        lines += [f"- {x['title']}：{x['from'] or '未评级'} → {x['to'] or '未评级'}" for x in diff.rerated]
+    if diff.changed:
+        lines += ["", "### 其他字段变化", ""]
+        lines += [f"- {x['title']}：{', '.join(x['fields'])}" for x in diff.changed]
+    return "\n".join(lines) + "\n\n"
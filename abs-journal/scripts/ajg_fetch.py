@@ -18,6 +18,13 @@ Outputs:
 - ajg_<year>_journals_raw.jsonl
 - ajg_<year>_meta.json
 - ajg_<year>_journals_core_custom.csv
+- ajg_<year>_journals_core_custom.ajgsnap (compiled snapshot of the core CSV)
+- ajg_<year>_changelog.md (--incremental only; one entry appended per update)
+
+With --incremental the fetched records are diffed against the existing raw JSONL by
+ISSN/title (ajg_diff.py): unchanged data leaves every file (and the snapshot) untouched,
+otherwise only files whose content changed are rewritten and the meta JSON records the
+added/removed/re-rated journals.
 """
 
 from __future__ import annotations
@@ -38,12 +45,19 @@ import urllib.request
 import http.cookiejar
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ajg_diff import AjgDiff, changelog_entry, changelog_name, diff_records
+from abs_paths import cache_dir
+from ajg_http import PooledClient, ResponseCache
+
 
 BASE = "https://charteredabs.org"
 ENTRY_URL = "https://charteredabs.org/academic-journal-guide"
 LOGIN_URL = "https://charteredabs.org/login?gated=true"
 AUTH_POST_URL = "https://charteredabs.org/!/auth/login"
 
+# Concurrent Algolia page requests (pages 1..nbPages-1) per fetch.
+ALGOLIA_WORKERS = 4
+
 DEFAULT_UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122 Safari/537.36"
 
 ANSI_RESET = "\x1b[0m"
@@ -169,9 +183,28 @@ def decode_body(body: bytes, fallback: str = "utf-8") -> str:
         return body.decode(fallback, errors="replace")
 
 
-def discover_latest_year_and_url(opener: urllib.request.OpenerDirector, debug_http: bool = False) -> Tuple[int, str]:
-    req = urllib.request.Request(ENTRY_URL, method="GET")
-    status, final_url, body = http_open(opener, req, debug_http=debug_http)
+def http_get(
+    opener: urllib.request.OpenerDirector,
+    url: str,
+    cache: Optional[ResponseCache] = None,
+    debug_http: bool = False,
+) -> Tuple[int, str, bytes]:
+    """GET through `cache` (in-run dedup + conditional requests) when given, else http_open."""
+    if cache is not None:
+        return cache.get(opener, url)
+    return http_open(opener, urllib.request.Request(url, method="GET"), debug_http=debug_http)
+
+
+def http_cache_dir() -> str:
+    return str(cache_dir() / "http")
+
+
+def discover_latest_year_and_url(
+    opener: urllib.request.OpenerDirector,
+    debug_http: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> Tuple[int, str]:
+    status, final_url, body = http_get(opener, ENTRY_URL, cache, debug_http=debug_http)
     if status >= 400:
         raise RuntimeError(f"Failed to fetch entry page: {status} {final_url}")
     html_text = decode_body(body)
@@ -279,18 +312,17 @@ def parse_algolia_vars_from_html_or_entry(
     opener: urllib.request.OpenerDirector,
     entry_url: str,
     debug_http: bool = False,
+    cache: Optional[ResponseCache] = None,
 ) -> Optional[Tuple[str, str, bool]]:
     # Try parse from AJG HTML first; if missing, try the main entry page (some globals are set there).
-    req = urllib.request.Request(entry_url, method="GET")
-    st, fu, bd = http_open(opener, req, debug_http=debug_http)
+    st, fu, bd = http_get(opener, entry_url, cache, debug_http=debug_http)
     if st >= 400:
         return None
     html_text = decode_body(bd)
     alg = parse_algolia_vars_from_html(html_text)
     if alg:
         return alg
-    req2 = urllib.request.Request(ENTRY_URL, method="GET")
-    st2, fu2, bd2 = http_open(opener, req2, debug_http=debug_http)
+    st2, fu2, bd2 = http_get(opener, ENTRY_URL, cache, debug_http=debug_http)
     if st2 >= 400:
         return None
     return parse_algolia_vars_from_html(decode_body(bd2))
@@ -312,39 +344,41 @@ def algolia_headers(app_id: str, api_key: str) -> Dict[str, str]:
     }
 
 
+def algolia_base_url(app_id: str) -> str:
+    return f"https://{app_id}-dsn.algolia.net"
+
+
 def algolia_query(
-    opener: urllib.request.OpenerDirector,
+    client: PooledClient,
     app_id: str,
     api_key: str,
     index_name: str,
     query: str,
     hits_per_page: int,
     page: int,
-    debug_http: bool = False,
+    base_url: Optional[str] = None,
 ) -> Dict[str, Any]:
-    url = f"https://{app_id}-dsn.algolia.net/1/indexes/{urllib.parse.quote(index_name)}/query"
+    url = f"{base_url or algolia_base_url(app_id)}/1/indexes/{urllib.parse.quote(index_name)}/query"
     payload = {"query": query, "hitsPerPage": hits_per_page, "page": page}
-    req = urllib.request.Request(
+    status, final_url, body = client.request(
+        "POST",
         url,
         data=json.dumps(payload).encode("utf-8"),
-        method="POST",
         headers=algolia_headers(app_id, api_key),
     )
-    status, final_url, body = http_open(opener, req, debug_http=debug_http)
     if status >= 400:
         raise RuntimeError(f"Algolia query failed: {status} {final_url}")
     return json.loads(decode_body(body))
 
 
 def algolia_list_indexes(
-    opener: urllib.request.OpenerDirector,
+    client: PooledClient,
     app_id: str,
     api_key: str,
-    debug_http: bool = False,
+    base_url: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
-    url = f"https://{app_id}-dsn.algolia.net/1/indexes"
-    req = urllib.request.Request(url, method="GET", headers=algolia_headers(app_id, api_key))
-    status, final_url, body = http_open(opener, req, debug_http=debug_http)
+    url = f"{base_url or algolia_base_url(app_id)}/1/indexes"
+    status, final_url, body = client.request("GET", url, headers=algolia_headers(app_id, api_key))
     if status >= 400:
         raise RuntimeError(f"Algolia list indexes failed: {status} {final_url}")
     obj = json.loads(decode_body(body))
@@ -354,16 +388,53 @@ def algolia_list_indexes(
     return items
 
 
+def _is_hits_list(hits: Any) -> bool:
+    return isinstance(hits, list) and (not hits or isinstance(hits[0], dict))
+
+
+def algolia_fetch_all_hits(
+    client: PooledClient,
+    app_id: str,
+    api_key: str,
+    index_name: str,
+    hits_per_page: int = 1000,
+    workers: int = ALGOLIA_WORKERS,
+    base_url: Optional[str] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """All hits of `index_name`, in page order; None if page 0 has an unexpected shape.
+
+    Page 0 tells nbPages; pages 1.. are then requested concurrently (`workers` threads)
+    over the client's pooled keep-alive connections.
+    """
+    first = algolia_query(client, app_id, api_key, index_name, query="", hits_per_page=hits_per_page, page=0, base_url=base_url)
+    hits0 = first.get("hits")
+    if not _is_hits_list(hits0):
+        return None
+    nb_pages = int(first.get("nbPages") or 1)
+
+    def fetch_page(p: int) -> List[Dict[str, Any]]:
+        page_obj = algolia_query(client, app_id, api_key, index_name, query="", hits_per_page=hits_per_page, page=p, base_url=base_url)
+        page_hits = page_obj.get("hits")
+        if not _is_hits_list(page_hits):
+            raise RuntimeError(f"Algolia page {p} returned unexpected hits shape")
+        return page_hits
+
+    all_hits: List[Dict[str, Any]] = list(hits0)  # type: ignore[arg-type]
+    for page_hits in client.map(fetch_page, range(1, nb_pages), workers=workers):
+        all_hits.extend(page_hits)
+    return all_hits
+
+
 def resolve_algolia_index_name(
-    opener: urllib.request.OpenerDirector,
+    client: PooledClient,
     app_id: str,
     api_key: str,
     search_index_hint: str,
-    debug_http: bool = False,
+    base_url: Optional[str] = None,
 ) -> str:
     # The page may advertise e.g. CABS_AJG, but the actual Algolia index might be prefixed
     # (e.g., dev_CABS_AJG). We resolve by listing indexes and matching.
-    items = algolia_list_indexes(opener, app_id, api_key, debug_http=debug_http)
+    items = algolia_list_indexes(client, app_id, api_key, base_url=base_url)
     candidates: List[str] = []
     for it in items:
         name = it.get("name")
@@ -586,31 +657,47 @@ def format_percent_value(internal_key: str, value: Any) -> str:
     return s
 
 
+def core_csv_text(rows: List[Dict[str, Any]], display_columns: List[str]) -> str:
+    """The core CSV content (display header + transformed values) as written to disk."""
+    internal_cols = [core_display_to_internal_key(c) for c in display_columns]
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(display_columns)
+    for r in rows:
+        out_row: List[str] = []
+        for k in internal_cols:
+            v = r.get(k, "")
+            if k in {"ajg_2024", "ajg_2021"}:
+                out_row.append(transform_ajg_rating(v))
+            elif k in {
+                "sdg_any_as_percent_of_scholarly_output_2017_2021",
+                "intl_percent_of_co_authored_outputs_2017_2021",
+                "scholarly_percent_of_scholarly_output_2017_2021",
+                "policy_percent_of_scholarly_output_2017_2021__value",
+            }:
+                out_row.append(format_percent_value(k, v))
+            else:
+                out_row.append(normalize_value(v))
+        w.writerow(out_row)
+    return buf.getvalue()
+
+
 def write_csv_with_header_alias(
     path: str,
     rows: List[Dict[str, Any]],
     display_columns: List[str],
 ) -> None:
-    internal_cols = [core_display_to_internal_key(c) for c in display_columns]
     with open(path, "w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(display_columns)
-        for r in rows:
-            out_row: List[str] = []
-            for k in internal_cols:
-                v = r.get(k, "")
-                if k in {"ajg_2024", "ajg_2021"}:
-                    out_row.append(transform_ajg_rating(v))
-                elif k in {
-                    "sdg_any_as_percent_of_scholarly_output_2017_2021",
-                    "intl_percent_of_co_authored_outputs_2017_2021",
-                    "scholarly_percent_of_scholarly_output_2017_2021",
-                    "policy_percent_of_scholarly_output_2017_2021__value",
-                }:
-                    out_row.append(format_percent_value(k, v))
-                else:
-                    out_row.append(normalize_value(v))
-            w.writerow(out_row)
+        f.write(core_csv_text(rows, display_columns))
+
+
+def read_text_exact(path: str) -> Optional[str]:
+    """File content without newline translation, or None if it cannot be read."""
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
 
 
 def normalize_title(s: str) -> str:
@@ -639,10 +726,11 @@ def attempt_fetch_data_via_api_probe(
     opener: urllib.request.OpenerDirector,
     entry_url: str,
     debug_http: bool = False,
+    workers: int = ALGOLIA_WORKERS,
+    cache: Optional[ResponseCache] = None,
 ) -> Tuple[Optional[str], Optional[Any]]:
     # Preferred: AJG uses Algolia (InstantSearch). Try using Algolia credentials embedded in HTML.
-    req = urllib.request.Request(entry_url, method="GET")
-    status, final_url, body = http_open(opener, req, debug_http=debug_http)
+    status, final_url, body = http_get(opener, entry_url, cache, debug_http=debug_http)
     if status >= 400:
         raise RuntimeError(f"Failed to fetch AJG entry page (post-login): {status} {final_url}")
 
@@ -652,24 +740,17 @@ def attempt_fetch_data_via_api_probe(
 
     alg = parse_algolia_vars_from_html(html_text)
     if not alg:
-        alg = parse_algolia_vars_from_html_or_entry(opener, entry_url, debug_http=debug_http)
+        alg = parse_algolia_vars_from_html_or_entry(opener, entry_url, debug_http=debug_http, cache=cache)
     idx_hint = parse_search_index_from_html(html_text)
     if alg and idx_hint:
         app_id, api_key, _use_dev = alg
-        resolved = resolve_algolia_index_name(opener, app_id, api_key, idx_hint, debug_http=debug_http)
-        # Fetch all pages
-        first = algolia_query(opener, app_id, api_key, resolved, query="", hits_per_page=1000, page=0, debug_http=debug_http)
-        hits0 = first.get("hits")
-        if not (isinstance(hits0, list) and (not hits0 or isinstance(hits0[0], dict))):
+        # Algolia calls are authenticated by headers (no cookies): use the pooled client
+        # so the index listing and all pages share keep-alive connections.
+        with PooledClient(headers={"User-Agent": DEFAULT_UA}, debug_http=debug_http) as client:
+            resolved = resolve_algolia_index_name(client, app_id, api_key, idx_hint)
+            all_hits = algolia_fetch_all_hits(client, app_id, api_key, resolved, workers=workers)
+        if all_hits is None:
             return None, None
-        nb_pages = int(first.get("nbPages") or 1)
-        all_hits: List[Dict[str, Any]] = list(hits0)  # type: ignore[arg-type]
-        for p in range(1, nb_pages):
-            page_obj = algolia_query(opener, app_id, api_key, resolved, query="", hits_per_page=1000, page=p, debug_http=debug_http)
-            page_hits = page_obj.get("hits")
-            if not (isinstance(page_hits, list) and (not page_hits or isinstance(page_hits[0], dict))):
-                raise RuntimeError(f"Algolia page {p} returned unexpected hits shape")
-            all_hits.extend(page_hits)  # type: ignore[arg-type]
         return f"algolia:{resolved}", all_hits
 
     # Fallback: download module JS and scan for endpoints.
@@ -678,8 +759,7 @@ def attempt_fetch_data_via_api_probe(
         return None, None
 
     # Fetch module JS
-    req2 = urllib.request.Request(module_src, method="GET")
-    status2, final_url2, body2 = http_open(opener, req2, debug_http=debug_http)
+    status2, final_url2, body2 = http_get(opener, module_src, cache, debug_http=debug_http)
     if status2 >= 400:
         return None, None
 
@@ -799,7 +879,7 @@ def mask_secret(s: str) -> str:
     return s[:2] + "*" * (len(s) - 4) + s[-2:]
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     # Help color tests:
     #   NO_COLOR=1 python scripts/ajg_fetch.py -h
     #   FORCE_COLOR=1 python scripts/ajg_fetch.py -h
@@ -808,8 +888,19 @@ def main() -> int:
     # For UX validation: include at least one choices argument.
     ap.add_argument("--mode", default="core", choices=["core"], help="运行模式（当前仅core）")
     ap.add_argument("--overwrite", action="store_true", help="允许覆盖既有输出文件（默认不覆盖）")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量更新：与现有原始 JSONL 按 ISSN/标题比对，只改写有变化的文件并追加 changelog；无变化时不重建 snapshot",
+    )
     ap.add_argument("--debug-http", action="store_true")
-    args = ap.parse_args()
+    ap.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="不使用页面响应缓存（默认缓存于 <cache_dir>/http，按 ETag/Last-Modified 条件请求；同次运行内相同 GET 只请求一次）",
+    )
+    ap.add_argument("--workers", type=int, default=ALGOLIA_WORKERS, help=f"并发拉取 Algolia 分页的线程数（默认{ALGOLIA_WORKERS}）")
+    args = ap.parse_args(argv)
 
     outdir = os.path.abspath(args.outdir)
     if not os.path.isabs(outdir):
@@ -844,9 +935,13 @@ def main() -> int:
         )
 
     opener = build_opener()
+    # Page GETs (entry page, AJG page, module JS) are deduplicated within this run; pages
+    # fetched before login are also revalidated against the on-disk cache. The login page
+    # always bypasses it (its CSRF token belongs to this session).
+    cache = ResponseCache(None if args.no_http_cache else http_cache_dir(), debug_http=args.debug_http)
 
     append_progress("开始：探测最新AJG入口")
-    latest_year, latest_url = discover_latest_year_and_url(opener, debug_http=args.debug_http)
+    latest_year, latest_url = discover_latest_year_and_url(opener, debug_http=args.debug_http, cache=cache)
     ajg_year = latest_year
     entry_url = latest_url
 
@@ -855,10 +950,10 @@ def main() -> int:
     append_progress("开始：自动化登录")
     append_progress(f"使用账号：{email} 密码：{mask_secret(password)}（仅用于本地会话，不写入文件）")
     do_login(opener, email=email, password=password, debug_http=args.debug_http)
+    cache.start_authenticated()  # logged-in pages differ and embed the search key: memo only
 
-    # Verify access
-    req = urllib.request.Request(entry_url, method="GET")
-    st, fu, bd = http_open(opener, req, debug_http=args.debug_http)
+    # Verify access (the probe below reuses this response)
+    st, fu, bd = http_get(opener, entry_url, cache, debug_http=args.debug_http)
     if st >= 400:
         raise RuntimeError(f"Failed to fetch AJG page after login: {st} {fu}")
     ht = decode_body(bd)
@@ -868,7 +963,12 @@ def main() -> int:
     append_progress("登录验证通过：可访问AJG页面")
 
     append_progress("开始：探测数据API/嵌入数据")
-    api_url, obj = attempt_fetch_data_via_api_probe(opener, entry_url, debug_http=args.debug_http)
+    api_url, obj = attempt_fetch_data_via_api_probe(
+        opener, entry_url, debug_http=args.debug_http, workers=args.workers, cache=cache
+    )
+    append_progress(
+        f"页面请求：实际下载 {cache.fetched}，304 复用 {cache.not_modified}，同次运行去重 {cache.memo_hits}"
+    )
     if api_url is None or obj is None:
         raise RuntimeError("未能自动定位AJG数据接口/嵌入数据（需要进一步人工抓包或增加解析逻辑）")
 
@@ -884,18 +984,34 @@ def main() -> int:
     raw_path = os.path.join(outdir, f"ajg_{ajg_year}_journals_raw.jsonl")
     core_csv_custom_path = os.path.join(outdir, f"ajg_{ajg_year}_journals_core_custom.csv")
     meta_path = os.path.join(outdir, f"ajg_{ajg_year}_meta.json")
+    changelog_path = os.path.join(outdir, changelog_name(ajg_year))
 
     out_paths = [raw_path, core_csv_custom_path, meta_path]
-    if not args.overwrite:
+    diff: Optional[AjgDiff] = None
+    if args.incremental and os.path.isfile(raw_path):
+        diff = diff_records(read_jsonl(raw_path), records, rating_key=f"ajg_{ajg_year}")
+        append_progress(f"增量比对（按 ISSN/标题）：{diff.summary()}")
+        if diff.empty and all(os.path.isfile(p) for p in out_paths):
+            with open(changelog_path, "a", encoding="utf-8") as f:
+                f.write(changelog_entry(diff, retrieved_at_utc=retrieved_at, data_source=api_url))
+            append_progress(f"无变化：保留现有数据文件与 snapshot，仅追加 changelog：{changelog_path}")
+            append_progress("完成")
+            return 0
+    elif not args.overwrite:
+        # Without the raw JSONL an incremental run has nothing to diff against, so existing
+        # CSV/meta files would be replaced wholesale: that still needs --overwrite.
         existing = [p for p in out_paths if os.path.exists(p)]
         if existing:
             raise RuntimeError(
-                "输出文件已存在（默认不覆盖）。如需覆盖请加 --overwrite。已存在: "
+                ("缺少原始 JSONL，无法增量比对；" if args.incremental else "")
+                + "输出文件已存在（默认不覆盖）。如需覆盖请加 --overwrite。已存在: "
                 + ", ".join(existing)
             )
 
+    written: List[str] = []
     append_progress(f"写入原始数据：{raw_path}")
     raw_count = write_jsonl(raw_path, records)
+    written.append(os.path.basename(raw_path))
 
     rows = build_rows_from_records(records, ajg_year=ajg_year, source_url=entry_url, retrieved_at_utc=retrieved_at)
     rows, dup = dedupe_rows(rows)
@@ -907,8 +1023,22 @@ def main() -> int:
     columns = choose_column_order(sorted(col_set))
 
     # Default output mode: ONLY core custom CSV + json/jsonl.
-    append_progress(f"写入核心列CSV（自定义表头）：{core_csv_custom_path}")
-    write_csv_with_header_alias(core_csv_custom_path, rows, CORE_COLUMNS_CUSTOM_DISPLAY_ORDER)
+    csv_text = core_csv_text(rows, CORE_COLUMNS_CUSTOM_DISPLAY_ORDER)
+    if diff is not None and read_text_exact(core_csv_custom_path) == csv_text:
+        # Changes were outside the core columns: the CSV (and so its snapshot) stays valid.
+        append_progress(f"核心列CSV无变化，跳过改写与 snapshot 重建：{core_csv_custom_path}")
+    else:
+        append_progress(f"写入核心列CSV（自定义表头）：{core_csv_custom_path}")
+        with open(core_csv_custom_path, "w", encoding="utf-8", newline="") as f:
+            f.write(csv_text)
+        written.append(os.path.basename(core_csv_custom_path))
+
+        # Compile the columnar snapshot so recommenders skip CSV parsing on the next run.
+        from abs_article_impl import write_ajg_snapshot
+
+        snapshot_path = write_ajg_snapshot(core_csv_custom_path)
+        append_progress(f"写入 AJG snapshot：{snapshot_path}")
+        written.append(os.path.basename(snapshot_path))
 
     meta = {
         "ajg_year": ajg_year,
@@ -920,11 +1050,23 @@ def main() -> int:
         "duplicate_count": dup,
         "columns": columns,
     }
+    if diff is not None:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("retrieved_at_utc")
+        except (OSError, ValueError, AttributeError):
+            previous = None
+        meta["incremental"] = {"previous_retrieved_at_utc": previous, **diff.to_meta()}
 
     with open(meta_path, "w", encoding="utf-8") as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
+    written.append(os.path.basename(meta_path))
 
     append_progress(f"写入元数据：{meta_path}")
+    if diff is not None:
+        with open(changelog_path, "a", encoding="utf-8") as f:
+            f.write(changelog_entry(diff, retrieved_at_utc=retrieved_at, data_source=api_url, files=written))
+        append_progress(f"追加 changelog：{changelog_path}")
     # Output contract verification (fail fast for downstream consumers)
     missing = [p for p in out_paths if not os.path.isfile(p)]
     if missing:
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""HTTP helpers for ajg_fetch.py (stdlib only): pooled keep-alive client and page cache.
+
+`ajg_fetch.http_open` goes through urllib, which opens (and TLS-handshakes) a new
+connection for every request. PooledClient keeps idle `http.client` connections per
+(scheme, host, port, proxy) and hands them out to concurrent callers, so a burst of Algolia
+page queries shares a few persistent connections instead of one handshake per page.
+
+Proxies follow urllib's ProxyHandler: `urllib.request.getproxies()` (HTTP_PROXY /
+HTTPS_PROXY, or the platform settings) unless `proxy_bypass(host)` says otherwise
+(NO_PROXY). https targets are tunnelled through the proxy with CONNECT; http targets send
+the absolute URI to the proxy. Credentials in the proxy URL become a Basic
+Proxy-Authorization header.
+
+Retry semantics match http_open: `retries` attempts with exponential backoff
+(`backoff * 2**(attempt-1)` seconds), status >= 400 counts as a failure (urllib raises
+HTTPError for those), and the final failure is a RuntimeError with the same message.
+A request that fails on a *reused* idle connection because the server already closed it
+is replayed once on a fresh connection without consuming an attempt.
+
+ResponseCache serves the cookie-carrying urllib page GETs (entry page, AJG page, module
+JS): identical GETs within a run are answered from memory, and across runs ETag /
+Last-Modified validators turn unchanged pages into 304s with the body reused from disk.
+Only pages fetched before login touch the disk: logged-in pages share URLs with the
+anonymous ones and may embed credentials (the Algolia search key).
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Errors that mean "the idle keep-alive connection was closed by the peer".
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Pool key: (scheme, host, port, proxy); proxy is (host, port, Proxy-Authorization or "") or None.
+_PoolKey = Tuple[str, str, int, Optional[Tuple[str, int, str]]]
+
+# Disk keys are sha256("<namespace>\n<url>"); only pre-login (anonymous) responses are stored.
+_DISK_NAMESPACE = "anonymous"
+
+
+class PooledClient:
+    """Thread-safe HTTP client with per-host keep-alive connection pools."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30,
+        retries: int = 5,
+        backoff: float = 1.0,
+        max_idle_per_host: int = 8,
+        headers: Optional[Dict[str, str]] = None,
+        proxies: Optional[Dict[str, str]] = None,
+        debug_http: bool = False,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_idle_per_host = max_idle_per_host
+        self.headers = dict(headers or {})
+        # Like urllib.request.ProxyHandler: read the environment once, at construction.
+        self.proxies = urllib.request.getproxies() if proxies is None else dict(proxies)
+        self.debug_http = debug_http
+        self.connections_opened = 0
+        self._idle: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "PooledClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[Tuple[str, int, str]]:
+        """(proxy host, proxy port, Proxy-Authorization or "") for `host`, or None to go direct."""
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parts = urllib.parse.urlsplit(proxy if "://" in proxy else "http://" + proxy)
+        auth = ""
+        if parts.username is not None:
+            cred = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+            auth = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+        return parts.hostname or "", parts.port or (443 if parts.scheme == "https" else 80), auth
+
+    def _checkout(self, key: _PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+            self.connections_opened += 1
+        scheme, host, port, proxy = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if proxy is None:
+            return cls(host, port, timeout=self.timeout), False
+        proxy_host, proxy_port, auth = proxy
+        if scheme != "https":
+            # Plain http: talk to the proxy directly; _once sends the absolute URI.
+            return http.client.HTTPConnection(proxy_host, proxy_port, timeout=self.timeout), False
+        conn = cls(proxy_host, proxy_port, timeout=self.timeout)
+        conn.set_tunnel(host, port, headers={"Proxy-Authorization": auth} if auth else None)
+        return conn, False
+
+    def _checkin(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle_per_host:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _once(
+        self, method: str, url: str, data: Optional[bytes], headers: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        proxy = self._proxy_for(scheme, host)
+        key: _PoolKey = (scheme, host, parts.port or (443 if scheme == "https" else 80), proxy)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if proxy is not None and scheme != "https":
+            path = urllib.parse.urlunsplit((scheme, parts.netloc, path, "", ""))
+            if proxy[2]:
+                headers = dict(headers, **{"Proxy-Authorization": proxy[2]})
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    continue  # the server dropped an idle connection: replay on a fresh one
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp.status, body
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, str, bytes]:
+        """(status, url, body) or RuntimeError, with http_open's retries and error message.
+
+        Unlike http_open, redirects are not followed (final_url is always `url`) and no
+        cookies are kept; it is meant for API calls such as the Algolia queries.
+        """
+        hdrs = dict(self.headers)
+        hdrs.update(headers or {})
+        last_err: Optional[Exception] = None
+        for attempt in range(1, self.retries + 1):
+            try:
+                status, body = self._once(method, url, data, hdrs)
+                if self.debug_http:
+                    sys.stderr.write(f"[HTTP] {method} {url} -> {status} {url} bytes={len(body)}\n")
+                if status >= 400:
+                    raise RuntimeError(f"HTTP Error {status}")
+                return status, url, body
+            except Exception as e:
+                last_err = e
+                if attempt >= self.retries:
+                    break
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+        raise RuntimeError(f"HTTP request failed after {self.retries} attempts: {method} {url}: {last_err}")
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T], *, workers: int = 4) -> List[R]:
+        """Run `fn` over `items` on up to `workers` threads; results keep input order."""
+        items = list(items)
+        if workers <= 1 or len(items) <= 1:
+            return [fn(x) for x in items]
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as ex:
+            return list(ex.map(fn, items))
+
+
+class ResponseCache:
+    """Conditional-GET cache for ajg_fetch page fetches (urllib opener, cookies kept).
+
+    - In-run memo: an identical GET (same URL) is answered from memory. Call
+      `start_authenticated()` after logging in, since the same URL then renders differently.
+    - On disk (`root`, e.g. <cache_dir>/http), anonymous phase only: responses carrying
+      ETag/Last-Modified are stored as <sha256>.json (validators) + .body (bytes, mode
+      0600); the next run sends If-None-Match/If-Modified-Since and a 304 reuses the stored
+      body. Responses with `Cache-Control: no-store` are never written. After
+      `start_authenticated()` the disk is neither read nor written (a validator match would
+      return the logged-out body, and logged-in pages carry the search key); `root=None`
+      keeps only the memo.
+
+    Retries follow ajg_fetch.http_open (exponential backoff, RuntimeError at the end).
+    """
+
+    def __init__(
+        self,
+        root: Optional[str],
+        *,
+        timeout: float = 30,
+        retries: int = 5,
+        backoff: float = 1.0,
+        debug_http: bool = False,
+    ) -> None:
+        self.root = root
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.debug_http = debug_http
+        self.memo_hits = 0
+        self.not_modified = 0
+        self.fetched = 0
+        self.authenticated = False
+        self._memo: Dict[str, Tuple[int, str, bytes]] = {}
+
+    def invalidate_memo(self) -> None:
+        self._memo.clear()
+
+    def start_authenticated(self) -> None:
+        """Switch to the logged-in phase: clear the memo and stop using the disk cache."""
+        self._memo.clear()
+        self.authenticated = True
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        # Namespaced so entries are only ever anonymous responses.
+        h = hashlib.sha256(f"{_DISK_NAMESPACE}\n{url}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.root or "", h[:2], h)
+        return base + ".json", base + ".body"
+
+    def _load(self, url: str) -> Optional[Dict[str, object]]:
+        if not self.root or self.authenticated:
+            return None
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get("url") == url else None
+
+    def _store(self, url: str, status: int, final_url: str, body: bytes, headers: "http.client.HTTPMessage") -> None:
+        etag = headers.get("ETag") or ""
+        last_modified = headers.get("Last-Modified") or ""
+        if self.authenticated or not self.root or not (etag or last_modified):
+            return
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return
+        meta_path, body_path = self._paths(url)
+        entry = {"url": url, "final_url": final_url, "status": status, "etag": etag, "last_modified": last_modified}
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            fd = os.open(body_path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(body_path + ".tmp", body_path)
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError:
+            return  # the cache is an optimization; a read-only cache dir must not break fetching
+
+    def get(
+        self,
+        opener: urllib.request.OpenerDirector,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, str, bytes]:
+        """GET `url` -> (status, final_url, body), like http_open, using memo/disk validators."""
+        hit = self._memo.get(url)
+        if hit is not None:
+            self.memo_hits += 1
+            if self.debug_http:
+                sys.stderr.write(f"[HTTP] GET {url} -> memo bytes={len(hit[2])}\n")
+            return hit
+        entry = self._load(url)
+        hdrs = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                hdrs["If-None-Match"] = str(entry["etag"])
+            if entry.get("last_modified"):
+                hdrs["If-Modified-Since"] = str(entry["last_modified"])
+        last_err: Optional[Exception] = None
+        result: Optional[Tuple[int, str, bytes]] = None
+        for attempt in range(1, self.retries + 1):
+            req = urllib.request.Request(url, method="GET", headers=hdrs)
+            try:
+                with opener.open(req, timeout=self.timeout) as resp:
+                    status = getattr(resp, "status", 200)
+                    final_url = resp.geturl()
+                    body = resp.read()
+                    self._store(url, status, final_url, body, resp.headers)
+                self.fetched += 1
+                result = (status, final_url, body)
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or entry is None:
+                    last_err = e
+                else:
+                    self.not_modified += 1
+                    result = (int(entry.get("status") or 200), str(entry.get("final_url") or url), entry["body"])  # type: ignore[arg-type]
+            except Exception as e:
+                last_err = e
+            if result is not None:
+                if self.debug_http:
+                    how = "304 cached" if hdrs.get("If-None-Match") or hdrs.get("If-Modified-Since") else "fetched"
+                    sys.stderr.write(f"[HTTP] GET {url} -> {result[0]} {result[1]} bytes={len(result[2])} ({how})\n")
+                self._memo[url] = result
+                return result
+            if attempt >= self.retries:
+                break
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+        raise RuntimeError(f"HTTP request failed after {self.retries} attempts: GET {url}: {last_err}")
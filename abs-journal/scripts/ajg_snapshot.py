@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compiled, memory-mappable AJG snapshot (stdlib only).
+
+The core CSV is the source of truth; a snapshot is a columnar binary copy of it
+stored next to the CSV (``<csv stem>.ajgsnap``). Readers mmap the file and pull
+columns without any CSV parsing. A snapshot records the (size, mtime_ns) stamp
+of the CSV it was built from and is ignored once the CSV changes.
+
+File layout (all integers little-endian):
+
+    b"AJGSNAP1" | uint32 header_len | header JSON | pad to 8 | column sections...
+
+Column kinds:
+- ``str``: uint32[n+1] character offsets, then the UTF-8 text of all values joined
+- ``i32``: int32[n]
+- ``f64``: float64[n] (NaN for missing)
+- ``f32``: float32[n * width] (row-major; ``width`` > 1 stores a dense matrix)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b"AJGSNAP1"
+SNAPSHOT_SUFFIX = ".ajgsnap"
+SNAPSHOT_VERSION = 1
+
+_KIND_TYPECODE = {"i32": "i", "f64": "d", "f32": "f"}
+
+
+def snapshot_path_for(csv_path: str) -> str:
+    base, _ext = os.path.splitext(os.path.abspath(csv_path))
+    return base + SNAPSHOT_SUFFIX
+
+
+def source_stamp(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _pad8(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _encode_str_column(values: Sequence[str]) -> bytes:
+    offsets = array("I", [0])
+    total = 0
+    for v in values:
+        total += len(v)
+        offsets.append(total)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets.tobytes() + "".join(values).encode("utf-8")
+
+
+def _encode_num_column(kind: str, values: Sequence[Any]) -> bytes:
+    arr = array(_KIND_TYPECODE[kind], values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def write_snapshot(
+    out_path: str,
+    *,
+    source_csv: str,
+    row_count: int,
+    columns: Sequence[Tuple[Any, ...]],
+    extra: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Write `columns` ([(name, kind, values[, width])]) as a snapshot of `source_csv` (atomic replace).
+
+    `extra` is stored verbatim in the header (e.g. versions of derived columns).
+    """
+    sections: List[bytes] = []
+    col_meta: List[Dict[str, Any]] = []
+    offset = 0
+    for name, kind, values, *rest in columns:
+        width = int(rest[0]) if rest else 1
+        if len(values) != row_count * width:
+            raise RuntimeError(f"snapshot 列长度不一致: {name} ({len(values)} != {row_count} x {width})")
+        if kind == "str":
+            data = _encode_str_column(values)
+        elif kind in _KIND_TYPECODE:
+            data = _encode_num_column(kind, values)
+        else:
+            raise RuntimeError(f"未知 snapshot 列类型: {kind}")
+        col_meta.append({"name": name, "kind": kind, "offset": offset, "length": len(data), "width": width})
+        data += b"\0" * _pad8(len(data))
+        sections.append(data)
+        offset += len(data)
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "row_count": int(row_count),
+        "source": {
+            "path": os.path.abspath(source_csv),
+            "sha256": file_sha256(source_csv),
+            **source_stamp(source_csv),
+        },
+        "columns": col_meta,
+        "extra": dict(extra or {}),
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    prefix += b"\0" * _pad8(len(prefix))
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        for data in sections:
+            f.write(data)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class Snapshot:
+    """Read-only view over a snapshot file (columns are served from the mmap)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._view = memoryview(self._mm)
+            if bytes(self._view[: len(MAGIC)]) != MAGIC:
+                raise RuntimeError(f"不是 AJG snapshot 文件: {path}")
+            (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+            start = len(MAGIC) + 4
+            self.header: Dict[str, Any] = json.loads(bytes(self._view[start : start + header_len]).decode("utf-8"))
+            if int(self.header.get("version") or 0) != SNAPSHOT_VERSION:
+                raise RuntimeError(f"snapshot 版本不匹配: {path}")
+            self._data_start = start + header_len + _pad8(start + header_len)
+            self._columns = {c["name"]: c for c in self.header.get("columns") or []}
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def row_count(self) -> int:
+        return int(self.header.get("row_count") or 0)
+
+    @property
+    def source(self) -> Dict[str, Any]:
+        return dict(self.header.get("source") or {})
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        return dict(self.header.get("extra") or {})
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+    def _section(self, name: str) -> memoryview:
+        col = self._columns.get(name)
+        if col is None:
+            raise KeyError(name)
+        start = self._data_start + int(col["offset"])
+        return self._view[start : start + int(col["length"])]
+
+    def strings(self, name: str) -> List[str]:
+        n = self.row_count
+        sec = self._section(name)
+        offsets = sec[: 4 * (n + 1)].cast("I")
+        if sys.byteorder != "little":
+            offsets = array("I", offsets.tobytes())
+            offsets.byteswap()
+        text = str(sec[4 * (n + 1) :], "utf-8")
+        return [text[offsets[i] : offsets[i + 1]] for i in range(n)]
+
+    def numbers(self, name: str) -> Sequence[Any]:
+        col = self._columns.get(name)
+        if col is None:
+            raise KeyError(name)
+        typecode = _KIND_TYPECODE[col["kind"]]
+        sec = self._section(name)
+        if sys.byteorder != "little":
+            arr = array(typecode, sec.tobytes())
+            arr.byteswap()
+            return arr
+        return sec.cast(typecode)
+
+    def close(self) -> None:
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None  # type: ignore[assignment]
+        self._mm.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def open_fresh_snapshot(csv_path: str, snap_path: str = "") -> Optional[Snapshot]:
+    """Open the snapshot for `csv_path` (or `snap_path`) if it exists and matches the CSV stamp; else None."""
+    snap_path = snap_path or snapshot_path_for(csv_path)
+    if not os.path.isfile(snap_path):
+        return None
+    try:
+        snap = Snapshot(snap_path)
+    except Exception:
+        return None
+    try:
+        stamp = source_stamp(csv_path)
+    except OSError:
+        snap.close()
+        return None
+    src = snap.source
+    if int(src.get("size", -1)) != stamp["size"] or int(src.get("mtime_ns", -1)) != stamp["mtime_ns"]:
+        snap.close()
+        return None
+    return snap
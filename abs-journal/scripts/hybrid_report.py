@@ -13,7 +13,10 @@ from __future__ import annotations
 import argparse
 import json
 import os
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from abs_pool_io import is_jsonl_pool, iter_pool, read_pool
+from abs_report import REPORT_FORMATS, ReportModel, TableSpec, md_cell_inline
 
 
 def load_json_abs(path: str) -> Dict[str, Any]:
@@ -24,13 +27,15 @@ def load_json_abs(path: str) -> Dict[str, Any]:
         return json.load(f)
 
 
-def md_escape(s: str) -> str:
-    return (s or "").replace("|", "\\|").replace("\n", " ").strip()
+md_escape = md_cell_inline
 
+_BUCKET_TABLE = TableSpec(["序号", "期刊名", "ABS星级", "Field", "推荐理由"], "rlrll", escape=md_escape)
 
-def build_index(pool: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+
+def index_candidates(candidates: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """journal -> candidate over any iterable of candidates (e.g. a streamed JSONL pool)."""
     out: Dict[str, Dict[str, Any]] = {}
-    for c in pool.get("candidates") or []:
+    for c in candidates:
         if not isinstance(c, dict):
             continue
         j = (c.get("journal") or "").strip()
@@ -39,6 +44,10 @@ def build_index(pool: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     return out
 
 
+def build_index(pool: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return index_candidates(pool.get("candidates") or [])
+
+
 def build_index_multi(pool_multi: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
     out: Dict[str, Dict[str, Dict[str, Any]]] = {}
     for bucket in ["easy", "medium", "hard"]:
@@ -96,30 +105,22 @@ def star_label(v: str) -> str:
 
 
 def render_table(
+    model: ReportModel,
     bucket_title: str,
     items: List[Dict[str, Any]],
     idx: Dict[str, Dict[str, Any]],
     topk: int,
-) -> str:
-    lines: List[str] = []
-    lines.append(f"### {bucket_title}")
-    lines.append("")
-    lines.append("| 序号 | 期刊名 | ABS星级 | Field | 推荐理由 |")
-    lines.append("|---:|---|---:|---|---|")
-
-    count = 0
-    for i, it in enumerate(items, 1):
-        if count >= topk:
-            break
+) -> None:
+    """Append one bucket section (### heading + fixed-column table) to `model`."""
+    model.heading(bucket_title, 3)
+    table = model.table(_BUCKET_TABLE)
+    for i, it in enumerate(items[: max(0, topk)], 1):
         j = it["journal"]
         cand = idx.get(j) or {}
         rating = star_label(str(cand.get("ajg_2024") or ""))
         field = (cand.get("field") or "").strip()
         topic = (it.get("topic") or "").strip()
-        lines.append(f"| {i} | {md_escape(j)} | {md_escape(rating)} | {md_escape(field)} | {md_escape(topic)} |")
-        count += 1
-    lines.append("")
-    return "\n".join(lines)
+        table.add((str(i), j, rating, field, topic))
 
 
 def extract_meta(pool: Dict[str, Any]) -> Dict[str, Any]:
@@ -137,12 +138,18 @@ def has_embedded_pools(ai: Dict[str, Any]) -> bool:
     return isinstance(pools, dict) and any(isinstance(pools.get(k), dict) for k in ["easy", "medium", "hard"])
 
 
-def render_report(
+def report_model(
     pool: Dict[str, Any],
     ai: Dict[str, Any],
     *,
     topk: int,
-) -> str:
+    index: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> ReportModel:
+    """Intermediate model of the hybrid report (see abs_report; render_report renders it).
+
+    `index` is a prebuilt journal index of a single `pool` (see index_candidates); when
+    given, `pool` only needs its meta.
+    """
     ai_norm = normalize_ai(ai)
     overlaps = find_cross_bucket_overlaps(ai_norm)
     if is_multi_pool(pool):
@@ -156,87 +163,111 @@ def render_report(
         # If ai embeds per-mode candidate pools, prefer those for indexing so Field/ABS星级 can be filled.
         idx_multi = build_index_multi(ai) if isinstance(ai, dict) else {}
         if not idx_multi:
-            idx_multi = {"easy": build_index(pool), "medium": build_index(pool), "hard": build_index(pool)}
+            idx = index if index is not None else build_index(pool)
+            idx_multi = {"easy": idx, "medium": idx, "hard": idx}
 
-    lines: List[str] = []
-    lines.append("# 投稿期刊推荐（混合流程：脚本候选池 → AI 二次筛选）")
-    lines.append("")
-    lines.append("## 可追溯信息")
-    lines.append("")
+    model = ReportModel()
+    model.heading("投稿期刊推荐（混合流程：脚本候选池 → AI 二次筛选）", 1)
+    model.heading("可追溯信息")
+    trace: List[str] = []
     if is_multi_pool(pool):
-        lines.append("- 候选池形态：easy/medium/hard 多池（每段各自星级过滤与排序）")
+        trace.append("候选池形态：easy/medium/hard 多池（每段各自星级过滤与排序）")
         for label, m in [("Easy", meta_easy), ("Medium", meta_medium), ("Hard", meta_hard)]:
             if not m:
                 continue
-            lines.append(f"- {label}：AJG CSV={m.get('ajg_csv')}；星级过滤={m.get('rating_filter')}；规模={m.get('count')}")
+            trace.append(f"{label}：AJG CSV={m.get('ajg_csv')}；星级过滤={m.get('rating_filter')}；规模={m.get('count')}")
     elif has_embedded_pools(ai):
-        lines.append("- 候选池形态：easy/medium/hard 多池（嵌入于 AI 输出 JSON；用于离线 auto_ai 复现与校验）")
+        trace.append("候选池形态：easy/medium/hard 多池（嵌入于 AI 输出 JSON；用于离线 auto_ai 复现与校验）")
         pools = (ai.get("candidate_pool_by_mode") or {}) if isinstance(ai, dict) else {}
         for label, bucket in [("Easy", "easy"), ("Medium", "medium"), ("Hard", "hard")]:
             m = extract_meta(pools.get(bucket) or {}) if isinstance(pools.get(bucket), dict) else {}
             if not m:
                 continue
-            lines.append(f"- {label}：AJG CSV={m.get('ajg_csv')}；星级过滤={m.get('rating_filter')}；规模={m.get('count')}")
+            trace.append(f"{label}：AJG CSV={m.get('ajg_csv')}；星级过滤={m.get('rating_filter')}；规模={m.get('count')}")
     else:
         if meta.get("generated_at"):
-            lines.append(f"- 候选池生成时间：{meta.get('generated_at')}")
+            trace.append(f"候选池生成时间：{meta.get('generated_at')}")
         if meta.get("ajg_csv"):
-            lines.append(f"- AJG CSV：{meta.get('ajg_csv')}")
+            trace.append(f"AJG CSV：{meta.get('ajg_csv')}")
         if meta.get("mode"):
-            lines.append(f"- 候选池难度：{meta.get('mode')}")
+            trace.append(f"候选池难度：{meta.get('mode')}")
         if meta.get("field_scope_effective"):
             scope = meta.get("field_scope_effective")
             if isinstance(scope, list):
-                lines.append(f"- 候选 Field：{', '.join([str(x) for x in scope if str(x).strip()])}")
+                trace.append(f"候选 Field：{', '.join([str(x) for x in scope if str(x).strip()])}")
         if meta.get("rating_filter"):
-            lines.append(f"- 星级过滤：{meta.get('rating_filter')}")
+            trace.append(f"星级过滤：{meta.get('rating_filter')}")
         if meta.get("rating_filter_effective") and meta.get("rating_filter_effective") != meta.get("rating_filter"):
-            lines.append(f"- 星级过滤（实际生效/含回退）：{meta.get('rating_filter_effective')}")
+            trace.append(f"星级过滤（实际生效/含回退）：{meta.get('rating_filter_effective')}")
         gating = meta.get("gating")
         if isinstance(gating, dict):
-            lines.append(f"- 主题贴合候选集：{gating.get('total_after')}（筛选前：{gating.get('total_before')}）")
-            lines.append(f"- gating 策略：{gating.get('strategy')}，TopN={gating.get('candidate_topn')}，回退={gating.get('fallback_used')}")
-        lines.append(f"- 候选池规模：{meta.get('count')}")
-    lines.append("")
-    lines.append("## 论文信息")
-    lines.append("")
+            trace.append(f"主题贴合候选集：{gating.get('total_after')}（筛选前：{gating.get('total_before')}）")
+            trace.append(f"gating 策略：{gating.get('strategy')}，TopN={gating.get('candidate_topn')}，回退={gating.get('fallback_used')}")
+        trace.append(f"候选池规模：{meta.get('count')}")
+    model.lines(trace)
+    model.heading("论文信息")
     paper = meta.get("paper") if isinstance(meta.get("paper"), dict) else {}
+    info: List[str] = []
     if paper.get("title"):
-        lines.append(f"- 标题：{paper.get('title')}")
+        info.append(f"标题：{paper.get('title')}")
     if paper.get("abstract"):
-        lines.append(f"- 摘要：{paper.get('abstract')}")
-    lines.append("")
-    lines.append("## 推荐清单（固定列）")
-    lines.append("")
-    lines.append(render_table("Easy Top10", ai_norm["easy"], idx_multi.get("easy") or {}, topk))
-    lines.append(render_table("Medium Top10", ai_norm["medium"], idx_multi.get("medium") or {}, topk))
-    lines.append(render_table("Hard Top10", ai_norm["hard"], idx_multi.get("hard") or {}, topk))
+        info.append(f"摘要：{paper.get('abstract')}")
+    model.lines(info)
+    model.heading("推荐清单（固定列）")
+    render_table(model, "Easy Top10", ai_norm["easy"], idx_multi.get("easy") or {}, topk)
+    render_table(model, "Medium Top10", ai_norm["medium"], idx_multi.get("medium") or {}, topk)
+    render_table(model, "Hard Top10", ai_norm["hard"], idx_multi.get("hard") or {}, topk)
     if overlaps:
-        lines.append("## 提醒：跨难度重复")
-        lines.append("")
-        lines.append("检测到同一期刊在不同难度中重复出现（建议按 hard→medium→easy 的优先级去重后再生成最终报告）：")
-        for j, buckets in sorted(overlaps.items(), key=lambda x: x[0].lower()):
-            lines.append(f"- {md_escape(j)}：{', '.join(buckets)}")
-        lines.append("")
-    lines.append("## 说明")
-    lines.append("")
-    lines.append("- `Field` 来自 AJG CSV，用于快速定位期刊所属领域。")
-    lines.append("- `推荐理由` 由 AI 根据论文内容生成，说明该期刊与论文的匹配理由。")
-    lines.append("- `ABS星级` 来自 AJG 2024 数据库（1-4*，星级越高影响力越大）。")
-    lines.append("- 本流程不自动联网查询审稿周期/版面费/投稿偏好等信息。")
-    return "\n".join(lines)
+        model.heading("提醒：跨难度重复")
+        ordered = sorted(overlaps.items(), key=lambda x: x[0].lower())
+        model.lines(
+            [f"{j}：{', '.join(buckets)}" for j, buckets in ordered],
+            lead="检测到同一期刊在不同难度中重复出现（建议按 hard→medium→easy 的优先级去重后再生成最终报告）：",
+            md=[f"{md_escape(j)}：{', '.join(buckets)}" for j, buckets in ordered],
+        )
+    model.heading("说明")
+    model.lines(
+        [
+            "`Field` 来自 AJG CSV，用于快速定位期刊所属领域。",
+            "`推荐理由` 由 AI 根据论文内容生成，说明该期刊与论文的匹配理由。",
+            "`ABS星级` 来自 AJG 2024 数据库（1-4*，星级越高影响力越大）。",
+            "本流程不自动联网查询审稿周期/版面费/投稿偏好等信息。",
+        ]
+    )
+    return model
+
+
+def render_report(
+    pool: Dict[str, Any],
+    ai: Dict[str, Any],
+    *,
+    topk: int,
+    fmt: str = "md",
+    index: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    """Render the hybrid report; `fmt` is one of abs_report.REPORT_FORMATS (default Markdown)."""
+    return report_model(pool, ai, topk=topk, index=index).render(fmt)
 
 
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--candidate_pool_json", required=True, help="候选池 JSON（路径）")
+    ap.add_argument("--candidate_pool_json", required=True, help="候选池 JSON/JSONL（路径）")
     ap.add_argument("--ai_output_json", required=True, help="AI 输出 JSON（路径，需已通过子集校验）")
     ap.add_argument("--topk", type=int, default=10, help="每段输出 TopK（默认10）")
+    ap.add_argument("--format", choices=REPORT_FORMATS, default="md", help="报告格式（默认 md；json/csv/html 由同一报告模型生成）")
     args = ap.parse_args()
 
-    pool = load_json_abs(os.path.abspath(args.candidate_pool_json))
+    pool_path = os.path.abspath(args.candidate_pool_json)
     ai = load_json_abs(os.path.abspath(args.ai_output_json))
-    print(render_report(pool, ai, topk=int(args.topk)))
+    index = None
+    if is_jsonl_pool(pool_path):
+        # The report only needs meta + a journal index: stream the candidates into it.
+        with iter_pool(pool_path) as (meta, cands):
+            index = index_candidates(cands)
+        pool: Dict[str, Any] = {"meta": meta}
+    else:
+        pool = read_pool(pool_path)  # json / compact / multi-pool
+    print(render_report(pool, ai, topk=int(args.topk), fmt=args.format, index=index))
     return 0
 
 
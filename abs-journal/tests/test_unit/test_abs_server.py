@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Unit tests for the warm recommendation daemon (abs_server.py)."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import pytest
+
+
+@pytest.fixture
+def server(tmp_path):
+    from abs_article_impl import DEFAULT_AJG_CSV
+    from abs_server import WarmData, make_server
+
+    shutil.copy(DEFAULT_AJG_CSV, tmp_path / "ajg_2024_journals_core_custom.csv")
+    warm = WarmData(str(tmp_path))
+    warm.reload()
+    srv = make_server(warm, port=0, quiet=True)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield srv, warm
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _call(srv, path, body=None):
+    url = f"http://127.0.0.1:{srv.server_address[1]}{path}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestAbsServer:
+    """Tests for the HTTP endpoints and data reload of abs_server.py"""
+
+    def test_recommend_matches_api(self, server):
+        """/recommend returns the same TopK as calling the API directly."""
+        from abs_journal_api import recommend, results_to_dict
+
+        srv, warm = server
+        body = {"title": "Trade war and public opinion", "modes": ["medium"], "topk": 5, "profile": "general"}
+        status, out = _call(srv, "/recommend", body)
+        assert status == 200
+
+        direct = recommend(warm.rows, title=body["title"], modes=("medium",), topk=5, profile="general")
+        expected = results_to_dict(direct, topk=5)["medium"]["topk"]
+        assert out["results"]["medium"]["topk"] == expected
+
+    def test_bad_requests(self, server):
+        """Missing title, a non-positive/non-integer topk or a non-boolean flag is a 400; unknown paths are a 404."""
+        srv, _warm = server
+        assert _call(srv, "/recommend", {})[0] == 400
+        assert _call(srv, "/recommend", {"title": "trade policy", "topk": [1]})[0] == 400
+        assert _call(srv, "/recommend", {"title": "trade policy", "topk": "ten"})[0] == 400
+        for topk in (0, 0.0, -1):
+            assert _call(srv, "/recommend", {"title": "trade policy", "topk": topk})[0] == 400
+        for weight in ("nan", "inf", -0.5, "-1"):
+            assert _call(srv, "/recommend", {"title": "trade policy", "semantic_weight": weight})[0] == 400
+            assert _call(srv, "/hybrid", {"title": "trade policy", "semantic_weight": weight})[0] == 400
+        for flag in ("false", "0", "no", 2):
+            assert _call(srv, "/recommend", {"title": "trade policy", "report": flag, "topk": 1})[0] == (
+                200 if flag in ("false", "0") else 400
+            )
+        status, out = _call(srv, "/recommend", {"title": "trade policy", "modes": "easy", "report": "false", "topk": 1})
+        assert status == 200 and "report" not in out["results"]["easy"]
+        assert _call(srv, "/nope", {})[0] == 404
+
+    def test_negative_content_length_is_rejected(self, server):
+        """A negative Content-Length is a 400 instead of a read-until-close."""
+        import http.client
+
+        srv, _warm = server
+        conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=5)
+        conn.putrequest("POST", "/recommend")
+        conn.putheader("Content-Length", "-1")
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == 400 and "Content-Length" in json.loads(resp.read())["error"]
+        conn.close()
+
+    def test_unix_socket_path_must_be_a_socket(self, tmp_path):
+        """make_server() replaces a stale socket file but refuses to delete a regular file."""
+        import socket
+
+        from abs_server import WarmData, make_server
+
+        path = tmp_path / "not-a-socket"
+        path.write_text("keep me", encoding="utf-8")
+        with pytest.raises(RuntimeError, match="不是 socket"):
+            make_server(WarmData(str(tmp_path)), unix_socket=str(path))
+        assert path.read_text(encoding="utf-8") == "keep me"
+
+        sock_path = tmp_path / "s.sock"
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(str(sock_path))
+        stale.close()
+        make_server(WarmData(str(tmp_path)), unix_socket=str(sock_path)).server_close()
+
+    def test_reloads_when_data_file_changes(self, server):
+        """Touching a file under the data dir triggers a reload on the next request."""
+        srv, warm = server
+        assert _call(srv, "/health")[1]["reloads"] == 1
+        assert _call(srv, "/health")[1]["reloads"] == 1
+
+        st = os.stat(warm.ajg_csv)
+        os.utime(warm.ajg_csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        status, out = _call(srv, "/health")
+        assert status == 200 and out["reloads"] == 2
+
+    def test_health_reports_reload_failures(self, server):
+        """A reload that fails (data file removed) answers /health with a JSON 500."""
+        srv, warm = server
+        os.remove(warm.ajg_csv)
+        status, out = _call(srv, "/health")
+        assert status == 500 and out["ok"] is False and out["error"]
+
+    def test_follow_up_reuses_session_scores(self, server):
+        """Asking again for the same paper with another mode is a session hit."""
+        srv, _warm = server
+        body = {"title": "Trade war and public opinion", "modes": ["medium"], "topk": 5, "profile": "general"}
+        assert _call(srv, "/recommend", body)[0] == 200
+        assert _call(srv, "/recommend", dict(body, modes=["hard"], rating_filter="3,4"))[0] == 200
+        session = _call(srv, "/health")[1]["session"]
+        assert session == {"papers": 1, "hits": 1, "misses": 1}
+
+    def test_hybrid_matches_api(self, server):
+        """/hybrid reuses the session and returns the same report as recommend_hybrid."""
+        from abs_journal_api import recommend_hybrid
+
+        srv, warm = server
+        body = {"title": "Trade war and public opinion", "topk": 5, "profile": "general"}
+        status, out = _call(srv, "/hybrid", body)
+        assert status == 200 and out["ok"]
+        assert out["report"] == recommend_hybrid(
+            warm.rows, title=body["title"], topk=5, profile="general", ajg_csv=warm.ajg_csv
+        ).report
+
+        status, out = _call(srv, "/hybrid", dict(body, report_format="csv"))
+        assert status == 200 and out["report"].startswith("Section,")
+        assert _call(srv, "/health")[1]["session"]["hits"] == 1
+        assert _call(srv, "/hybrid", dict(body, report_format="pdf"))[0] == 400
+
+        semantic = dict(body, semantic_weight=0.5)
+        status, out = _call(srv, "/hybrid", semantic)
+        assert status == 200 and _call(srv, "/health")[1]["session"]["misses"] == 2  # scored with semantic fit
+        direct = recommend_hybrid(
+            warm.rows, title=body["title"], topk=5, profile="general", ajg_csv=warm.ajg_csv, semantic_weight=0.5
+        )
+        assert out["report"] == direct.report
+
+    def test_stdio_session(self, tmp_path, monkeypatch):
+        """serve_stdio() answers one JSON line per request line, errors included."""
+        import io
+
+        import abs_server
+        from abs_article_impl import DEFAULT_AJG_CSV
+        from abs_server import serve_stdio
+
+        real = abs_server.handle_recommend
+
+        def handle(warm, body):
+            if body.get("title") == "boom":
+                raise TypeError("unexpected")
+            return real(warm, body)
+
+        monkeypatch.setattr(abs_server, "handle_recommend", handle)
+
+        shutil.copy(DEFAULT_AJG_CSV, tmp_path / "ajg_2024_journals_core_custom.csv")
+        body = {"title": "Trade war and public opinion", "modes": ["easy"], "topk": 3, "profile": "general"}
+        bad = [{}, dict(body, topk=[1]), dict(body, title="boom")]
+        inp = io.StringIO("\n".join(json.dumps(b) for b in [body, dict(body, modes=["hard"])] + bad) + "\n")
+        out = io.StringIO()
+        assert serve_stdio(data_dir=str(tmp_path), inp=inp, out=out) == 0
+
+        lines = [json.loads(x) for x in out.getvalue().splitlines()]
+        assert len(lines) == 5
+        assert len(lines[0]["results"]["easy"]["topk"]) == 3
+        assert list(lines[1]["results"]) == ["hard"]
+        assert "title" in lines[2]["error"]
+        assert "topk" in lines[3]["error"]
+        assert lines[4]["error"] == "TypeError: unexpected"
@@ -211,6 +211,765 @@ class TestValidateNoOverlap:
         assert errors == [], "non-dict items should be skipped"
 
 
+class TestSelectTopkFromPools:
+    """Tests for select_topk_from_pools() in abs_journal_api.py and validate_subset() in abs_ai_review.py"""
+
+    @staticmethod
+    def _pool(mode, rating_filter, rows):
+        cands = [
+            {"journal": name, "ajg_2024": rating, "signals": {"total_score": score, "fit_score": 0.0}}
+            for name, rating, score in rows
+        ]
+        return {"meta": {"mode": mode, "rating_filter_effective": rating_filter}, "candidates": cands}
+
+    def test_balanced_pick_and_overlap_fill(self):
+        """Per-rating quotas take the best unique names; short buckets are filled from the pool."""
+        from abs_ai_review import validate_subset
+        from abs_journal_api import select_topk_from_pools
+
+        easy = self._pool("easy", "1,2", [("A", "1", 5), ("B", "2", 9), ("C", "1", 7), ("D", "2", 3), ("E", "1", 1)])
+        medium = self._pool("medium", "2,3", [("B", "2", 9), ("F", "3", 8), ("G", "3", 2)])
+        hard = self._pool("hard", "4,4*", [("H", "4", 4), ("I", "4*", 6), ("J", "4", 5)])
+        out = select_topk_from_pools([easy, medium, hard], topk=3)
+
+        assert [x["journal"] for x in out["easy"]] == ["C", "A", "B"]
+        # B is taken by easy, so medium's rating-2 quota is filled in the overlap pass.
+        assert [x["journal"] for x in out["medium"]] == ["F", "B", "G"]
+        assert [x["journal"] for x in out["hard"]] == ["J", "H", "I"]
+        assert validate_subset(out, out, 3) == []
+
+    def test_journal_name_normalization(self):
+        """Whitespace runs collapse like re.sub(r"\\s+", " ", name.strip())."""
+        from abs_ai_review import normalize_journal_name
+
+        assert normalize_journal_name("  Journal \t of  X \n") == "Journal of X"
+        assert normalize_journal_name(None) == ""
+
+
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher / paper_signals() in abs_article_impl.py"""
+
+    def test_matches_substring_semantics(self):
+        """Matcher hits must equal the naive `k in text` scan, including overlapping keywords."""
+        from abs_article_impl import KeywordMatcher
+
+        weights = {"trade": 1.0, "trade war": 0.5, "rade": 0.1, "war": 0.2, "tariff": 1.5, "tfp": 0.3}
+        text = "the trade war raised tariffs"
+
+        matcher = KeywordMatcher(weights)
+        hits = matcher.find(text)
+
+        assert hits == {k for k in weights if k in text}
+        assert matcher.score(hits) == sum(w for k, w in weights.items() if k in text)
+
+    def test_paper_signals_reused_across_journals(self):
+        """fit_score with precomputed signals equals fit_score computed from scratch."""
+        from abs_article_impl import JournalRow, PaperProfile, fit_score, paper_signals
+
+        paper = PaperProfile(field="ECON", title="Trade war", abstract="tariff and public opinion", mode="easy")
+        journal = JournalRow("ECON", "World Trade Review", "2", "2", "", "", "", "", "", "", "", "")
+        signals = paper_signals(paper, profile="general")
+
+        assert fit_score(paper, journal, signals) == fit_score(paper, journal)
+
+
+class TestTitleRuleMask:
+    """Tests for the precomputed journal-title rule masks (title_rule_mask) in abs_article_impl.py"""
+
+    def test_mask_scoring_matches_substring_rules(self):
+        """Domain bonus, method penalty and fit title bonus equal a direct keyword scan of the title."""
+        import abs_article_impl as impl
+
+        rows = impl.load_ajg_csv(impl.DEFAULT_AJG_CSV, use_snapshot=False)
+        paper = impl.PaperProfile("ECON", "Trade and credit", "tariff shocks, bank loans and food prices", "medium")
+        signals = impl.paper_signals(paper, profile="general")
+        for j in rows:
+            jt = impl.normalize_text(j.title)
+            domain = 0.0
+            for points, keywords in impl.DOMAIN_PREFERENCE_RULES:
+                if any(k in jt for k in keywords):
+                    domain += points
+            assert impl.domain_preference_bonus(paper, j) == domain
+
+            method = 0.8 if any(k in jt for k in impl.METHOD_HARD_KEYWORDS) else (
+                0.4 if any(k in jt for k in impl.METHOD_SOFT_KEYWORDS) else 0.0
+            )
+            assert impl.method_heaviness_penalty(paper, j) == method
+
+            bonus = 0.0
+            for hit, (_p, j_keys, b) in zip(signals.fit_rule_hits, impl.FIT_TITLE_RULES):
+                if hit and any(k in jt for k in j_keys):
+                    bonus += b
+            base = impl.keyword_score(paper, j, signals)
+            field_bonus = 0.5 if j.field in {"ECON", "IB&AREA", "PUB SEC"} else 0.0
+            assert impl.fit_score(paper, j, signals) == base + field_bonus + bonus
+
+
+class TestScoreBatch:
+    """Tests for score_batch() / ScoreVectors in abs_article_impl.py"""
+
+    def test_batch_matches_per_journal_total_score(self):
+        """Every mode's batch totals equal total_score() computed one journal at a time."""
+        from abs_article_impl import JournalRow, PaperProfile, paper_signals, score_batch, total_score
+
+        journals = [
+            JournalRow("ECON", "World Trade Review", "2", "2", "40", "35", "", "12", "", "", "", ""),
+            JournalRow("ECON", "Journal of Econometrics", "4*", "4*", "3", "5", "7", "9", "", "", "", ""),
+            JournalRow("FINANCE", "Journal of Banking and Finance", "3", "3", "", "", "", "", "", "", "", ""),
+        ]
+        for mode in ["easy", "medium", "hard"]:
+            paper = PaperProfile(field="ECON", title="Tariffs and bank credit", abstract="", mode=mode)
+            signals = paper_signals(paper, profile="general")
+            vectors = score_batch(paper, journals, signals=signals)
+            for i, j in enumerate(journals):
+                assert vectors.row(i, mode) == total_score(paper, j, signals)
+
+
+class TestSemanticFit:
+    """Tests for the hashed n-gram semantic index in abs_semantic.py and its blending into totals"""
+
+    KEYS = [
+        ("ECON", "American Journal of Agricultural Economics"),
+        ("FINANCE", "Journal of Banking and Finance"),
+        ("ECON", "Journal of Urban Economics"),
+    ]
+
+    def test_closest_journal_ranks_first(self):
+        """A paper about farm output is closest to the agricultural journal; unknown journals score 0."""
+        from abs_semantic import SemanticIndex
+
+        index = SemanticIndex.build(list(self.KEYS))
+        sims = index.similarities("Agricultural productivity and farm income", self.KEYS + [("ECON", "Unknown")])
+        assert max(range(3), key=sims.__getitem__) == 0
+        assert sims[3] == 0.0
+        assert index.similarities("", self.KEYS) == [0.0, 0.0, 0.0]
+
+    def test_weight_blends_into_total(self):
+        """semantic_weight=0 keeps totals unchanged; otherwise adds weight x similarity."""
+        from abs_article_impl import JournalRow, PaperProfile, paper_signals, score_batch
+
+        journals = [JournalRow(f, t, "3", "3", "", "", "", "", "", "", "", "") for f, t in self.KEYS]
+        paper = PaperProfile(field="ECON", title="Bank credit", abstract="", mode="medium")
+        signals = paper_signals(paper, profile="general")
+        scorer = lambda js: [0.5 if j.field == "FINANCE" else 0.0 for j in js]  # noqa: E731
+        base = score_batch(paper, journals, signals=signals)
+        blended = score_batch(paper, journals, signals=signals, semantic=scorer, semantic_weight=2.0)
+        for i in range(len(journals)):
+            row = blended.row(i, "medium")
+            assert "semantic" not in base.row(i, "medium")
+            assert row["total"] == pytest.approx(base.row(i, "medium")["total"] + 2.0 * row["semantic"])
+        assert blended.take(journals[1:]).row(0, "medium")["semantic"] == 0.5
+
+    def test_cli_rejects_non_finite_or_negative_weight(self):
+        """--semantic_weight accepts finite values >= 0 only."""
+        import argparse
+
+        from abs_journal import _semantic_weight
+
+        assert _semantic_weight("0") == 0.0
+        assert _semantic_weight("1.5") == 1.5
+        for bad in ("nan", "inf", "-1", "x"):
+            with pytest.raises(argparse.ArgumentTypeError):
+                _semantic_weight(bad)
+
+    def test_index_round_trips_through_semvec_file(self, tmp_path):
+        """The .semvec file is reused while the CSV is unchanged."""
+        import abs_semantic
+
+        csv_path = tmp_path / "core.csv"
+        csv_path.write_text("Field,Journal Title\n", encoding="utf-8")
+        out, built = abs_semantic.write_semantic_index(str(csv_path), list(self.KEYS))
+        assert out.endswith(abs_semantic.SEMVEC_SUFFIX)
+        loaded = abs_semantic._read_semantic_index(str(csv_path))
+        text = "Housing and cities"
+        assert loaded.similarities(text, self.KEYS) == pytest.approx(built.similarities(text, self.KEYS), abs=1e-6)
+
+
+class TestFitSelector:
+    """Tests for the TopN selection engine (FitSelector) in abs_article_impl.py"""
+
+    def test_topn_matches_full_sort_including_expansion(self):
+        """Heap selection and later expanded TopN equal a stable full sort, per rating and overall."""
+        import random
+
+        from abs_article_impl import DEFAULT_AJG_CSV, FitSelector, load_ajg_csv
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)[:400]
+        rng = random.Random(7)
+        fit = [rng.choice([0.0, 0.5, 1.0, 1.5, 2.25]) for _ in rows]  # many ties
+        sel = FitSelector(rows, fit)
+
+        def expected(n, rating=None):
+            pairs = [(j, f) for j, f in zip(rows, fit) if rating is None or j.ajg_2024.strip() == rating]
+            return sorted(pairs, key=lambda x: x[1], reverse=True)[:n]
+
+        for n in (10, 80, 5, 250, 30):
+            assert sel.top(n) == expected(n)
+            for rating in ("1", "2", "4*"):
+                assert sel.top(n, rating) == expected(n, rating)
+        assert sel.group_size("3") == len(expected(10**6, "3"))
+
+
+class TestCatalogIndex:
+    """Tests for the field/rating partitions (CatalogIndex, JournalCatalog) in abs_article_impl.py"""
+
+    def test_scope_matches_row_filter_and_is_cached(self):
+        """A scope yields the same rows (CSV order) and rating groups as filtering the list."""
+        from abs_article_impl import DEFAULT_AJG_CSV, JournalCatalog, catalog_index, load_ajg_csv
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV)
+        assert isinstance(rows, JournalCatalog)
+        index = catalog_index(rows)
+        assert catalog_index(rows) is index
+
+        scope = ["FINANCE", "ECON"]
+        part = index.scope(scope)
+        expected = [r for r in rows if r.field in set(scope)]
+        assert part.journals == expected
+        for rating, positions in part.by_rating.items():
+            assert positions == [i for i, j in enumerate(expected) if j.ajg_2024.strip() == rating]
+        assert index.scope(["ECON", "FINANCE"]) is part
+        assert index.known_fields == {r.field for r in rows if r.field.strip()}
+
+    def test_unknown_field_rejected(self):
+        """resolve_field_scope() validates against the index's known fields."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv, resolve_field_scope
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV)
+        assert resolve_field_scope(rows, "ECON") == ["ECON"]
+        with pytest.raises(RuntimeError, match="NOT A FIELD"):
+            resolve_field_scope(rows, "ECON,NOT A FIELD")
+
+
+class TestRebalanceByRatingQuota:
+    """Tests for rebalance_by_rating_quota() / rebalance_pool_and_topk() in abs_article_impl.py"""
+
+    def _ranked(self, ratings):
+        from abs_article_impl import JournalRow
+
+        return [
+            (JournalRow("ECON", f"J{i}", r, r, "", "", "", "", "", "", "", ""), {"total": float(-i)})
+            for i, r in enumerate(ratings)
+        ]
+
+    def test_scarce_rating_filled_from_adjacent(self):
+        """With exact 1:1 quotas, a short rating keeps its few journals and the adjacent rating fills the gap."""
+        from abs_article_impl import rebalance_by_rating_quota
+
+        ranked = self._ranked(["1"] * 8 + ["2"] * 2)
+        picked, meta = rebalance_by_rating_quota(ranked, allowed_ratings=["1", "2"], target_n=6, mode="easy", exact_balance=True)
+
+        assert [j.title for j, _ in picked] == ["J0", "J1", "J2", "J8", "J9", "J3"]
+        assert meta["available_by_rating"] == {"1": 8, "2": 2}
+        assert meta["filled"] is True
+
+    def test_pool_and_topk_match_two_passes(self):
+        """The single-pass pool+TopK helper equals rebalancing the pool a second time."""
+        import random
+
+        from abs_article_impl import rebalance_by_rating_quota, rebalance_pool_and_topk
+
+        rng = random.Random(3)
+        ranked = self._ranked([rng.choice(["4", "4*", "4*", "3"]) for _ in range(120)])
+        kwargs = dict(allowed_ratings=["4", "4*"], mode="hard")
+        pool, pool_meta = rebalance_by_rating_quota(ranked, target_n=40, exact_balance=True, **kwargs)
+        top, top_meta = rebalance_by_rating_quota(pool, target_n=10, exact_balance=True, **kwargs)
+
+        assert rebalance_pool_and_topk(ranked, pool_n=40, topk=10, exact_balance=True, **kwargs) == (
+            pool,
+            pool_meta,
+            top,
+            top_meta,
+        )
+
+
+class TestScoredCandidates:
+    """Tests for the reusable gating-stage scores (ScoredCandidates) in abs_article_impl.py"""
+
+    def test_widening_and_refiltering_reuse_scores(self):
+        """Re-gating with a wider TopN or another rating filter matches a fresh run."""
+        from abs_article_impl import DEFAULT_AJG_CSV, PaperProfile, ScoredCandidates, load_ajg_csv, paper_signals
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)[:600]
+        paper = PaperProfile("ECON", "Trade war and public opinion", "tariff shocks", "easy")
+        signals = paper_signals(paper, profile="general")
+        scored = ScoredCandidates(paper, rows, signals=signals)
+
+        for topn, rating_filter in ((None, "1,2"), (200, "1,2"), (None, "4,4*"), (30, None)):
+            gated, _fit, meta = scored.gate(topk=10, candidate_topn=topn, rating_filter=rating_filter)
+            ranked = scored.rank(gated, "hard")
+            fresh = ScoredCandidates(paper, rows, signals=signals)
+            fresh_gated, _f, _m = fresh.gate(topk=10, candidate_topn=topn, rating_filter=rating_filter)
+            assert [j.title for j, _ in ranked] == [j.title for j, _ in fresh.rank(fresh_gated, "hard")]
+            assert meta.total_candidates_after == len(gated)
+            assert meta.rescored == 0
+
+    def test_rescored_counts_journals_missing_from_score_vectors(self):
+        """Gated journals without cached components are scored once and counted in GatingMeta.rescored."""
+        from abs_article_impl import DEFAULT_AJG_CSV, PaperProfile, ScoredCandidates, load_ajg_csv, paper_signals
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)[:300]
+        paper = PaperProfile("ECON", "Minimum wage and inequality", "", "medium")
+        signals = paper_signals(paper, profile="general")
+        scored = ScoredCandidates(paper, rows, signals=signals)
+        scored.vectors = scored.vectors.take(rows[:150])  # drop half of the cached components
+
+        gated, _fit, meta = scored.gate(topk=10, candidate_topn=300)
+        assert meta.rescored == len([j for j in gated if rows.index(j) >= 150]) > 0
+        fresh = ScoredCandidates(paper, rows, signals=signals)
+        assert [j.title for j, _ in scored.rank(gated, "medium")] == [j.title for j, _ in fresh.rank(gated, "medium")]
+        assert scored.gate(topk=10, candidate_topn=300)[2].rescored == 0
+
+
+class TestRecommendModes:
+    """Tests for the in-process multi-mode path (recommend_modes) in abs_article_impl.py"""
+
+    def test_multi_mode_matches_single_mode_runs(self):
+        """One shared scoring run yields the same pools as preparing each mode separately."""
+        from abs_article_impl import (
+            DEFAULT_AJG_CSV,
+            load_ajg_csv,
+            prepare_recommendation,
+            recommend_mode,
+            recommend_modes,
+        )
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)
+        filters = {"easy": "1,2", "medium": "2,3", "hard": "4,4*"}
+        kwargs = dict(title="Trade war and public opinion", abstract="tariff shocks and attitudes")
+
+        multi = recommend_modes(
+            rows, rating_filter_by_mode=filters, exact_rating_balance=True, export_pool=True, profile="general", **kwargs
+        )
+        for mode, rating_filter in filters.items():
+            ctx = prepare_recommendation(rows, profile="general", **kwargs)
+            single = recommend_mode(ctx, mode, rating_filter=rating_filter, exact_rating_balance=True, export_pool=True)
+            assert [j.title for j, _ in multi[mode].ranked] == [j.title for j, _ in single.ranked]
+            assert multi[mode].candidate_pool["candidates"] == single.candidate_pool["candidates"]
+
+
+class TestJournalApi:
+    """Tests for the in-process hybrid flow (recommend_hybrid) in abs_journal_api.py"""
+
+    def test_auto_selection_validates_and_renders(self):
+        """Without an AI output the selection is generated, validated and rendered in memory."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_journal_api import recommend_hybrid
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)
+        res = recommend_hybrid(rows, title="Trade war and public opinion", topk=5, profile="general")
+
+        assert res.ok and res.errors == []
+        assert set(res.pools) == {"easy", "medium", "hard"}
+        for mode in ("easy", "medium", "hard"):
+            assert len(res.ai_output[mode]) == 5
+        assert "Easy Top10" in res.report and "Hard Top10" in res.report
+
+    def test_invalid_ai_output_returns_errors(self):
+        """Journals outside the pool are reported as errors and no report is rendered."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_journal_api import recommend_hybrid
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)
+        ai_output = {m: [{"journal": "Not A Journal", "topic": "x"}] for m in ("easy", "medium", "hard")}
+        res = recommend_hybrid(rows, title="Trade war", ai_output=ai_output, topk=1, profile="general")
+
+        assert not res.ok
+        assert any("期刊不在候选池" in e for e in res.errors)
+        assert res.report == ""
+
+    def test_run_hybrid_shares_pool_objects(self):
+        """run_hybrid selects, validates and renders from the very pool dicts of `results`."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_journal_api import MODES, recommend, run_hybrid
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV, use_snapshot=False)
+        results = recommend(
+            rows, title="Trade war and public opinion", modes=MODES, topk=3, profile="general", exact_rating_balance=True
+        )
+        res = run_hybrid(results, topk=3, report_format="json")
+
+        assert res.ok
+        for mode in MODES:
+            assert res.ai_output["candidate_pool_by_mode"][mode] is results[mode].candidate_pool
+        assert res.report.startswith("{") and '"Hard Top10"' in res.report
+
+
+class TestRecommendSession:
+    """Tests for RecommendSession in abs_journal_api.py"""
+
+    @staticmethod
+    def _stable(report):
+        # Generation time legitimately differs.
+        return [x for x in report.splitlines() if "生成时间" not in x]
+
+    def test_follow_ups_match_fresh_recommend(self):
+        """Changing mode/rating filter reuses the paper's scores and matches recommend()."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_journal_api import RecommendSession, recommend
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV)
+        session = RecommendSession(rows)
+        paper = {"title": "Trade war and public opinion", "profile": "general", "topk": 5}
+        for mode, rating_filter in [("medium", ""), ("hard", "3,4"), ("easy", "1")]:
+            got = session.recommend(modes=[mode], rating_filter=rating_filter, **paper)[mode]
+            want = recommend(rows, modes=[mode], rating_filter=rating_filter, **paper)[mode]
+            assert self._stable(got.report) == self._stable(want.report)
+            assert got.candidate_pool == want.candidate_pool
+        assert (session.misses, session.hits, len(session)) == (1, 2, 1)
+
+    def test_least_recently_used_paper_is_evicted(self):
+        """Only `max_papers` contexts are kept."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_journal_api import RecommendSession
+
+        session = RecommendSession(load_ajg_csv(DEFAULT_AJG_CSV), max_papers=2)
+        for title in ["Tariffs", "Banks", "Tariffs", "Housing", "Tariffs"]:
+            session.context(title=title, profile="general")
+        assert len(session) == 2
+        assert (session.misses, session.hits) == (3, 2)
+        with pytest.raises(RuntimeError, match="非法 mode"):
+            session.recommend(title="Tariffs", modes=["nope"])
+
+    def test_different_papers_are_scored_concurrently(self, monkeypatch):
+        """The session lock is not held while a paper is scored, so two papers overlap."""
+        import threading
+
+        import abs_journal_api as api
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+
+        barrier = threading.Barrier(2, timeout=10)
+        real = api.prepare_recommendation
+
+        def prepare(*args, **kwargs):
+            barrier.wait()  # raises BrokenBarrierError if the two calls are serialized
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(api, "prepare_recommendation", prepare)
+        session = api.RecommendSession(load_ajg_csv(DEFAULT_AJG_CSV))
+        errors = []
+
+        def ask(title):
+            try:
+                session.recommend(title=title, modes=["easy"], topk=3, profile="general")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=ask, args=(t,)) for t in ("Tariffs", "Banks")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == [] and len(session) == 2
+
+
+class TestRecommendBatch:
+    """Tests for recommend_batch() in abs_journal_api.py"""
+
+    PAPERS = [
+        {"id": "a", "title": "Trade war and public opinion", "abstract": "tariff shocks and attitudes"},
+        {"id": "b", "title": "Microcredit and household welfare", "rating_filter": "3"},
+        {"id": "c"},
+    ]
+
+    def _strip_times(self, records):
+        for rec in records:
+            for res in (rec.get("results") or {}).values():
+                res["pool"]["meta"].pop("generated_at", None)
+        return records
+
+    def test_records_in_input_order_with_per_paper_overrides(self):
+        """One record per paper in order; per-paper keys override defaults; failures carry `error`."""
+        from abs_journal_api import recommend_batch
+
+        recs = list(recommend_batch(self.PAPERS, modes=("easy", "hard"), topk=4, profile="general", workers=1))
+
+        assert [r["id"] for r in recs] == ["a", "b", "c"]
+        assert set(recs[0]["results"]) == {"easy", "hard"}
+        assert len(recs[0]["results"]["easy"]["topk"]) == 4
+        assert all(c["ajg_2024"] == "3" for c in recs[1]["results"]["hard"]["topk"])
+        assert recs[2]["error"] and "results" not in recs[2]
+
+    def test_process_pool_matches_in_process(self):
+        """Scoring across worker processes yields the same records as the serial path."""
+        from abs_journal_api import recommend_batch
+
+        kwargs = dict(modes=("medium",), topk=3, profile="general")
+        serial = list(recommend_batch(self.PAPERS[:2], workers=1, **kwargs))
+        parallel = list(recommend_batch(self.PAPERS[:2], workers=2, **kwargs))
+        assert self._strip_times(serial) == self._strip_times(parallel)
+
+    def test_input_is_consumed_lazily(self):
+        """Only a bounded window of papers is read ahead of the first yielded record."""
+        from abs_journal_api import recommend_batch
+
+        pulled = []
+
+        def papers():
+            for i in range(50):
+                pulled.append(i)
+                yield {"id": i, "title": f"Trade policy and tariffs {i}"}
+
+        records = recommend_batch(papers(), modes=("easy",), topk=1, profile="general", workers=2)
+        assert next(records)["id"] == 0
+        assert len(pulled) <= 2 * 2 + 1
+        records.close()
+
+
+class TestResultCache:
+    """Tests for the on-disk result cache (abs_result_cache.py, recommend_cached)"""
+
+    def test_hit_returns_stored_output_without_recomputing(self, tmp_path, monkeypatch):
+        """Second call is served from disk; a changed parameter misses."""
+        import json
+
+        import abs_journal_api as api
+        from abs_result_cache import CachedResult, ResultCache
+
+        cache = ResultCache(str(tmp_path))
+        kwargs = dict(title="Trade war and farm income", modes=("easy", "hard"), topk=3, profile="general")
+        first = api.recommend_cached(cache=cache, **kwargs)
+        assert cache.stats()["entries"] == 2
+
+        calls = []
+        real = api.recommend
+        monkeypatch.setattr(api, "recommend", lambda *a, **kw: calls.append(kw["modes"]) or real(*a, **kw))
+        second = api.recommend_cached(cache=cache, **kwargs)
+        assert calls == []
+        assert all(isinstance(r, CachedResult) for r in second.values())
+        for m in ("easy", "hard"):
+            stable = [x for x in first[m].report.splitlines() if "生成时间" not in x]
+            assert [x for x in second[m].report.splitlines() if "生成时间" not in x] == stable
+            assert "命中本地结果缓存" in second[m].report
+            meta = second[m].candidate_pool.pop("meta")
+            assert meta["cached_from"] == first[m].candidate_pool["meta"]["generated_at"]
+            assert second[m].candidate_pool["candidates"] == json.loads(json.dumps(first[m].candidate_pool["candidates"]))
+
+        api.recommend_cached(cache=cache, **{**kwargs, "topk": 4})
+        assert calls == [["easy", "hard"]]
+
+    def test_prune_evicts_least_recently_used(self, tmp_path):
+        """prune() keeps the most recently read/written entries within the limits."""
+        from abs_result_cache import ResultCache
+
+        cache = ResultCache(str(tmp_path), max_entries=10)
+        for i, key in enumerate(("aa1", "bb2", "cc3")):
+            cache.put(key, {}, report=key, candidate_pool=None)
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+        assert cache.get("aa1").report == "aa1"  # refreshes its mtime
+
+        assert cache.prune(max_entries=2) == 1
+        assert cache.get("bb2") is None
+        assert cache.get("aa1") is not None and cache.get("cc3") is not None
+        assert cache.clear() == 2 and cache.stats()["entries"] == 0
+
+    def test_put_prunes_only_when_running_totals_cross_a_limit(self, tmp_path, monkeypatch):
+        """put() keeps usage.json up to date and walks the tree only when over a limit."""
+        from abs_result_cache import ResultCache
+
+        cache = ResultCache(str(tmp_path), max_entries=3)
+        cache.put("aa0", {}, report="x", candidate_pool=None)  # first put establishes the totals
+        walks = []
+        real = cache._entries
+        monkeypatch.setattr(cache, "_entries", lambda: walks.append(1) or real())
+        for key in ("bb1", "cc2"):
+            cache.put(key, {}, report="x", candidate_pool=None)
+        assert walks == [] and cache._read_usage()[0] == 3
+
+        cache.put("dd3", {}, report="x", candidate_pool=None)
+        assert walks and cache.stats()["entries"] == 3 and cache._read_usage()[0] == 3
+
+
+class TestPoolIO:
+    """Tests for candidate pool writers/readers in abs_pool_io.py"""
+
+    POOL = {
+        "meta": {"mode": "easy", "paper": {"title": "Trade", "abstract": "关税"}},
+        "candidates": [{"journal": "World Trade Review", "ajg_2024": "2"}, {"journal": "A | B", "ajg_2024": "1"}],
+    }
+
+    @pytest.mark.parametrize("fmt", ["json", "compact", "jsonl"])
+    def test_round_trip(self, tmp_path, fmt):
+        """Every format reads back to the same pool; jsonl switches to a .jsonl suffix."""
+        from abs_pool_io import iter_pool, read_pool, write_pool
+
+        path = write_pool(str(tmp_path / "pool.json"), self.POOL, fmt=fmt)
+        assert path.endswith(".jsonl" if fmt == "jsonl" else ".json")
+        assert read_pool(path) == self.POOL
+        with iter_pool(path) as (meta, cands):
+            assert meta == self.POOL["meta"] and list(cands) == self.POOL["candidates"]
+
+    def test_iter_pool_closes_file_on_early_exit(self, tmp_path):
+        """Leaving the block before the JSONL iterator is exhausted still closes the file."""
+        import gc
+        import warnings
+
+        from abs_pool_io import iter_pool, write_pool
+
+        path = write_pool(str(tmp_path / "pool.jsonl"), self.POOL, fmt="jsonl")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", ResourceWarning)
+            with iter_pool(path) as (_meta, cands):
+                assert next(cands)["journal"] == "World Trade Review"
+            del cands
+            gc.collect()
+
+    def test_consumers_stream_jsonl_pools(self, tmp_path, monkeypatch, capsys):
+        """abs_ai_review / hybrid_report read JSONL pools via iter_pool and match the JSON path."""
+        import json
+        import sys
+
+        import abs_ai_review
+        import hybrid_report
+        from abs_pool_io import write_pool
+
+        ai = {
+            "meta": {"allow_overlap": True},
+            "easy": [{"journal": "World Trade Review", "topic": "trade"}],
+            "medium": [{"journal": "A | B", "topic": "x"}],
+            "hard": [{"journal": "World Trade Review", "topic": "trade"}],
+        }
+        ai_path = tmp_path / "ai.json"
+        ai_path.write_text(json.dumps(ai), encoding="utf-8")
+
+        def run(main, pool_path):
+            monkeypatch.setattr(sys, "argv", ["x", "--candidate_pool_json", pool_path, "--ai_output_json", str(ai_path), "--topk", "1"])
+            code = main()
+            return code, capsys.readouterr().out
+
+        plain = write_pool(str(tmp_path / "pool.json"), self.POOL, fmt="json")
+        expected = {m: run(m, plain) for m in (abs_ai_review.main, hybrid_report.main)}
+
+        streamed = write_pool(str(tmp_path / "pool.jsonl"), self.POOL, fmt="jsonl")
+        for mod in (abs_ai_review, hybrid_report):
+            monkeypatch.setattr(mod, "read_pool", lambda *a: pytest.fail("JSONL pool was loaded whole"))
+        assert run(abs_ai_review.main, streamed) == expected[abs_ai_review.main] == (0, "OK\n")
+        assert run(hybrid_report.main, streamed) == expected[hybrid_report.main]
+        assert "World Trade Review" in expected[hybrid_report.main][1]
+
+    def test_jsonl_layout_and_non_pool_objects(self, tmp_path):
+        """JSONL is one header line plus one line per candidate; other JSON objects pass through."""
+        import json
+
+        from abs_pool_io import POOL_JSONL_FORMAT, read_pool, write_pool
+
+        lines = open(write_pool(str(tmp_path / "p.jsonl"), self.POOL, fmt="jsonl"), encoding="utf-8").read().splitlines()
+        assert json.loads(lines[0])["format"] == POOL_JSONL_FORMAT
+        assert len(lines) == 1 + len(self.POOL["candidates"])
+
+        multi = tmp_path / "multi.json"
+        multi.write_text(json.dumps({"easy": self.POOL}, indent=2), encoding="utf-8")
+        assert read_pool(str(multi)) == {"easy": self.POOL}
+
+
+class TestKeywordCache:
+    """Tests for the memoized keyword registry (get_keywords) in abs_article_impl.py"""
+
+    def _write(self, root, obj, mtime_ns):
+        import json
+
+        kw_dir = root / "assets" / "keywords"
+        kw_dir.mkdir(parents=True, exist_ok=True)
+        path = kw_dir / "econ_general.json"
+        path.write_text(json.dumps(obj), encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def test_reads_once_and_reloads_on_mtime_change(self, tmp_path, monkeypatch):
+        """Repeated calls reuse the table; a changed file stamp triggers a reload."""
+        import abs_article_impl as impl
+
+        monkeypatch.setattr(impl, "SKILL_ROOT", str(tmp_path))
+        impl.invalidate_keyword_cache()
+        self._write(tmp_path, {"trade": 1.0}, 1_000_000_000)
+
+        first = impl.get_keywords("ECON", profile="general")
+        assert first == {"trade": 1.0}
+        assert impl.get_keywords("ECON", profile="general") is first
+
+        self._write(tmp_path, {"tariff": 2.0}, 2_000_000_000)
+        assert impl.get_keywords("ECON", profile="general") == {"tariff": 2.0}
+        impl.invalidate_keyword_cache()
+
+    def test_invalidate_forces_reload(self, tmp_path, monkeypatch):
+        """invalidate_keyword_cache() drops cached tables even if the stamp is unchanged."""
+        import abs_article_impl as impl
+
+        monkeypatch.setattr(impl, "SKILL_ROOT", str(tmp_path))
+        impl.invalidate_keyword_cache()
+        self._write(tmp_path, {"trade": 1.0}, 1_000_000_000)
+        first = impl.get_keywords("ECON", profile="general")
+
+        impl.invalidate_keyword_cache("general")
+        assert impl.get_keywords("ECON", profile="general") is not first
+        impl.invalidate_keyword_cache()
+
+
+class TestBench:
+    """Tests for the benchmark harness in abs_bench.py"""
+
+    def test_record_shape_and_compare(self):
+        """A tiny run records every stage; corpora are reproducible; compare() lists shared stages."""
+        from abs_article_impl import DEFAULT_AJG_CSV, load_ajg_csv
+        from abs_bench import BENCH_FORMAT, compare, flatten, run_bench, synthetic_papers
+
+        rows = load_ajg_csv(DEFAULT_AJG_CSV)
+        assert synthetic_papers(rows, 3, seed=1) == synthetic_papers(rows, 3, seed=1)
+
+        record = run_bench(ajg_csv=DEFAULT_AJG_CSV, sizes=[1], repeat=1, cli_papers=0)
+        assert record["format"] == BENCH_FORMAT
+        stages = record["corpora"][0]["stages"]
+        assert set(stages) == {"total_score", "score_batch", "gate", "rebalance", "render", "recommend"}
+        flat = flatten(record)
+        assert "papers=1.recommend" in flat and "load.load_snapshot" in flat
+        assert len(compare(record, record)) == 1 + len(flat)
+
+
+class TestReportModel:
+    """Tests for the shared report model in abs_report.py"""
+
+    def test_markdown_layout_and_alternate_formats(self):
+        """Blocks join with one blank line; tables escape pipes; json/csv/html come from the same model."""
+        import json
+
+        from abs_report import ReportModel, TableSpec, report_path_for
+
+        spec = TableSpec(["#", "Journal"], "rl")
+        model = ReportModel()
+        model.heading("Title", 1)
+        model.heading("Picks")
+        table = model.table(spec)
+        table.add(("1", "A|B"))
+        table.add(("2", "raw"), md=("2", "cached"))
+        model.heading("Notes")
+        model.lines(["x", "y"], lead="Lead:")
+
+        assert model.render("md") == "\n".join(
+            ["# Title", "", "## Picks", "", "| # | Journal |", "|---:|---|", "| 1 | A\\|B |", "| 2 | cached |", "", "## Notes", "", "Lead:", "- x", "- y"]
+        )
+        data = json.loads(model.render("json"))
+        assert data["title"] == "Title"
+        assert data["sections"][0]["tables"][0]["rows"] == [["1", "A|B"], ["2", "raw"]]
+        assert data["sections"][1]["lines"] == ["Lead:", "x", "y"]
+        assert model.render("csv") == "Section,#,Journal\nPicks,1,A|B\nPicks,2,raw\n"
+        assert '<td style="text-align:right">1</td><td>A|B</td>' in model.render("html")
+        assert report_path_for("/r/ai_report.md", "html") == "/r/ai_report.html"
+        with pytest.raises(RuntimeError):
+            model.render("pdf")
+
+    def test_journal_cells_escaped_once(self):
+        """Per-mode reports reuse the escaped journal cells cached on each JournalRow."""
+        from abs_article_impl import JournalRow, PaperProfile, render_report
+
+        row = JournalRow("ECON", "Trade | Policy", "2", "2", "1", "1", "1", "1", "1%", "1%", "1%", "2")
+        paper = PaperProfile("ECON", "T", "", "easy")
+        scores = {"fit": 2.5, "easy": 1.0, "value": 0.0, "prestige_pen": 0.0}
+        md = render_report(paper, [(row, scores)], 10)
+        assert row.md_cells is not None and row.md_cells[1] == "Trade \\| Policy"
+        assert "| ECON | Trade \\| Policy | 2 | 2 | 2.50 |" in md
+        assert render_report(paper, [(row, scores)], 10) == md
+
+
 class TestRenderReport:
     """Tests for render_report() function in hybrid_report.py"""
 
@@ -225,6 +984,19 @@ class TestRenderReport:
         # This test will be implemented after understanding the function signature
         pass
 
+    def test_overlap_lines_escaped_only_in_markdown(self):
+        """Cross-bucket overlap lines keep raw journal names outside the Markdown rendering."""
+        import json
+
+        from hybrid_report import render_report
+
+        pool = {m: {"meta": {}, "candidates": []} for m in ("easy", "medium", "hard")}
+        ai = {"easy": [{"journal": "A | B", "topic": "x"}], "medium": [], "hard": [{"journal": "A | B", "topic": "y"}]}
+        assert "- A \\| B：easy, hard" in render_report(pool, ai, topk=3).splitlines()
+        lines = [x for sec in json.loads(render_report(pool, ai, topk=3, fmt="json"))["sections"] for x in sec["lines"]]
+        assert "A | B：easy, hard" in lines
+        assert "<li>A | B：easy, hard</li>" in render_report(pool, ai, topk=3, fmt="html")
+
 
 if __name__ == "__main__":
     # Run tests with pytest
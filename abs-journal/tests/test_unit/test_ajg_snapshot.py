@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Unit tests for the compiled AJG snapshot (ajg_snapshot.py + load_ajg_csv)."""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import pytest
+
+CSV_TEXT = (
+    "Field,Journal Title,AJG 2024,AJG 2021,Citescore rank,SNIP rank,SJR rank,JIF rank,"
+    "SDG content indicator (2017-21),International co-authorship (2017-21),"
+    "Academic-non-academic collaboration (2017-21),Citations in policy documents (2017-21)\n"
+    "ECON,World Trade Review,2,2,40,35,,12,25%,43%,8%,0.424\n"
+    'ECON,"Journal of Économie, Politique",4*,4,3,5,7,9,,,,\n'
+    "FINANCE,Bank Quarterly,1,1,,,,,10%,20%,1%,1.5\n"
+)
+
+
+@pytest.fixture
+def ajg_csv(tmp_path):
+    path = tmp_path / "ajg_2024_journals_core_custom.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+    return path
+
+
+class TestAjgSnapshot:
+    """Tests for write_ajg_snapshot() / load_ajg_csv() snapshot preference."""
+
+    def test_snapshot_round_trip_matches_csv(self, ajg_csv):
+        """Rows loaded from the snapshot equal rows parsed from the CSV."""
+        from abs_article_impl import load_ajg_csv, write_ajg_snapshot
+
+        from_csv = load_ajg_csv(str(ajg_csv), use_snapshot=False)
+        snap_path = write_ajg_snapshot(str(ajg_csv))
+        assert os.path.isfile(snap_path)
+
+        from_snap = load_ajg_csv(str(ajg_csv))
+        assert from_snap == from_csv
+
+    def test_snapshot_rows_carry_parsed_fields(self, ajg_csv):
+        """Rows built from snapshot columns expose the same pre-parsed fields as CSV rows."""
+        from abs_article_impl import load_ajg_csv, write_ajg_snapshot
+
+        from_csv = load_ajg_csv(str(ajg_csv), use_snapshot=False)
+        write_ajg_snapshot(str(ajg_csv))
+        from_snap = load_ajg_csv(str(ajg_csv))
+
+        for a, b in zip(from_csv, from_snap):
+            assert (a.rating_level, a.rating_star, a.rank_ints) == (b.rating_level, b.rating_star, b.rank_ints)
+        assert (from_snap[1].rating_level, from_snap[1].rating_star) == (4, True)
+        assert from_snap[0].rank_ints == (40, 35, 10**9, 12)
+        assert from_snap[2].policy_value_num == 1.5
+
+    def test_parsed_columns(self, ajg_csv):
+        """Snapshot stores rating codes, integer ranks and percentages."""
+        from abs_article_impl import write_ajg_snapshot
+        from ajg_snapshot import open_fresh_snapshot
+
+        write_ajg_snapshot(str(ajg_csv))
+        with open_fresh_snapshot(str(ajg_csv)) as snap:
+            assert list(snap.numbers("ajg_2024_code")) == [2, 5, 1]
+            assert list(snap.numbers("sjr_rank_int")) == [10**9, 7, 10**9]
+            pct = list(snap.numbers("sdg_pct_float"))
+            assert pct[0] == 25.0 and math.isnan(pct[1])
+
+    def test_stale_snapshot_is_ignored(self, ajg_csv):
+        """Editing the CSV invalidates the snapshot and load falls back to the CSV."""
+        from abs_article_impl import load_ajg_csv, write_ajg_snapshot
+        from ajg_snapshot import open_fresh_snapshot
+
+        write_ajg_snapshot(str(ajg_csv))
+        ajg_csv.write_text(CSV_TEXT + "ECON,New Journal,3,3,,,,,,,,\n", encoding="utf-8")
+        os.utime(ajg_csv, ns=(5_000_000_000, 5_000_000_000))
+
+        assert open_fresh_snapshot(str(ajg_csv)) is None
+        rows = load_ajg_csv(str(ajg_csv))
+        assert rows[-1].title == "New Journal"
+        # The fallback rewrites the snapshot for the next run.
+        assert open_fresh_snapshot(str(ajg_csv)) is not None
+
+    def test_title_rule_masks_stored_and_fingerprinted(self, ajg_csv, monkeypatch):
+        """Title masks are stored in the snapshot; a snapshot built with other rules is rebuilt."""
+        import abs_article_impl as impl
+        from ajg_snapshot import open_fresh_snapshot
+
+        impl.write_ajg_snapshot(str(ajg_csv))
+        with open_fresh_snapshot(str(ajg_csv)) as snap:
+            masks = list(snap.numbers("title_rule_mask"))
+        titles = ("World Trade Review", "Journal of Économie, Politique", "Bank Quarterly")
+        assert masks == [impl.title_rule_mask(t) for t in titles]
+        assert masks[0] & 1 << 1  # FIT_TITLE_RULES[1]: trade/tariff
+
+        monkeypatch.setattr(impl, "TITLE_RULES_FINGERPRINT", "other-rules")
+        monkeypatch.setattr(impl, "_rows_from_snapshot", lambda snap: pytest.fail("stale masks were used"))
+        rows = impl.load_ajg_csv(str(ajg_csv))
+        assert [r.title_mask for r in rows] == masks
+        with open_fresh_snapshot(str(ajg_csv)) as snap:
+            assert snap.extra["title_rules"] == "other-rules"